@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     image.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+# Python specific imports
+import time
+import random
+
+# ROS specific imports
+import sensor_msgs.msg
+
+# rce specific imports
+from rce.util.converters.image import ImageConverter, JpegImageConverter, \
+    RawImageConverter
+
+
+_SIZES = (('VGA', 640, 480), ('HD', 1280, 720))
+_ENCODINGS = (('mono8', 1), ('rgb8', 3), ('bgr8', 3))
+_CONVERTERS = (('png', ImageConverter), ('jpeg', JpegImageConverter),
+               ('raw', RawImageConverter))
+
+
+def _createImage(width, height, encoding, channels):
+    """ Create a synthetic image containing a gradient with some noise such
+        that the compression ratio is similar to the one of a camera image.
+    """
+    row = ''.join(chr((x + random.randint(0, 15)) % 256)
+                  for x in xrange(width * channels))
+    data = ''.join(row[y % 7:] + row[:y % 7] for y in xrange(height))
+
+    img = sensor_msgs.msg.Image()
+    img.width = width
+    img.height = height
+    img.encoding = encoding
+    img.step = width * channels
+    img.data = data
+    return img
+
+
+def _measure(func, arg, passes):
+    start = time.time()
+
+    for _ in xrange(passes):
+        result = func(arg)
+
+    return (time.time() - start) / passes * 1000, result
+
+
+def main(passes):
+    print('{0:<5} {1:<6} {2:<5} {3:>10} {4:>12} {5:>12}'.format(
+            'size', 'enc', 'codec', 'bytes', 'encode [ms]', 'decode [ms]'))
+
+    for name, width, height in _SIZES:
+        for encoding, channels in _ENCODINGS:
+            img = _createImage(width, height, encoding, channels)
+
+            for codec, cls in _CONVERTERS:
+                converter = cls()
+                encTime, buf = _measure(converter.encode, img, passes)
+                decTime, _ = _measure(converter.decode, buf, passes)
+
+                print('{0:<5} {1:<6} {2:<5} {3:>10} {4:>12.2f} '
+                      '{5:>12.2f}'.format(name, encoding, codec,
+                                          len(buf.getvalue()), encTime,
+                                          decTime))
+
+
+def _get_argparse():
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(prog='image',
+                            description='Run benchmark of the image codecs '
+                                        'using synthetic images.')
+
+    parser.add_argument('--passes', help='Number of passes per measurement.',
+                        type=int, default=20)
+
+    return parser
+
+
+if __name__ == '__main__':
+    args = _get_argparse().parse_args()
+
+    main(args.passes)
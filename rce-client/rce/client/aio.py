@@ -0,0 +1,1512 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-client/rce/client/aio.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+
+# Note: This module requires Python 3.5.2 or newer as it is based on asyncio;
+#       it is, however, written such that it can be byte-compiled along with
+#       the rest of the package.
+
+# Python specific imports
+import io
+import os
+import json
+import base64
+import struct
+import inspect
+import weakref
+import asyncio
+import itertools
+from uuid import uuid4
+from hashlib import sha1, sha256
+from collections import deque
+from functools import partial
+from urllib.parse import urlencode, urlsplit
+from urllib.request import urlopen
+from urllib.error import HTTPError
+
+# rce specific imports
+from rce.comm import types
+from rce.comm._version import CURRENT_VERSION
+
+
+# GUID which is used to compute the accept key of the WebSocket handshake
+_WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+# WebSocket opcodes
+_OP_CONTINUATION = 0x0
+_OP_TEXT = 0x1
+_OP_BINARY = 0x2
+_OP_CLOSE = 0x8
+_OP_PING = 0x9
+_OP_PONG = 0xA
+
+# WebSocket close codes
+_CLOSE_NORMAL = 1000
+_CLOSE_PROTOCOL_ERROR = 1002
+_CLOSE_TOO_BIG = 1009
+
+
+class ConnectionError(Exception):
+    """ Error is raised when there is no connection or the connection is
+        not valid.
+    """
+
+
+class ServiceTimeout(Exception):
+    """ Exception is raised when a service call has not been answered within
+        the timeout of the Service Client.
+    """
+
+
+def _mask(key, data):
+    """ Apply the WebSocket masking key to the data. The XOR is done on a
+        single integer instead of byte by byte which keeps the cost of the
+        masking negligible even for large binary messages.
+    """
+    size = len(data)
+
+    if not size:
+        return b''
+
+    key = (key * (size // 4 + 1))[:size]
+    return (int.from_bytes(data, 'big') ^
+            int.from_bytes(key, 'big')).to_bytes(size, 'big')
+
+
+def _isBinary(obj):
+    return isinstance(obj, (io.BytesIO, bytes, bytearray, memoryview))
+
+
+def _extractBinaries(multidict, binaries):
+    """ Search a JSON message for binary data which should be replaced with a
+        reference to a binary message; equivalent of
+        rce.comm.assembler.recursiveBinarySearch. Contrary to the latter the
+        given message is not modified.
+
+        @param multidict:   JSON message which might contain binary data in
+                            form of io.BytesIO instances or bytes-like
+                            objects.
+        @type  multidict:   { str : ... }
+
+        @param binaries:    List to which tuples containing the URI and the
+                            matching binary data are appended.
+        @type  binaries:    [ (str, io.BytesIO / bytes) ]
+
+        @return:            Message where the binary data has been replaced
+                            with the URIs.
+        @rtype:             { str : ... }
+    """
+    msg = {}
+
+    for k, v in multidict.items():
+        if isinstance(v, dict):
+            msg[k] = _extractBinaries(v, binaries)
+        elif isinstance(v, (list, tuple)) and v and _isBinary(v[0]):
+            uris = []
+
+            for e in v:
+                if not _isBinary(e):
+                    raise ValueError('Can not mix binary and string message '
+                                     'in an array.')
+
+                uri = uuid4().hex
+                uris.append(uri)
+                binaries.append((uri, e))
+
+            msg['{0}*'.format(k)] = uris
+        elif _isBinary(v):
+            uri = uuid4().hex
+            binaries.append((uri, v))
+            msg['{0}*'.format(k)] = uri
+        else:
+            msg[k] = v
+
+    return msg
+
+
+def _findReferences(multidict):
+    """ Find the references to binary messages in a received message and
+        prepare the message for their insertion; equivalent of
+        rce.comm.assembler.MessageAssembler._recursiveURISearch.
+
+        @return:            List of tuples of the forms (uri, dict, key) or
+                            (uri, list, index)
+    """
+    refs = []
+    keys = []
+
+    for k, v in multidict.items():
+        if isinstance(v, dict):
+            refs += _findReferences(v)
+        elif k[-1] == '*':
+            keys.append(k)
+
+    for k in keys:
+        ele = multidict.pop(k)
+
+        if isinstance(ele, list):
+            lst = [None] * len(ele)
+            multidict[k[:-1]] = lst
+
+            for i, uri in enumerate(ele):
+                refs.append((uri, lst, i))
+        else:
+            refs.append((ele, multidict, k[:-1]))
+
+    return refs
+
+
+class _MessageAssembler(object):
+    """ Class which is used to store incomplete messages for a certain time
+        and which is used to assemble them when possible; asyncio equivalent
+        of rce.comm.assembler.MessageAssembler.
+    """
+    def __init__(self, conn, timeout, loop):
+        """ Initialize the Message Assembler.
+
+            @param conn:        Connection which receives the completed
+                                messages.
+            @type  conn:        rce.client.aio.Connection
+
+            @param timeout:     Timeout in seconds after which incomplete
+                                messages are discarded.
+            @type  timeout:     int
+
+            @param loop:        Event loop which is used for the clean up.
+            @type  loop:        asyncio.AbstractEventLoop
+        """
+        self._conn = conn
+        self._timeout = timeout
+        self._loop = loop
+
+        # Missing binaries: URI -> (reference, [message, nr. missing], time)
+        self._missing = {}
+
+        # Binaries received before their message: URI -> (binary, time)
+        self._binaries = {}
+
+        self._cleaner = None
+
+    def start(self):
+        """ Start the periodic clean up of the incomplete messages.
+        """
+        if not self._cleaner:
+            self._cleaner = self._loop.call_later(self._timeout / 4,
+                                                  self._cleanUp)
+
+    def stop(self):
+        """ Stop the periodic clean up and discard all incomplete messages.
+        """
+        if self._cleaner:
+            self._cleaner.cancel()
+            self._cleaner = None
+
+        self._missing = {}
+        self._binaries = {}
+
+    def processMessage(self, data, binary):
+        """ Process a message received from the WebSocket connection.
+
+            @param data:        Payload of the received message.
+            @type  data:        bytes
+
+            @param binary:      Flag which indicates whether the message is a
+                                binary message or not.
+            @type  binary:      bool
+        """
+        now = self._loop.time()
+
+        if binary:
+            uri = data[:32].decode('ascii')
+            binaryData = io.BytesIO(data[32:])
+            missing = self._missing.pop(uri, None)
+
+            if missing:
+                (parent, key), incomplete, _ = missing
+                parent[key] = binaryData
+                incomplete[1] -= 1
+
+                if not incomplete[1]:
+                    self._conn.receivedMessage(incomplete[0])
+            else:
+                self._binaries[uri] = (binaryData, now)
+        else:
+            try:
+                msg = json.loads(data.decode('utf-8'))
+            except ValueError:
+                print('Received message is not in valid JSON format.')
+                return
+
+            incomplete = [msg, 0]
+
+            for uri, parent, key in _findReferences(msg):
+                binaryData = self._binaries.pop(uri, None)
+
+                if binaryData:
+                    parent[key] = binaryData[0]
+                else:
+                    incomplete[1] += 1
+                    self._missing[uri] = ((parent, key), incomplete, now)
+
+            if not incomplete[1]:
+                self._conn.receivedMessage(msg)
+
+    def _cleanUp(self):
+        """ Internally used method to discard all incomplete messages and
+            binaries which are older than the timeout.
+        """
+        limit = self._loop.time() - self._timeout
+
+        self._missing = dict((uri, missing)
+                             for uri, missing in self._missing.items()
+                             if missing[2] >= limit)
+        self._binaries = dict((uri, binary)
+                              for uri, binary in self._binaries.items()
+                              if binary[1] >= limit)
+
+        self._cleaner = self._loop.call_later(self._timeout / 4,
+                                              self._cleanUp)
+
+
+class _WebSocketProtocol(asyncio.Protocol):
+    """ Minimal WebSocket client protocol (RFC 6455) which is used to
+        communicate with the Robot process. Received payloads are collected
+        in a single buffer and masked outgoing frames are written without
+        any intermediate copies of the message besides the masking.
+    """
+    # CONFIG
+    CLOSE_TIMEOUT = 5
+    MAX_HEADER_SIZE = 65536
+    MAX_MESSAGE_SIZE = 128 * 1024 * 1024
+
+    def __init__(self, conn, host, resource, loop):
+        """ Initialize the protocol.
+
+            @param conn:        Connection which receives the messages.
+            @type  conn:        rce.client.aio.Connection
+
+            @param host:        Value of the Host header of the handshake.
+            @type  host:        str
+
+            @param resource:    Resource, including the query string, which
+                                is requested in the handshake.
+            @type  resource:    str
+
+            @param loop:        Event loop of the connection.
+            @type  loop:        asyncio.AbstractEventLoop
+        """
+        self._conn = conn
+        self._host = host
+        self._resource = resource
+        self._loop = loop
+
+        self._key = base64.b64encode(os.urandom(16))
+        self.handshake = loop.create_future()
+
+        self._transport = None
+        self._buffer = bytearray()
+        self._open = False
+        self._closing = False
+        self._closer = None
+
+        self._fragments = None
+        self._fragmentsSize = 0
+        self._fragmentsBinary = False
+
+        self._paused = False
+        self._drainWaiters = []
+
+    def connection_made(self, transport):
+        self._transport = transport
+        request = ('GET {0} HTTP/1.1\r\n'
+                   'Host: {1}\r\n'
+                   'Upgrade: websocket\r\n'
+                   'Connection: Upgrade\r\n'
+                   'Sec-WebSocket-Key: {2}\r\n'
+                   'Sec-WebSocket-Version: 13\r\n'
+                   '\r\n').format(self._resource, self._host,
+                                  self._key.decode('ascii'))
+        transport.write(request.encode('ascii'))
+
+    def data_received(self, data):
+        self._buffer.extend(data)
+
+        if not self._open:
+            end = self._buffer.find(b'\r\n\r\n')
+
+            if end < 0:
+                if len(self._buffer) > self.MAX_HEADER_SIZE:
+                    self._failHandshake('Handshake response is too large.')
+
+                return
+
+            header = bytes(self._buffer[:end]).decode('latin-1')
+            del self._buffer[:end + 4]
+
+            try:
+                self._checkHandshake(header)
+            except ConnectionError as e:
+                self._failHandshake(str(e))
+                return
+
+            self._open = True
+            self.handshake.set_result(None)
+
+        self._processFrames()
+
+    def connection_lost(self, exc):
+        if self._closer:
+            self._closer.cancel()
+            self._closer = None
+
+        self._transport = None
+
+        if not self.handshake.done():
+            self.handshake.set_exception(ConnectionError('Connection lost '
+                                                         'during handshake.'))
+
+        for waiter in self._drainWaiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+        self._drainWaiters = []
+
+        if self._open:
+            self._open = False
+            self._conn.connectionLost()
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+
+        for waiter in self._drainWaiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+        self._drainWaiters = []
+
+    def drain(self):
+        """ Wait until the write buffer of the transport has been flushed
+            below its high-water mark.
+
+            @rtype:             asyncio.Future
+        """
+        waiter = self._loop.create_future()
+
+        if self._paused and self._transport:
+            self._drainWaiters.append(waiter)
+        else:
+            waiter.set_result(None)
+
+        return waiter
+
+    def sendMessage(self, data, binary=False):
+        """ Send a message as a single frame.
+
+            @param data:        Payload of the message.
+            @type  data:        bytes
+
+            @param binary:      Flag which indicates whether the message is a
+                                binary message or a text message.
+            @type  binary:      bool
+        """
+        if not self._open or self._closing:
+            raise ConnectionError('WebSocket connection is not open.')
+
+        self._sendFrame(_OP_BINARY if binary else _OP_TEXT, data)
+
+    def close(self, code=_CLOSE_NORMAL):
+        """ Start the closing handshake. The transport is closed as soon as
+            the server answered or after the close timeout.
+        """
+        if not self._transport or self._closing:
+            return
+
+        self._closing = True
+
+        if self._open:
+            self._sendFrame(_OP_CLOSE, struct.pack('!H', code))
+            self._closer = self._loop.call_later(self.CLOSE_TIMEOUT,
+                                                 self._transport.abort)
+        else:
+            self._transport.close()
+
+    def _sendFrame(self, opcode, payload):
+        size = len(payload)
+
+        if size < 126:
+            header = struct.pack('!BB', 0x80 | opcode, 0x80 | size)
+        elif size < 65536:
+            header = struct.pack('!BBH', 0x80 | opcode, 0xFE, size)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 0xFF, size)
+
+        key = os.urandom(4)
+        self._transport.writelines((header, key, _mask(key, payload)))
+
+    def _checkHandshake(self, header):
+        lines = header.split('\r\n')
+        status = lines[0].split(' ', 2)
+
+        if len(status) < 2 or status[1] != '101':
+            raise ConnectionError('WebSocket handshake failed: '
+                                  '{0}'.format(lines[0]))
+
+        headers = {}
+
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        accept = base64.b64encode(sha1(self._key + _WS_GUID).digest())
+
+        if headers.get('upgrade', '').lower() != 'websocket':
+            raise ConnectionError('WebSocket handshake failed: Invalid '
+                                  'Upgrade header.')
+
+        if headers.get('sec-websocket-accept') != accept.decode('ascii'):
+            raise ConnectionError('WebSocket handshake failed: Invalid '
+                                  'accept key.')
+
+    def _failHandshake(self, reason):
+        if not self.handshake.done():
+            self.handshake.set_exception(ConnectionError(reason))
+
+        self._transport.close()
+
+    def _failConnection(self, code, reason):
+        print('WebSocket connection failed: {0}'.format(reason))
+        self._buffer = bytearray()
+        self.close(code)
+
+    def _processFrames(self):
+        buf = self._buffer
+        offset = 0
+
+        while self._transport and len(buf) - offset >= 2:
+            b0 = buf[offset]
+            b1 = buf[offset + 1]
+            pos = offset + 2
+            size = b1 & 0x7F
+
+            if size == 126:
+                if len(buf) < pos + 2:
+                    break
+
+                size, = struct.unpack_from('!H', buf, pos)
+                pos += 2
+            elif size == 127:
+                if len(buf) < pos + 8:
+                    break
+
+                size, = struct.unpack_from('!Q', buf, pos)
+                pos += 8
+
+            if size > self.MAX_MESSAGE_SIZE:
+                self._failConnection(_CLOSE_TOO_BIG, 'Frame is too large.')
+                return
+
+            if b1 & 0x80:
+                if len(buf) < pos + 4:
+                    break
+
+                key = bytes(buf[pos:pos + 4])
+                pos += 4
+            else:
+                key = None
+
+            if len(buf) < pos + size:
+                break
+
+            payload = bytes(buf[pos:pos + size])
+            offset = pos + size
+
+            if key:
+                payload = _mask(key, payload)
+
+            if not self._frameReceived(b0 & 0x80, b0 & 0x0F, payload):
+                return
+
+        del buf[:offset]
+
+    def _frameReceived(self, fin, opcode, payload):
+        """ Process a single frame.
+
+            @return:            False if the connection has been failed.
+        """
+        if opcode == _OP_PING:
+            if not self._closing:
+                self._sendFrame(_OP_PONG, payload)
+        elif opcode == _OP_PONG:
+            pass
+        elif opcode == _OP_CLOSE:
+            if not self._closing:
+                self._closing = True
+                self._sendFrame(_OP_CLOSE, payload[:2])
+
+            self._transport.close()
+        elif opcode in (_OP_TEXT, _OP_BINARY, _OP_CONTINUATION):
+            if opcode == _OP_CONTINUATION:
+                if self._fragments is None:
+                    self._failConnection(_CLOSE_PROTOCOL_ERROR,
+                                         'Unexpected continuation frame.')
+                    return False
+            elif self._fragments is not None:
+                self._failConnection(_CLOSE_PROTOCOL_ERROR,
+                                     'Expected continuation frame.')
+                return False
+            else:
+                self._fragments = []
+                self._fragmentsSize = 0
+                self._fragmentsBinary = opcode == _OP_BINARY
+
+            self._fragments.append(payload)
+            self._fragmentsSize += len(payload)
+
+            if self._fragmentsSize > self.MAX_MESSAGE_SIZE:
+                self._failConnection(_CLOSE_TOO_BIG, 'Message is too large.')
+                return False
+
+            if fin:
+                if len(self._fragments) == 1:
+                    data = self._fragments[0]
+                else:
+                    data = b''.join(self._fragments)
+
+                binary = self._fragmentsBinary
+                self._fragments = None
+
+                if not self._closing:
+                    self._conn.processMessage(data, binary)
+        else:
+            self._failConnection(_CLOSE_PROTOCOL_ERROR, 'Unknown opcode.')
+            return False
+
+        return True
+
+
+class Connection(object):
+    """ Connection to the cloud engine for clients which are based on asyncio
+        instead of twisted. The connection uses the same protocol as
+        rce.client.connection.Connection, i.e. JSON based messages, and
+        provides the same interfaces; service calls return awaitables and
+        subscribers can be used as asynchronous iterators.
+
+        All methods have to be called from the thread running the event loop.
+    """
+    _PREFIXES = ['ServiceClient', 'ServiceProvider', 'Publisher', 'Subscriber']
+    _SUFFIXES = ['Interface', 'Converter', 'Forwarder']
+    _INTERFACES = [''.join(t) for t in itertools.product(_PREFIXES, _SUFFIXES)]
+
+    INTERFACE_MAP = {
+        'ServiceClientForwarder'   : 'ServiceClientConverter',
+        'ServiceProviderForwarder' : 'ServiceProviderConverter',
+        'PublisherForwarder'       : 'PublisherConverter',
+        'SubscriberForwarder'      : 'SubscriberConverter'
+    }
+
+    # CONFIG
+    MSG_QUEUE_TIMEOUT = 60
+
+    def __init__(self, userID, robotID, password, loop=None, timeFormat=None):
+        """ Initialize the Connection.
+
+            @param userID:      User ID which will be used to authenticate the
+                                connection.
+            @type  userID:      str
+
+            @param robotID:     Robot ID which will be used to authenticate the
+                                connection.
+            @type  robotID:     str
+
+            @param password:    Password which will be used to authenticate the
+                                connection.
+            @type  password:    str
+
+            @param loop:        Event loop which is used for this connection,
+                                or None to use the current event loop.
+            @type  loop:        asyncio.AbstractEventLoop
+
+            @param timeFormat:  Representation of the time and duration values
+                                in the received messages, i.e. 'iso',
+                                'iso-ns', 'pair', or 'float'. If None, the
+                                default of the cloud engine is used.
+            @type  timeFormat:  str
+        """
+        self._userID = userID
+        self._robotID = robotID
+        self._password = sha256(password.encode('utf-8')).hexdigest()
+        self._loop = loop or asyncio.get_event_loop()
+        self._timeFormat = timeFormat
+
+        self._protocol = None
+        self._connecting = None
+        self._assembler = _MessageAssembler(self, self.MSG_QUEUE_TIMEOUT,
+                                            self._loop)
+        self._interfaces = {}
+
+    @property
+    def loop(self):
+        """ Reference to the event loop. """
+        return self._loop
+
+    def connect(self, masterUrl):
+        """ Connect to RCE.
+
+            @param masterUrl:   URL of Authentication Handler of Master Manager
+            @type  masterUrl:   str
+
+            @return:            Future which is resolved with the connection
+                                as soon as the connection was successfully
+                                established or which fails with a
+                                ConnectionError otherwise.
+            @rtype:             asyncio.Future
+        """
+        if self._protocol or self._connecting:
+            raise ConnectionError('There is already a connection registered.')
+
+        self._connecting = self._loop.create_future()
+        future = self._loop.run_in_executor(None, self._getRobotURL,
+                                            masterUrl)
+        future.add_done_callback(self._robotConnect)
+        return self._connecting
+
+    def disconnect(self):
+        """ Disconnect from RCE.
+        """
+        if self._protocol:
+            self._protocol.close()
+
+    def drain(self):
+        """ Wait until the data which has been sent has been flushed to the
+            network. Can be used by producers of large messages to respect
+            the flow control of the connection.
+
+            @rtype:             asyncio.Future
+        """
+        if not self._protocol:
+            raise ConnectionError('No connection to RCE.')
+
+        return self._protocol.drain()
+
+    def _getRobotURL(self, masterUrl):
+        """ Internally used method to connect to the Master process to get
+            a URL of a Robot process. (Executed in a worker thread.)
+        """
+        print('Connect to Master Process on: {0}'.format(masterUrl))
+
+        args = urlencode((('userID', self._userID),
+                          ('version', CURRENT_VERSION)))
+
+        try:
+            f = urlopen('{0}?{1}'.format(masterUrl, args))
+        except HTTPError as e:
+            msg = e.read().decode('utf-8', 'replace')
+
+            if msg:
+                msg = ' - {0}'.format(msg)
+
+            raise ConnectionError('HTTP Error {0}: '
+                                  '{1}{2}'.format(e.getcode(), e.msg, msg))
+
+        return json.loads(f.read().decode('utf-8'))
+
+    def _robotConnect(self, future):
+        """ Internally used method to connect to the Robot process.
+        """
+        try:
+            resp = future.result()
+        except Exception as e:
+            self._connectFailed(e)
+            return
+
+        url = resp['url']
+        current = resp.get('current', None)
+
+        if current:
+            print("Warning: There is a newer client (version: '{0}') "
+                  'available.'.format(current))
+
+        print('Connect to Robot Process on: {0}'.format(url))
+
+        args = [('userID', self._userID), ('robotID', self._robotID),
+                ('password', self._password)]
+
+        if self._timeFormat:
+            args.append(('timeFormat', self._timeFormat))
+
+        parts = urlsplit(url)
+        secure = parts.scheme == 'wss'
+        port = parts.port or (443 if secure else 80)
+        resource = '{0}?{1}'.format(parts.path or '/', urlencode(args))
+
+        protocol = _WebSocketProtocol(self, parts.netloc, resource,
+                                      self._loop)
+        task = asyncio.ensure_future(
+            self._loop.create_connection(lambda: protocol, parts.hostname,
+                                         port, ssl=secure or None),
+            loop=self._loop)
+        task.add_done_callback(partial(self._transportConnected, protocol))
+
+    def _transportConnected(self, protocol, task):
+        try:
+            task.result()
+        except Exception as e:
+            self._connectFailed(e)
+            return
+
+        protocol.handshake.add_done_callback(partial(self._handshakeDone,
+                                                     protocol))
+
+    def _handshakeDone(self, protocol, handshake):
+        try:
+            handshake.result()
+        except Exception as e:
+            self._connectFailed(e)
+            return
+
+        self._protocol = protocol
+        self._assembler.start()
+        print('Connection to RCE established.')
+
+        connecting, self._connecting = self._connecting, None
+
+        if not connecting.done():
+            connecting.set_result(self)
+
+    def _connectFailed(self, e):
+        print(e)
+        connecting, self._connecting = self._connecting, None
+
+        if not connecting.done():
+            connecting.set_exception(e)
+
+    # Callback WebSocket protocol
+
+    def processMessage(self, data, binary):
+        """ Callback for the WebSocket protocol.
+        """
+        self._assembler.processMessage(data, binary)
+
+    def connectionLost(self):
+        """ Callback for the WebSocket protocol.
+        """
+        self._protocol = None
+        self._assembler.stop()
+        print('Connection closed.')
+
+        for interfaces in list(self._interfaces.values()):
+            for interface in list(interfaces):
+                interface.connectionLost()
+
+    def receivedMessage(self, msg):
+        """ Callback for the Message Assembler.
+
+            @param msg:         Message which has been received.
+            @type  msg:         { str : {} / base_types / io.BytesIO }
+        """
+        try:
+            msgType = msg['type']
+            data = msg['data']
+        except KeyError as e:
+            print('Received message from robot process is missing the key '
+                  '{0}.'.format(e))
+            return
+
+        if msgType == types.ERROR:
+            print('Received error message: {0}'.format(data))
+        elif msgType == types.STATUS:
+            print('Received status message: {0}'.format(data))
+        elif msgType == types.DATA_MESSAGE:
+            try:
+                iTag = data['iTag']
+                clsName = data['type']
+                rosMsg = data['msg']
+                msgID = data['msgID']
+            except KeyError as e:
+                print('Data of received message from robot process is missing '
+                      'the key {0}.'.format(e))
+                return
+
+            for interface in list(self._interfaces.get(iTag, ())):
+                interface.callback(clsName, rosMsg, msgID)
+        else:
+            print('Received message with unknown message type: '
+                  '{0}'.format(msgType))
+
+    # Callback Interface objects
+
+    def registerInterface(self, iTag, iface, unique):
+        """ Callback for Interface.
+
+            @param iTag:        Tag of interface which should be registered.
+            @type  iTag:        str
+
+            @param iface:       Interface instance which should be registered.
+            @type  iface:       rce.client.aio.*
+
+            @param unique:      Flag to indicate whether Interface should be
+                                unique for its tag or not.
+            @type  unique:      bool
+        """
+        if iTag not in self._interfaces:
+            self._interfaces[iTag] = weakref.WeakSet()
+        elif unique and self._interfaces[iTag]:
+            raise ValueError('Can not have multiple interfaces with the same '
+                             'tag.')
+
+        self._interfaces[iTag].add(iface)
+
+    def unregisterInterface(self, iTag, iface):
+        """ Callback for Interfaces.
+
+            @param iTag:        Tag of interface which should be unregistered.
+            @type  iTag:        str
+
+            @param iface:       Interface instance which should be
+                                unregistered.
+            @type  iface:       rce.client.aio.*
+        """
+        if iTag not in self._interfaces:
+            raise ValueError('No Interface register with tag '
+                             '"{0}".'.format(iTag))
+
+        interfaces = self._interfaces[iTag]
+        interfaces.discard(iface)
+
+        if not interfaces:
+            del self._interfaces[iTag]
+
+    # Messages
+
+    def _sendMessage(self, msgType, msgData):
+        """ Internally used method to send messages via the WebSocket
+            connection.
+
+            @param msgType:     String describing the type of the message.
+            @type  msgType:     str
+
+            @param msgData:     Message which should be sent.
+        """
+        if not self._protocol:
+            raise ConnectionError('No connection to RCE.')
+
+        binaries = []
+        msg = _extractBinaries({'type':msgType, 'data':msgData}, binaries)
+        self._protocol.sendMessage(json.dumps(msg).encode('utf-8'))
+
+        for uri, data in binaries:
+            if isinstance(data, io.BytesIO):
+                data = data.getvalue()
+
+            self._protocol.sendMessage(b''.join((uri.encode('ascii'), data)),
+                                       binary=True)
+
+    def sendMessage(self, dest, msgType, msg, msgID):
+        """ Send a data message to the cloud engine.
+
+            @param dest:        Interface tag of message destination.
+            @type  dest:        str
+
+            @param msgType:     ROS Message type in format "pkg/msg", e.g.
+                                'std_msgs/String'
+            @type  msgType:     str
+
+            @param msg:         Message which should be sent in form of a
+                                dictionary matching the structure of the ROS
+                                message and using io.BytesIO instances or
+                                bytes for binary message parts.
+            @type msg:          { str : {} / base_types / io.BytesIO }
+
+            @param msgID:       Message ID which is used to match request and
+                                response message.
+            @type  msgID:       str
+        """
+        self._sendMessage(types.DATA_MESSAGE, {'iTag':dest, 'type':msgType,
+                                               'msgID':msgID, 'msg':msg})
+
+    def createContainer(self, cTag, group='', groupIp='', size=1, cpu=0,
+                        memory=0, bandwidth=0, specialFeatures=[]):
+        """ Create a container.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.createContainer.
+        """
+        print("Request creation of container '{0}'.".format(cTag))
+        data = {}
+
+        if group.strip():
+            data['group'] = group.strip()
+
+        if groupIp:
+            data['groupIp'] = groupIp
+
+        if size:
+            data['size'] = size
+
+        if cpu:
+            data['cpu'] = cpu
+
+        if memory:
+            data['memory'] = memory
+
+        if bandwidth:
+            data['bandwidth'] = bandwidth
+
+        if specialFeatures:
+            data['specialFeatures'] = specialFeatures
+
+        container = {'containerTag':cTag}
+
+        if data:
+            container['containerData'] = data
+
+        self._sendMessage(types.CREATE_CONTAINER, container)
+
+    def destroyContainer(self, cTag):
+        """ Destroy a container.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.destroyContainer.
+        """
+        print("Request destruction of container '{0}'.".format(cTag))
+        self._sendMessage(types.DESTROY_CONTAINER, {'containerTag':cTag})
+
+    def addNode(self, cTag, nTag, pkg, exe, args='', name='', namespace=''):
+        """ Add a node.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.addNode.
+        """
+        print("Request addition of node '{0}' to container '{1}' "
+              '[pkg: {2}; exe: {3}].'.format(nTag, cTag, pkg, exe))
+        node = {'containerTag':cTag, 'nodeTag':nTag, 'pkg':pkg, 'exe':exe}
+
+        if args:
+            node['args'] = args
+
+        if name:
+            node['name'] = name
+
+        if namespace:
+            node['namespace'] = namespace
+
+        self._sendMessage(types.CONFIGURE_COMPONENT, {'addNodes':[node]})
+
+    def removeNode(self, cTag, nTag):
+        """ Remove a node.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.removeNode.
+        """
+        print("Request removal of node '{0}' from container "
+              "'{1}'.".format(nTag, cTag))
+        node = {'containerTag':cTag, 'nodeTag':nTag}
+        self._sendMessage(types.CONFIGURE_COMPONENT, {'removeNodes':[node]})
+
+    def addParameter(self, cTag, name, value):
+        """ Add a parameter.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.addParameter.
+        """
+        print("Request addition of parameter '{0}' to container "
+              "'{1}'.".format(name, cTag))
+        param = {'containerTag':cTag, 'name':name, 'value':value}
+        self._sendMessage(types.CONFIGURE_COMPONENT, {'setParam':[param]})
+
+    def removeParameter(self, cTag, name):
+        """ Remove a parameter.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.removeParameter.
+        """
+        print("Request removal of parameter '{0}' from container "
+              "'{1}'.".format(name, cTag))
+        param = {'containerTag':cTag, 'name':name}
+        self._sendMessage(types.CONFIGURE_COMPONENT, {'deleteParam':[param]})
+
+    def addInterface(self, eTag, iTag, iType, iCls, addr=''):
+        """ Add an interface.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.addInterface.
+        """
+        iType = self.INTERFACE_MAP.get(iType, iType)
+        print("Request addition of interface '{0}' of type '{1}' to endpoint "
+              "'{2}'.".format(iTag, iType, eTag))
+
+        if iType not in self._INTERFACES:
+            raise TypeError('Interface type is not valid.')
+
+        iface = {'endpointTag':eTag, 'interfaceTag':iTag,
+                 'interfaceType':iType, 'className':iCls}
+
+        if addr:
+            iface['addr'] = addr
+
+        self._sendMessage(types.CONFIGURE_COMPONENT, {'addInterfaces':[iface]})
+
+    def removeInterface(self, eTag, iTag):
+        """ Remove an interface.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.removeInterface.
+        """
+        print("Request removal of interface '{0}'.".format(iTag))
+        iface = {'endpointTag':eTag, 'interfaceTag':iTag}
+        self._sendMessage(types.CONFIGURE_COMPONENT,
+                          {'removeInterfaces':[iface]})
+
+    def addConnection(self, tagA, tagB):
+        """ Create a connection.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.addConnection.
+        """
+        print("Request creation of connection between interface '{0}' and "
+              "'{1}'.".format(tagA, tagB))
+        conn = {'tagA':tagA, 'tagB':tagB}
+        self._sendMessage(types.CONFIGURE_CONNECTION, {'connect':[conn]})
+
+    def removeConnection(self, tagA, tagB):
+        """ Destroy a connection.
+
+            For the description of the arguments see
+            rce.comm.client.RCE.removeConnection.
+        """
+        print("Request destruction of connection between interface '{0}' and "
+              "'{1}'.".format(tagA, tagB))
+        conn = {'tagA':tagA, 'tagB':tagB}
+        self._sendMessage(types.CONFIGURE_CONNECTION, {'disconnect':[conn]})
+
+    # Interfaces
+
+    def publisher(self, iTag, msgType):
+        """ Create a Publisher.
+
+            @param iTag:        Unique tag which will be used to identify the
+                                publisher.
+            @type  iTag:        str
+
+            @param msgType:     ROS message which will be published, e.g.
+                                'std_msgs/String'
+            @type  msgType:     str
+
+            @return:            New Publisher instance.
+            @rtype:             rce.client.aio.Publisher
+        """
+        return Publisher(self, iTag, msgType)
+
+    def subscriber(self, iTag, msgType, cb=None):
+        """ Create a Subscriber.
+
+            @param iTag:        Unique tag which will be used to identify the
+                                subscriber.
+            @type  iTag:        str
+
+            @param msgType:     ROS message to which will be subscribed, e.g.
+                                    'std_msgs/String'
+            @type  msgType:     str
+
+            @param cb:          Callback which will takes as single argument
+                                the received message. If no callback is given
+                                the received messages are queued and can be
+                                retrieved by iterating asynchronously over
+                                the subscriber.
+            @type  cb:          callable
+
+            @return:            New Subscriber instance.
+            @rtype:             rce.client.aio.Subscriber
+        """
+        if cb and not callable(cb):
+            raise TypeError('Callback has to be callable.')
+
+        return Subscriber(self, iTag, msgType, cb)
+
+    def serviceClient(self, iTag, srvType, cb=None, timeout=None):
+        """ Create a Service Client.
+
+            @param iTag:        Unique tag which will be used to identify the
+                                service.
+            @type  iTag:        str
+
+            @param srvType:     ROS Service which will used.
+            @type  srvType:     str
+
+            @param cb:          Can be used to specify a default callback for
+                                received service responses; it should take the
+                                response as the single argument.
+            @type  cb:          callable
+
+            @param timeout:     Time in seconds after which a service call
+                                without response fails, or None to use the
+                                default.
+            @type  timeout:     float
+
+            @return:            New Service Client instance.
+            @rtype:             rce.client.aio.ServiceClient
+        """
+        if cb and not callable(cb):
+            raise TypeError('Callback has to be callable.')
+
+        return ServiceClient(self, iTag, srvType, cb, timeout)
+
+    def serviceProvider(self, iTag, srvType, cb, *args):
+        """ Create a Service Provider.
+
+            @param iTag:        Unique tag which will be used to identify the
+                                service.
+            @type  iTag:        str
+
+            @param srvType:     ROS Service which will be provided.
+            @type  srvType:     str
+
+            @param cb:          Callback which will be called when a request has
+                                been received. The callback will receive the
+                                request as first argument and all additional
+                                arguments. The callback should return the
+                                response message, or an awaitable which
+                                resolves to the response message.
+            @type  cb:          callable
+
+            @param *args:       All additional arguments are passed to the
+                                callback.
+
+            @return:            New Service Provider instance.
+            @rtype:             rce.client.aio.ServiceProvider
+        """
+        if not callable(cb):
+            raise TypeError('Callback has to be callable.')
+
+        return ServiceProvider(self, iTag, srvType, cb, args)
+
+
+class _Base(object):
+    """ Abstract base for all Interface classes.
+    """
+    _UP_MSG = "Interface '{0}' is up."
+    _DOWN_MSG = "Interface '{0}' is down."
+
+    def __init__(self, conn, iTag, clsName):
+        """ Initialize the Interface.
+        """
+        print(self._UP_MSG.format(iTag))
+        self._conn = conn
+        self._iTag = iTag
+        self._clsName = clsName
+
+    def __del__(self):
+        """ Finalize the Interface.
+        """
+        print(self._DOWN_MSG.format(self._iTag))
+
+
+class _CB_Base(_Base):
+    """ Abstract base for all Interface classes which have to be registered with
+        the connection.
+    """
+    _UNIQUE = False
+
+    def __init__(self, conn, iTag, clsName):
+        """ Initialize the Interface.
+        """
+        conn.registerInterface(iTag, self, self._UNIQUE)
+        self._subscribed = True
+
+        super(_CB_Base, self).__init__(conn, iTag, clsName)
+
+    def _unsubscribe(self):
+        """ Internally used method to unsubscribe the Interface.
+        """
+        if getattr(self, '_subscribed', False):
+            self._conn.unregisterInterface(self._iTag, self)
+            self._subscribed = False
+
+    def callback(self, msgType, msg, msgID):
+        """ Callback for the Connection. To implement the callback overwrite
+            the hook '_callback'.
+        """
+        if not msgType == self._clsName:
+            print('Received unexpected message type.')
+            return
+
+        self._callback(msg, msgID)
+
+    def _callback(self, msg, msgID):
+        """ Callback to process the received message.
+        """
+        raise NotImplementedError('Method _callback has not been implemented.')
+
+    def connectionLost(self):
+        """ Callback for the Connection which is called when the connection
+            to the cloud engine has been lost.
+        """
+
+    def __del__(self):
+        """ Finalize the Interface.
+        """
+        self._unsubscribe()
+
+        super(_CB_Base, self).__del__()
+
+
+class Publisher(_Base):
+    """ Publisher Interface.
+    """
+    _UP_MSG = "Publisher to RCE Interface '{0}' is up."
+    _DOWN_MSG = "Publisher to RCE Interface '{0}' is down."
+
+    def publish(self, msg):
+        """ Publish a message.
+        """
+        self._conn.sendMessage(self._iTag, self._clsName, msg, 'nil')
+
+
+class Subscriber(_CB_Base):
+    """ Subscriber Interface. Without a callback the received messages are
+        queued and can be consumed with
+
+            async for msg in subscriber:
+                ...
+
+        The iteration ends when the subscriber is unsubscribed.
+    """
+    _UNIQUE = False
+    _UP_MSG = "Subscriber to RCE Interface '{0}' is up."
+    _DOWN_MSG = "Subscriber to RCE Interface '{0}' is down."
+
+    # CONFIG
+    QUEUE_SIZE = 100
+
+    def __init__(self, conn, iTag, msgType, cb=None):
+        """ Initialize the Subscriber.
+        """
+        self._cb = cb
+
+        # Only the newest messages are kept if the consumer falls behind
+        self._queue = deque(maxlen=self.QUEUE_SIZE)
+        self._waiter = None
+
+        super(Subscriber, self).__init__(conn, iTag, msgType)
+
+    def unsubscribe(self):
+        """ Unsubscribe from Interface. Afterwards no more messages are given
+            to the registered callback and the asynchronous iteration ends
+            once the queued messages have been consumed.
+        """
+        self._unsubscribe()
+
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_exception(StopAsyncIteration())
+
+        self._waiter = None
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = self._conn.loop.create_future()
+
+        if self._queue:
+            future.set_result(self._queue.popleft())
+        elif not self._subscribed:
+            future.set_exception(StopAsyncIteration())
+        elif self._waiter:
+            raise RuntimeError('Subscriber is already being iterated.')
+        else:
+            self._waiter = future
+
+        return future
+
+    def _callback(self, msg, _):
+        """ Callback hook.
+        """
+        if self._cb:
+            self._cb(msg)
+        elif self._waiter and not self._waiter.done():
+            self._waiter.set_result(msg)
+            self._waiter = None
+        else:
+            self._waiter = None
+            self._queue.append(msg)
+
+
+class ServiceClient(_CB_Base):
+    """ Service Client Interface.
+    """
+    _UNIQUE = True
+    _UP_MSG = "Service Client to RCE Interface '{0}' is up."
+    _DOWN_MSG = "Service Client to RCE Interface '{0}' is down."
+
+    # CONFIG
+    TIMEOUT = 60
+
+    def __init__(self, conn, iTag, srvType, cb=None, timeout=None):
+        """ Initialize the Service Client.
+        """
+        self._cb = cb
+        self._timeout = timeout or self.TIMEOUT
+        self._responses = {}
+
+        super(ServiceClient, self).__init__(conn, iTag, srvType)
+
+    def call(self, msg, cb=None):
+        """ Call Service.
+
+            @param msg:         Request message which should be sent.
+
+            @param cb:          Callback which should be used to process the
+                                response instead of the default callback.
+            @type  cb:          callable
+
+            @return:            Future which is resolved with the response
+                                message, or which fails with ServiceTimeout
+                                if the call is not answered within the
+                                timeout.
+            @rtype:             asyncio.Future
+        """
+        cb = cb or self._cb
+
+        if cb and not callable(cb):
+            raise TypeError('Callback has to be callable.')
+
+        loop = self._conn.loop
+        uid = uuid4().hex
+        future = loop.create_future()
+
+        if cb:
+            future.add_done_callback(partial(self._done, cb))
+
+        timer = loop.call_later(self._timeout, self._expire, uid)
+        self._responses[uid] = (future, timer)
+
+        try:
+            self._conn.sendMessage(self._iTag, self._clsName, msg, uid)
+        except Exception:
+            del self._responses[uid]
+            timer.cancel()
+            raise
+
+        return future
+
+    def _done(self, cb, future):
+        if future.cancelled():
+            return
+
+        if future.exception():
+            print('Service call failed: {0}'.format(future.exception()))
+        else:
+            cb(future.result())
+
+    def _callback(self, msg, msgID):
+        """ Callback hook.
+        """
+        response = self._responses.pop(msgID, None)
+
+        if response:
+            future, timer = response
+            timer.cancel()
+
+            if not future.done():
+                future.set_result(msg)
+        else:
+            print('Received service response which can not be associated '
+                  'with any request.')
+
+    def _expire(self, uid):
+        response = self._responses.pop(uid, None)
+
+        if response and not response[0].done():
+            response[0].set_exception(ServiceTimeout('Service call timed out '
+                                                     'after '
+                                                     '{0}s.'.format(
+                                                         self._timeout)))
+
+    def connectionLost(self):
+        """ Fail all pending service calls.
+        """
+        responses, self._responses = self._responses, {}
+
+        for future, timer in responses.values():
+            timer.cancel()
+
+            if not future.done():
+                future.set_exception(ConnectionError('Connection to RCE '
+                                                     'lost.'))
+
+
+class ServiceProvider(_CB_Base):
+    """ Service Provider Interface.
+    """
+    _UNIQUE = True
+    _UP_MSG = "Service Provider to RCE Interface '{0}' is up."
+    _DOWN_MSG = "Service Provider to RCE Interface '{0}' is down."
+
+    def __init__(self, conn, iTag, srvType, cb, args):
+        """ Initialize the Service Provider.
+        """
+        self._cb = cb
+        self._args = args
+
+        super(ServiceProvider, self).__init__(conn, iTag, srvType)
+
+    def _callback(self, msg, msgID):
+        """ Callback hook.
+        """
+        try:
+            resp = self._cb(msg, *self._args)
+        except Exception as e:
+            print('Service call failed: {0}'.format(e))
+            return
+
+        if inspect.isawaitable(resp):
+            future = asyncio.ensure_future(resp, loop=self._conn.loop)
+            future.add_done_callback(partial(self._respond, msgID))
+        else:
+            self._send(resp, msgID)
+
+    def _respond(self, msgID, future):
+        if future.cancelled():
+            print('Service call failed.')
+        elif future.exception():
+            print('Service call failed: {0}'.format(future.exception()))
+        else:
+            self._send(future.result(), msgID)
+
+    def _send(self, resp, msgID):
+        try:
+            self._conn.sendMessage(self._iTag, self._clsName, resp, msgID)
+        except ConnectionError:
+            print('Service response could not be sent: No connection to RCE.')
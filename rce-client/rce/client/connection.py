@@ -61,7 +61,7 @@ class _Connection(object):
 
     INTERFACE_MAP = {}
 
-    def __init__(self, userID, robotID, password, reactor):
+    def __init__(self, userID, robotID, password, reactor, timeFormat=None):
         """ Initialize the Connection.
 
             @param userID:      User ID which will be used to authenticate the
@@ -79,11 +79,18 @@ class _Connection(object):
             @param reactor:     Reference to reactor which is used for this
                                 connection.
             @type  reactor:     twisted::reactor
+
+            @param timeFormat:  Representation of the time and duration values
+                                in the received messages, i.e. 'iso',
+                                'iso-ns', 'pair', or 'float'. If None, the
+                                default of the cloud engine is used.
+            @type  timeFormat:  str
         """
         self._userID = userID
         self._robotID = robotID
         self._password = password
         self._reactor = reactor
+        self._timeFormat = timeFormat
 
         self._rce = None
         self._interfaces = {}
@@ -115,7 +122,7 @@ class _Connection(object):
             raise ConnectionError('There is already a connection registered.')
 
         self._rce = RCE(self, self._userID, self._robotID, self._password,
-                        self._reactor)
+                        self._reactor, self._timeFormat)
 
         # Connect
         self._rce.connect(masterUrl, deferred)
@@ -333,7 +340,8 @@ class Connection(_Connection):
 
         return Subscriber(self, iTag, msgType, cb)
 
-    def serviceClient(self, iTag, srvType, cb=None):
+    def serviceClient(self, iTag, srvType, cb=None, timeout=None,
+                      errCb=None):
         """ Create a Service Client.
 
             @param iTag:        Unique tag which will be used to identify the
@@ -348,13 +356,27 @@ class Connection(_Connection):
                                 response as the single argument.
             @type  cb:          callable
 
+            @param timeout:     Time in seconds after which a service call
+                                without response fails, or None to use the
+                                default.
+            @type  timeout:     float
+
+            @param errCb:       Can be used to specify a default callback for
+                                failed service calls, e.g. calls which timed
+                                out; it should take the exception as the
+                                single argument.
+            @type  errCb:       callable
+
             @return:            New Service Client instance.
             @rtype:             rce.client.interface.ServiceClient
         """
         if cb and not callable(cb):
             raise TypeError('Callback has to be callable.')
 
-        return ServiceClient(self, iTag, srvType, cb)
+        if errCb and not callable(errCb):
+            raise TypeError('Error callback has to be callable.')
+
+        return ServiceClient(self, iTag, srvType, cb, timeout, errCb)
 
     def serviceProvider(self, iTag, srvType, cb, *args):
         """ Create a Service Provider.
@@ -445,7 +467,7 @@ if HAS_ROS:
             """
             return ROSSubscriber(self, iTag, msgType, addr)
 
-        def serviceClient(self, iTag, srvType, addr):
+        def serviceClient(self, iTag, srvType, addr, timeout=None):
             """ Create a Service Client using ROS.
 
                 @param iTag:        Unique tag which will be used to identify
@@ -457,10 +479,15 @@ if HAS_ROS:
 
                 @param addr:        Address where the service will be available.
 
+                @param timeout:     Time in seconds after which a service call
+                                    without response fails, or None to use the
+                                    default.
+                @type  timeout:     float
+
                 @return:            New Service Client instance.
                 @rtype:             rce.client.interface.ROSServiceClient
             """
-            return ROSServiceClient(self, iTag, srvType, addr)
+            return ROSServiceClient(self, iTag, srvType, addr, timeout)
 
         def serviceProvider(self, iTag, srvType, addr):
             """ Create a Service Provider using ROS.
@@ -50,6 +50,10 @@ except ImportError:
 
 # twisted specific imports
 from twisted.internet.defer import Deferred
+from twisted.internet.task import LoopingCall
+
+# rce specific imports
+from rce.util.wheel import TimerWheel
 
 
 # Compression level used for communication
@@ -159,6 +163,12 @@ class _Subscriber(_CB_Base):
         self._cb(msg)
 
 
+class ServiceTimeout(Exception):
+    """ Exception is raised when a service call has not been answered within
+        the timeout of the Service Client.
+    """
+
+
 class _ServiceClient(_CB_Base):
     """ Abstract implementation of a Service Client Interface.
     """
@@ -166,10 +176,24 @@ class _ServiceClient(_CB_Base):
     _UP_MSG = "Service Client to RCE Interface '{0}' is up."
     _DOWN_MSG = "Service Client to RCE Interface '{0}' is down."
 
-    def __init__(self, conn, iTag, srvType):
+    # CONFIG
+    TIMEOUT = 60
+    DEADLINE_RESOLUTION = 0.5
+
+    def __init__(self, conn, iTag, srvType, timeout=None):
         """ Initialize the Service Client.
         """
         self._responses = {}
+        self._timeout = timeout or self.TIMEOUT
+
+        reactor = conn.reactor
+        self._deadlines = TimerWheel(reactor.seconds(),
+                                     self.DEADLINE_RESOLUTION)
+
+        # The reaper only runs while there are pending calls; otherwise it
+        # would keep the interface alive
+        self._reaper = LoopingCall(self._reap)
+        self._reaper.clock = reactor
 
         super(_ServiceClient, self).__init__(conn, iTag, srvType)
 
@@ -191,9 +215,15 @@ class _ServiceClient(_CB_Base):
 
         uid = uuid4().hex
         deferred = Deferred()
-        deferred.addCallback(cb, *args)
+        deferred.addCallbacks(cb, self._failure, callbackArgs=args,
+                              errbackArgs=args)
         self._responses[uid] = deferred
 
+        self._deadlines.add(uid, self._conn.reactor.seconds() + self._timeout)
+
+        if not self._reaper.running:
+            self._reaper.start(self.DEADLINE_RESOLUTION, now=False)
+
         self._conn.sendMessage(self._iTag, self._clsName, msg, uid)
 
     def _callback(self, msg, msgID):
@@ -202,11 +232,32 @@ class _ServiceClient(_CB_Base):
         deferred = self._responses.pop(msgID, None)
 
         if deferred:
+            self._deadlines.remove(msgID)
             deferred.callback(msg)
         else:
             print('Received service response which can not be associated '
                   'with any request.')
 
+    def _reap(self):
+        """ Internally used method to fail all service calls whose timeout
+            has passed.
+        """
+        for uid in self._deadlines.expire(self._conn.reactor.seconds()):
+            deferred = self._responses.pop(uid, None)
+
+            if deferred:
+                deferred.errback(ServiceTimeout('Service call timed out after '
+                                                '{0}s.'.format(self._timeout)))
+
+        if not self._responses and self._reaper.running:
+            self._reaper.stop()
+
+    def _failure(self, failure, *args):
+        """ Hook which is called with the failure of a service call instead
+            of the callback, i.e. if the call has timed out.
+        """
+        print('Service call failed: {0}'.format(failure.getErrorMessage()))
+
 
 class _ServiceProvider(_CB_Base):
     """ Abstract implementation of a Service Provider Interface.
@@ -259,14 +310,15 @@ class Subscriber(_Subscriber):
 class ServiceClient(_ServiceClient):
     """ Representation of a Service Client Interface.
     """
-    def __init__(self, conn, iTag, srvType, cb):
+    def __init__(self, conn, iTag, srvType, cb, timeout=None, errCb=None):
         """ Initialize the Service Client.
         """
-        super(ServiceClient, self).__init__(conn, iTag, srvType)
+        super(ServiceClient, self).__init__(conn, iTag, srvType, timeout)
 
         self._cb = cb
+        self._errCb = errCb
 
-    def call(self, msg, cb=None):
+    def call(self, msg, cb=None, errCb=None):
         """ Call the Service Client.
 
             @param msg:     Request message which should be sent.
@@ -276,8 +328,39 @@ class ServiceClient(_ServiceClient):
                             response message as argument. If parameter is
                             omitted the default callback is tried as fall-back.
             @type  cb:      Callable / None
+
+            @param errCb:   Callback function which will be called with the
+                            exception as argument if the service call failed,
+                            e.g. with ServiceTimeout if the call timed out.
+                            If parameter is omitted the default error
+                            callback is tried as fall-back; without any error
+                            callback the failure is only printed.
+            @type  errCb:   Callable / None
         """
-        self._call(msg, cb or self._cb)
+        cb = cb or self._cb
+        errCb = errCb or self._errCb
+
+        if not callable(cb):
+            raise TypeError('Callback has to be callable.')
+
+        if errCb and not callable(errCb):
+            raise TypeError('Error callback has to be callable.')
+
+        self._call(msg, self._success, cb, errCb)
+
+    def _success(self, msg, cb, _):
+        """ Internally used method to pass the response to the callback.
+        """
+        cb(msg)
+
+    def _failure(self, failure, _, errCb):
+        """ Internally used method to pass the failure of a service call to
+            the error callback.
+        """
+        if errCb:
+            errCb(failure.value)
+        else:
+            super(ServiceClient, self)._failure(failure)
 
 
 class ServiceProvider(_ServiceProvider):
@@ -410,7 +493,7 @@ if HAS_ROS:
     class ROSServiceClient(_ServiceClient):
         """ Representation of a Service Client Interface using ROS.
         """
-        def __init__(self, conn, iTag, srvType, addr):
+        def __init__(self, conn, iTag, srvType, addr, timeout=None):
             """ Initialize the Service Client.
             """
             self._service = None
@@ -431,7 +514,8 @@ if HAS_ROS:
             self._service = rospy.Service(addr, srvCls, self._rosCB)
             print("Local ROS Service on address '{0}' is up.".format(addr))
 
-            super(ROSServiceClient, self).__init__(conn, iTag, srvType)
+            super(ROSServiceClient, self).__init__(conn, iTag, srvType,
+                                                   timeout)
 
         def _rosCB(self, req):
             """ Internally used callback for ROS Service.
@@ -453,11 +537,20 @@ if HAS_ROS:
 
             response = event.get()
 
+            if isinstance(response, ServiceTimeout):
+                raise rospy.ServiceException(str(response))
+
             if not isinstance(response, genpy.message.Message):
                 raise Exception('Interrupted.') # TODO: Change exception?
 
             return response
 
+        def _failure(self, failure, event):
+            """ Internally used method to report a failed service call to the
+                ROS Service.
+            """
+            event.set(failure.value)
+
         def _rceCB(self, msg, event):
             """ Internally used method to send received message to the ROS
                 Service as response.
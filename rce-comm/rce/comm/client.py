@@ -174,7 +174,8 @@ class RCE(object):
     _SUFFIXES = ['Interface', 'Converter', 'Forwarder']
     _INTERFACES = [''.join(t) for t in itertools.product(_PREFIXES, _SUFFIXES)]
 
-    def __init__(self, receiver, userID, robotID, password, reactor):
+    def __init__(self, receiver, userID, robotID, password, reactor,
+                 timeFormat=None):
         """ Initialize the Connection.
 
             @param receiver:    Object which is responsible for the processing
@@ -196,6 +197,13 @@ class RCE(object):
             @param reactor:     Reference to reactor which is used for this
                                 connection.
             @type  reactor:     twisted::reactor
+
+            @param timeFormat:  Representation of the time and duration values
+                                in the messages received from the cloud
+                                engine, i.e. 'iso', 'iso-ns', 'pair', or
+                                'float'. If None, the default of the cloud
+                                engine ('iso') is used.
+            @type  timeFormat:  str
         """
         verifyObject(IMessageReceiver, receiver)
 
@@ -204,6 +212,7 @@ class RCE(object):
         self._robotID = robotID
         self._password = sha256(password).hexdigest()
         self._reactor = reactor
+        self._timeFormat = timeFormat
         self._conn = None
         self._connectedDeferred = None
 
@@ -279,8 +288,13 @@ class RCE(object):
         print('Connect to Robot Process on: {0}'.format(url))
 
         # Make WebSocket connection to Robot Manager
-        args = urlencode((('userID', self._userID), ('robotID', self._robotID),
-                          ('password', self._password)))
+        args = [('userID', self._userID), ('robotID', self._robotID),
+                ('password', self._password)]
+
+        if self._timeFormat:
+            args.append(('timeFormat', self._timeFormat))
+
+        args = urlencode(args)
         factory = RCERobotFactory('{0}?{1}'.format(url, args), self)
         connectWS(factory)
 
@@ -554,6 +568,15 @@ class RCE(object):
                                 Interfaces where the argument will provide
                                 the name under which the interface will be
                                 available in the local ROS environment.
+                                Options of a ROS Interface can be appended
+                                to the name as a query string, i.e.
+                                '/service?cacheTTL=60&cacheSize=128' to
+                                cache the responses of a ServiceClient.
+                                For Converters the argument can provide a
+                                comma separated list of the top-level fields
+                                which should be converted to JSON; all other
+                                fields are sent as binary messages containing
+                                the serialized fields.
             @type  addr:        str
         """
         print("Request addition of interface '{0}' of type '{1}' to endpoint "
@@ -626,8 +649,8 @@ class RCE(object):
 
         if msgType == types.ERROR:
             print('Received error message: {0}'.format(data))
-#        elif msgType == types.STATUS:
-#            print('Received status message: {0}'.format(data))
+        elif msgType == types.STATUS:
+            print('Received status message: {0}'.format(data))
         elif msgType == types.DATA_MESSAGE:
             try:
                 iTag = data['iTag']
@@ -56,7 +56,7 @@ class IMasterRealm(Interface):
 class IRobotRealm(Interface):
     """ Interface which the Robot realm has to implement.
     """
-    def login(userID, robotID, password):  #@NoSelf
+    def login(userID, robotID, password, timeFormat='iso'):  #@NoSelf
         """ Callback for Robot connection to login and authenticate.
 
             @param userID:      User ID under which the robot is logging in.
@@ -70,6 +70,11 @@ class IRobotRealm(Interface):
                                 used to authenticate the user.
             @type  password:    str
 
+            @param timeFormat:  Representation of the time and duration values
+                                in the messages sent to the robot, i.e.
+                                'iso', 'iso-ns', 'pair', or 'float'.
+            @type  timeFormat:  str
+
             @return:            Representation of the connection to the robot
                                 which is used in the Robot process.
                                 (type: rce.robot.Connection)
@@ -133,6 +138,14 @@ class IServersideProtocol(Interface):
             @type  msg:         str
         """
 
+    def sendStatusMessage(msg):  #@NoSelf
+        """ Send a status message to the robot client.
+
+            @param msg:         Status message which should be sent. It has to
+                                be a JSON compatible dictionary.
+            @type  msg:         dict
+        """
+
     def dropConnection():  #@NoSelf
         """ Request that the protocol drops the connection to the client.
         """
@@ -238,7 +251,15 @@ class IRobot(Interface):
 
             @param addr:        ROS name/address which the interface should
                                 use. Only necessary if the suffix of @param
-                                iType is 'Interface'.
+                                iType is 'Interface', where options of the
+                                interface can be appended as a query string,
+                                i.e. '/service?cacheTTL=60&cacheSize=128' to
+                                cache the responses of a ServiceClient. If
+                                the suffix is 'Converter' it can optionally
+                                be a comma separated list of top-level
+                                fields which should be converted to JSON;
+                                all other fields are then sent as binary
+                                messages containing the serialized fields.
             @type  addr:        str
         """
 
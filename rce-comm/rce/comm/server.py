@@ -213,14 +213,18 @@ class RobotWebSocketProtocol(WebSocketServerProtocol):
             raise HttpException(httpstatus.HTTP_STATUS_CODE_BAD_REQUEST[0],
                                 'Request is missing parameter: {0}'.format(e))
 
+        timeFormat = params.get('timeFormat', ['iso'])
+
         for name, param in [('userID', userID), ('robotID', robotID),
-                            ('password', password)]:
+                            ('password', password),
+                            ('timeFormat', timeFormat)]:
             if len(param) != 1:
                 raise HttpException(httpstatus.HTTP_STATUS_CODE_BAD_REQUEST[0],
                                     "Parameter '{0}' has to be unique in "
                                     'request.'.format(name))
 
-        d = self._realm.login(userID[0], robotID[0], password[0])
+        d = self._realm.login(userID[0], robotID[0], password[0],
+                              timeFormat[0])
         d.addCallback(self._authenticate_success)
         d.addErrback(self._authenticate_failed)
         return d
@@ -480,6 +484,16 @@ class RobotWebSocketProtocol(WebSocketServerProtocol):
         """
         self.sendMessage({'data' : msg, 'type' : types.ERROR})
 
+    def sendStatusMessage(self, msg):
+        """ Callback for Connection object to send a status message to the
+            robot using this websocket connection.
+
+            @param msg:         Status message which should be sent to the
+                                robot.
+            @type  msg:         dict
+        """
+        self.sendMessage({'data' : msg, 'type' : types.STATUS})
+
     def onClose(self, wasClean, code, reason):
         """ Method is called by the Autobahn engine when the connection has
             been lost.
@@ -40,7 +40,7 @@
 
         DM      ROS Message
 
-        ST      Status message (currently not used)
+        ST      Status message
         ER      Error message
 """
 
@@ -52,5 +52,5 @@ CONFIGURE_CONNECTION = 'CX'
 
 DATA_MESSAGE = 'DM'
 
-#STATUS = 'ST'
+STATUS = 'ST'
 ERROR = 'ER'
@@ -35,6 +35,7 @@ import os
 import sys
 import stat
 import shutil
+import time
 from random import choice
 from string import letters
 
@@ -56,7 +57,9 @@ except ImportError:
 
 # twisted specific imports
 from twisted.python import log
-from twisted.internet.defer import  DeferredList, succeed
+from twisted.internet.defer import  Deferred, DeferredList, DeferredLock, \
+    succeed, maybeDeferred
+from twisted.internet.task import LoopingCall
 from twisted.spread.pb import Referenceable, PBClientFactory, \
     DeadReferenceError, PBConnectionLost
 
@@ -66,7 +69,9 @@ from rce.util.container import Container
 from rce.util.cred import salter, encodeAES, cipher
 from rce.util.network import isLocalhost
 from rce.util.process import execute
+from rce.util import sysinfo
 from rce.core.error import MaxNumberExceeded
+from rce.nethelper import applyOperations
 # from rce.util.ssl import createKeyCertPair, loadCertFile, loadKeyFile, \
 #    writeCertToFile, writeKeyToFile
 
@@ -95,10 +100,203 @@ def passthrough(f):
     return wrapper
 
 
+class RuleManager(object):
+    """ Manager for the iptables rules which are used to forward ports of the
+        host machine to the containers.
+
+        All rules are kept in a dedicated chain in the NAT table, which is
+        entered once from the chains PREROUTING and OUTPUT. The forwarding
+        rules are distributed over sub-chains according to the forwarded port
+        such that a packet only has to traverse the rules of a single bucket.
+        Changes are not committed immediately; all changes made during the
+        same iteration of the reactor are combined into a single commit of the
+        table.
+    """
+    # CONFIG
+    CHAIN = 'RCE'
+    BUCKET_SIZE = 16
+
+    def __init__(self, reactor, ip):
+        """ Initialize the Rule Manager.
+
+            @param reactor:     Reference to the twisted reactor.
+            @type  reactor:     twisted::reactor
+
+            @param ip:          IP address of the host machine for which the
+                                ports should be forwarded.
+            @type  ip:          str
+        """
+        self._reactor = reactor
+        self._ip = ip
+
+        self._table = table = iptc.Table(iptc.Table.NAT)
+        table.autocommit = False
+
+        self._buckets = {}
+        self._rules = {}
+        self._pending = []
+        self._scheduled = False
+
+        # Remove any leftovers from a previous run
+        self._removeChains()
+
+        self._chain = table.create_chain(self.CHAIN)
+        self._jumps = []
+
+        for name, interface in (('PREROUTING', None), ('OUTPUT', 'lo')):
+            rule = iptc.Rule()
+            rule.protocol = 'tcp'
+            rule.dst = ip
+
+            if interface:
+                rule.out_interface = interface
+
+            rule.create_target(self.CHAIN)
+            iptc.Chain(table, name).insert_rule(rule)
+            self._jumps.append((name, rule))
+
+        table.commit()
+        table.refresh()
+
+    def _removeChains(self):
+        """ Internally used method to remove the dedicated chains including
+            all references to them.
+        """
+        prefix = '{0}-'.format(self.CHAIN)
+
+        for name in ('PREROUTING', 'OUTPUT'):
+            chain = iptc.Chain(self._table, name)
+
+            for rule in chain.rules:
+                if rule.target.name == self.CHAIN:
+                    chain.delete_rule(rule)
+
+        chains = [chain for chain in self._table.chains
+                  if chain.name == self.CHAIN or chain.name.startswith(prefix)]
+
+        for chain in chains:
+            chain.flush()
+
+        for chain in chains:
+            self._table.delete_chain(chain)
+
+    def _getBucket(self, port):
+        """ Internally used method to get the sub-chain which contains the
+            forwarding rule for the given port. Missing sub-chains are created.
+        """
+        key = port // self.BUCKET_SIZE
+
+        try:
+            return self._buckets[key]
+        except KeyError:
+            pass
+
+        start = key * self.BUCKET_SIZE
+        name = '{0}-{1}'.format(self.CHAIN, key)
+        bucket = self._table.create_chain(name)
+
+        rule = iptc.Rule()
+        rule.protocol = 'tcp'
+        m = rule.create_match('tcp')
+        m.dport = '{0}:{1}'.format(start, start + self.BUCKET_SIZE - 1)
+        rule.create_target(name)
+        self._chain.append_rule(rule)
+
+        self._buckets[key] = bucket
+        return bucket
+
+    def addForwarding(self, port, address):
+        """ Forward a port of the host machine to a container. The change is
+            only effective after it has been committed; see 'flush'.
+
+            @param port:        Port of the host machine which should be
+                                forwarded.
+            @type  port:        int
+
+            @param address:     Address of the container to which the port
+                                should be forwarded in the form 'IP:port'.
+            @type  address:     str
+        """
+        if port in self._rules:
+            raise InternalError('Port is already forwarded.')
+
+        # NOTE: can raise iptc.xtables.XTablesError
+        rule = iptc.Rule()
+        rule.protocol = 'tcp'
+        m = rule.create_match('tcp')
+        m.dport = str(port)
+        t = rule.create_target('DNAT')
+        t.to_destination = address
+
+        self._getBucket(port).append_rule(rule)
+        self._rules[port] = rule
+
+    def removeForwarding(self, port):
+        """ Remove the forwarding of a port of the host machine. The change is
+            only effective after it has been committed; see 'flush'.
+
+            @param port:        Port of the host machine which should no
+                                longer be forwarded.
+            @type  port:        int
+        """
+        try:
+            rule = self._rules.pop(port)
+        except KeyError:
+            raise InternalError('Port is not forwarded.')
+
+        self._buckets[port // self.BUCKET_SIZE].delete_rule(rule)
+
+    def flush(self):
+        """ Commit all changes at the end of the current iteration of the
+            reactor. All calls in the same iteration result in a single commit.
+
+            @return:            Deferred which fires as soon as the changes
+                                have been committed.
+            @rtype:             twisted.internet.defer.Deferred
+        """
+        d = Deferred()
+        self._pending.append(d)
+
+        if not self._scheduled:
+            self._scheduled = True
+            self._reactor.callLater(0, self._commit)
+
+        return d
+
+    def _commit(self):
+        """ Internally used method to commit all pending changes.
+        """
+        pending, self._pending = self._pending, []
+        self._scheduled = False
+
+        try:
+            self._table.commit()
+            self._table.refresh()
+        except iptc.IPTCError as e:
+            for d in pending:
+                d.errback(InternalError('Could not commit iptables rules: '
+                                        '{0}'.format(e)))
+        else:
+            for d in pending:
+                d.callback(None)
+
+    def cleanUp(self):
+        """ Method should be called to remove all rules and chains which
+            were created by the manager.
+        """
+        self._removeChains()
+        self._table.commit()
+        self._table.autocommit = True
+
+        self._buckets = None
+        self._rules = None
+        self._chain = None
+
+
 class RCEContainer(Referenceable):
     """ Container representation which is used to run a ROS environment.
     """
-    def __init__(self, client, nr, uid, data):
+    def __init__(self, client, nr, data):
         """ Initialize the deployment container.
 
             @param client:      Container client which is responsible for
@@ -109,32 +307,32 @@ class RCEContainer(Referenceable):
                                 address and the hostname of the container.
             @type  nr:          int
 
-            @param uid:         Unique ID which is used by the environment
-                                process to login to the Master.
-            @type  uid:         str
-
             @param data:        Extra data used to configure the container.
             @type  data:        dict
         """
-        self._client = client
+        # The client is only set when the container has been fully set up
+        # and registered; otherwise, there is nothing to clean up on the
+        # side of the client
+        self._client = None
+        self._confDir = None
+        self._dataDir = None
+
+        self._reactor = client.reactor
+        self._overlay = client.overlay
         self._nr = nr
         self._name = name = 'C{0}'.format(nr)
         self._terminating = None
+        self._uid = None
 
-        # Additional container parameters to use
-        # TODO: At the moment not used; currently data also does not contain
-        #       these information
-#        self._size = data.get('size', 1)
-#        self._cpu = data.get('cpu', 0)
-#        self._memory = data.get('memory', 0)
-#        self._bandwidth = data.get('bandwidth', 0)
-#        self._specialFeatures = data.get('specialFeatures', [])
+        # Host side of the network interface eth0, used for traffic shaping
+        self._veth = 'veth{0}'.format(name)
 
-        client.registerContainer(self)
+        # Last sample of the resource usage (time, CPU time, traffic)
+        self._sample = None
 
         # Create the directories for the container
-        self._confDir = confDir = pjoin(client.confDir, name)
-        self._dataDir = dataDir = pjoin(client.dataDir, name)
+        confDir = pjoin(client.confDir, name)
+        dataDir = pjoin(client.dataDir, name)
 
         if os.path.isdir(confDir):
             raise ValueError('There is already a configuration directory for '
@@ -145,27 +343,50 @@ class RCEContainer(Referenceable):
                              "'{0}'.".format(name))
 
         os.mkdir(confDir)
+        self._confDir = confDir
         os.mkdir(dataDir)
+        self._dataDir = dataDir
+
+        if self._overlay:
+            # All changes of the container are written to the private layer
+            # of a copy-on-write filesystem, which is stored in the data
+            # directory
+            self._container = container = Container(client.reactor,
+                                                    client.rootfs, confDir,
+                                                    name, dataDir)
+            container.makeDirs('opt/rce/data')
+            container.makeDirs('home/ros')
+
+            if client.rosRel > 'fuerte':
+                container.makeDirs('opt/rce/data/.ros/rosdep')
 
-        # Create additional folders for the container
-        rceDir = pjoin(dataDir, 'rce')
-        rosDir = pjoin(dataDir, 'ros')
+            rceDir = rosDir = None
+        else:
+            self._container = container = Container(client.reactor,
+                                                    client.rootfs, confDir,
+                                                    name)
+
+            # Create additional folders for the container
+            rceDir = pjoin(dataDir, 'rce')
+            rosDir = pjoin(dataDir, 'ros')
 
-        os.mkdir(rceDir)
-        os.mkdir(rosDir)
+            os.mkdir(rceDir)
+            os.mkdir(rosDir)
 
-        if client.rosRel > 'fuerte':
-            # TODO: Switch to user 'ros' when the launcher is used again
-            shutil.copytree(pjoin(client.rootfs, 'root/.ros/rosdep'),
-                            pjoin(rceDir, '.ros/rosdep'))
+            if client.rosRel > 'fuerte':
+                # TODO: Switch to user 'ros' when the launcher is used again
+                shutil.copytree(pjoin(client.rootfs, 'root/.ros/rosdep'),
+                                pjoin(rceDir, '.ros/rosdep'))
+
+        self._rceDir = rceDir
 
         # Create network variables
         bridgeIP = client.bridgeIP
         ip = '{0}.{1}'.format(bridgeIP.rsplit('.', 1)[0], nr)
         self._address = '{0}:{1}'.format(ip, client.envPort)
         self._rosproxyAddress = '{0}:{1}'.format(ip, client.rosproxyPort)
-        self._fwdPort = str(nr + 8700)
-        self._rosproxyFwdPort = str(nr + 10700)
+        self._fwdPort = nr + 8700
+        self._rosproxyFwdPort = nr + 10700
 
         ovsname = data.get('name')
         ovsip = data.get('ip')
@@ -181,17 +402,13 @@ class RCEContainer(Referenceable):
         else:
             ovsif = ovsup = ovsdown = None
 
-        # Construct password
-        passwd = encodeAES(cipher(client.masterPassword),
-                           salter(uid, client.infraPassword))
-
         # Create upstart scripts
         upComm = pjoin(confDir, 'upstartComm')
         with open(upComm, 'w') as f:
             f.write(_UPSTART_COMM.format(masterIP=client.masterIP,
                                          masterPort=client.masterPort,
                                          internalPort=client.envPort,
-                                         uid=uid, passwd=passwd))
+                                         options=' '.join(client.envOptions)))
 
         upRosapi = pjoin(confDir, 'upstartRosapi')
         with open(upRosapi, 'w') as f:
@@ -248,20 +465,23 @@ class RCEContainer(Referenceable):
 #            writeCertToFile(cert, os.path.join(rceDir, 'cert.pem'))
 #            writeKeyToFile(key, os.path.join(rceDir, 'key.pem'))
 
-        # Create the container
-        self._container = container = Container(client.reactor, client.rootfs,
-                                                confDir, name)
-
         # Add lxc bridge
-        container.addNetworkInterface('eth0', client.bridgeIF, ip)
+        container.addNetworkInterface('eth0', client.bridgeIF, ip,
+                                      pair=self._veth)
 
         # Add the virtual network bridge if necessary
         if ovsname and ovsip:
             container.addNetworkInterface(ovsif, None, ovsip, ovsup, ovsdown)
 
         # Add additional lines to fstab file of container
-        container.extendFstab(rosDir, 'home/ros', False)
-        container.extendFstab(rceDir, 'opt/rce/data', False)
+        if self._overlay:
+            if client.rosRel > 'fuerte':
+                container.extendFstab(pjoin(client.rootfs, 'root/.ros/rosdep'),
+                                      'opt/rce/data/.ros/rosdep', True)
+        else:
+            container.extendFstab(rosDir, 'home/ros', False)
+            container.extendFstab(rceDir, 'opt/rce/data', False)
+
         container.extendFstab(upComm, 'etc/init/rceComm.conf', True)
         # TODO: For the moment there is no upstart script for the launcher.
 #        container.extendFstab(upLauncher, 'etc/init/rceLauncher.conf', True)
@@ -271,58 +491,126 @@ class RCEContainer(Referenceable):
         for srcPath, destPath in client.pkgDirIter:
             container.extendFstab(srcPath, destPath, True)
 
+        self._client = client
+        client.registerContainer(self)
+
+    @property
+    def assigned(self):
+        """ Flag which is True if the container is assigned to an
+            environment.
+        """
+        return self._uid is not None
+
+    @property
+    def uid(self):
+        """ Unique ID of the environment to which the container is assigned.
+        """
+        return self._uid
+
+    def assign(self, uid):
+        """ Assign the container to an environment. The environment process
+            inside the container waits for the login information before it
+            connects to the Master; therefore, the container can already be
+            started before it is assigned.
+
+            @param uid:         Unique ID which is used by the environment
+                                process to login to the Master.
+            @type  uid:         str
+        """
+        if self._uid:
+            raise InternalError('Container is already assigned.')
+
+        self._uid = uid
+
+        # Construct password
+        passwd = encodeAES(cipher(self._client.masterPassword),
+                           salter(uid, self._client.infraPassword))
+
+        # Write the login information atomically such that the environment
+        # process never reads a partially written file
+        if self._overlay:
+            login = self._container.getPath('opt/rce/data/login')
+        else:
+            login = pjoin(self._rceDir, 'login')
+
+        tmp = '{0}.tmp'.format(login)
+
+        with open(tmp, 'w') as f:
+            f.write('{0} {1}\n'.format(uid, passwd))
+
+        os.chmod(tmp, stat.S_IRUSR | stat.S_IWUSR)
+        os.rename(tmp, login)
+
     def start(self):
         """ Method which starts the container.
         """
-        # NOTE: can raise iptc.xtables.XTablesError
-        # add remote rule for RCE internal communication
-        rule = iptc.Rule()
-        rule.protocol = 'tcp'
-        rule.dst = self._client.internalIP
-        m = rule.create_match('tcp')
-        m.dport = self._fwdPort
-        t = rule.create_target('DNAT')
-        t.to_destination = self._address
-        self._remoteRule = rule
+        rules = self._client.rules
 
-        # add local (loopback) rule for RCE internal communication
-        rule = iptc.Rule()
-        rule.protocol = 'tcp'
-        rule.out_interface = 'lo'
-        rule.dst = self._client.internalIP
-        m = rule.create_match('tcp')
-        m.dport = self._fwdPort
-        t = rule.create_target('DNAT')
-        t.to_destination = self._address
-        self._localRule = rule
+        # add rule for RCE internal communication
+        rules.addForwarding(self._fwdPort, self._address)
 
-        # add remote rule for rosproxy
-        rule = iptc.Rule()
-        rule.protocol = 'tcp'
-        rule.dst = self._client.internalIP
-        m = rule.create_match('tcp')
-        m.dport = self._rosproxyFwdPort
-        t = rule.create_target('DNAT')
-        t.to_destination = self._rosproxyAddress
-        self._rosremoteRule = rule
+        # add rule for rosproxy
+        rules.addForwarding(self._rosproxyFwdPort, self._rosproxyAddress)
 
-        # add local(loopback) rule for rosproxy
-        rule = iptc.Rule()
-        rule.protocol = 'tcp'
-        rule.out_interface = 'lo'
-        rule.dst = self._client.internalIP
-        m = rule.create_match('tcp')
-        m.dport = self._rosproxyFwdPort
-        t = rule.create_target('DNAT')
-        t.to_destination = self._rosproxyAddress
-        self._roslocalRule = rule
+        d = rules.flush()
+        d.addCallback(lambda _: self._container.start(self._name))
+        return d
+
+    def limit(self, data):
+        """ Limit the resources which can be used by the running container.
+
+            @param data:        Extra data used to configure the container.
+                                The keys 'cpu' (percent of a single core),
+                                'memory' (MB), and 'bandwidth' (kbit/s) define
+                                the limits; missing or zero values disable
+                                the corresponding limit.
+            @type  data:        dict
+
+            @return:            Deferred whose callback is triggered once all
+                                limits have been applied.
+            @rtype:             twisted.internet.defer.Deferred
+        """
+        d = self._container.setLimits(self._name, data.get('cpu', 0),
+                                      data.get('memory', 0))
+
+        bandwidth = data.get('bandwidth', 0)
+
+        if bandwidth:
+            d.addCallback(lambda _: self._client.shapeTraffic(self._veth,
+                                                              bandwidth))
+
+        return d
+
+    def sampleUsage(self, now):
+        """ Get the resources which have been used by the container since the
+            last call of this method.
+
+            @param now:         Current time in seconds.
+            @type  now:         float
+
+            @return:            Tuple containing the average CPU usage in
+                                percent of a single core, the currently used
+                                memory in MB, and the average network traffic
+                                in kbit/s, or None if there is no previous
+                                sample available.
+            @rtype:             (float, float, float)
+        """
+        try:
+            cpu, memory, traffic = self._container.getUsage(self._name)
+        except (IOError, ValueError):
+            # Container is not (yet) running
+            self._sample = None
+            return None
 
-        self._client.prerouting.insert_rule(self._remoteRule)
-        self._client.output.insert_rule(self._localRule)
-        self._client.prerouting.insert_rule(self._rosremoteRule)
-        self._client.output.insert_rule(self._roslocalRule)
+        last, self._sample = self._sample, (now, cpu, traffic)
 
-        return self._container.start(self._name)
+        if not last or now <= last[0]:
+            return None
+
+        interval = now - last[0]
+        return ((cpu - last[1]) / (interval * 1e7),
+                memory / 1048576.0,
+                (traffic - last[2]) * 8 / (interval * 1e3))
 
     def remote_getPort(self):
         """ Get the port which can be used together with the host IP address
@@ -332,17 +620,18 @@ class RCEContainer(Referenceable):
                                 forwarded to the container.
             @rtype:             int
         """
-        return int(self._fwdPort)
+        return self._fwdPort
 
     def _stop(self):
         """ Method which stops the container.
         """
-        self._client.prerouting.delete_rule(self._remoteRule)
-        self._client.output.delete_rule(self._localRule)
-        self._client.prerouting.delete_rule(self._rosremoteRule)
-        self._client.output.delete_rule(self._roslocalRule)
+        rules = self._client.rules
+        rules.removeForwarding(self._fwdPort)
+        rules.removeForwarding(self._rosproxyFwdPort)
 
-        return self._container.stop(self._name)
+        d = rules.flush()
+        d.addCallback(lambda _: self._container.stop(self._name))
+        return d
 
     def _destroy(self):
         """ Internally used method to clean up after the container has been
@@ -358,7 +647,17 @@ class RCEContainer(Referenceable):
             self._confDir = None
 
         if self._dataDir:
-            shutil.rmtree(self._dataDir, True)
+            if self._overlay:
+                # The copy-on-write filesystem has already been unmounted;
+                # after renaming the data directory the container number can
+                # be reused and the private layer is removed in the background
+                trash = '{0}.{1}'.format(self._dataDir, randomString(8))
+                os.rename(self._dataDir, trash)
+                d = execute(('/bin/rm', '-rf', trash), reactor=self._reactor)
+                d.addErrback(lambda f: log.msg(f.getErrorMessage()))
+            else:
+                shutil.rmtree(self._dataDir, True)
+
             self._dataDir = None
 
     def remote_destroy(self):
@@ -385,6 +684,11 @@ class ContainerClient(Referenceable):
     """
     _UID_LEN = 8
 
+    # CONFIG
+    TELEMETRY_FULL = 30
+    TC_LATENCY = '400ms'
+    TC_MIN_BURST = 1600
+
     def __init__(self, reactor, masterIP, masterPort, masterPasswd, infraPasswd,
                  bridgeIF, intIP, bridgeIP, envPort, rosproxyPort, rootfsDir,
                  confDir, dataDir, pkgDir, ubuntuRel, rosRel, data):
@@ -462,6 +766,18 @@ class ContainerClient(Referenceable):
             @type  rosRel:          str
 
             @param data:            More data about the machine configuration.
+                                    The key 'pool' defines the number of
+                                    unassigned containers which should be
+                                    kept running, the key 'netHelper' the
+                                    path to the socket of the network helper,
+                                    the key 'telemetry' the interval in
+                                    seconds in which the telemetry is pushed
+                                    to the Master, the key 'forkServer'
+                                    whether Python nodes are forked by a fork
+                                    server in the environment process, and
+                                    the key 'preload' the message/service
+                                    types which are loaded at the startup of
+                                    the environment process.
             @type  data:            dict
         """
         self._reactor = reactor
@@ -495,6 +811,26 @@ class ContainerClient(Referenceable):
         self._nrs = set(range(100, 200))
         self._containers = set()
 
+        # Pool of started containers which are not yet assigned
+        self._pool = []
+        self._poolSize = data.get('pool', 0)
+
+        # Use copy-on-write filesystems for the containers
+        self._overlay = data.get('overlay', False)
+
+        # Additional command line options for the environment process
+        self._envOptions = []
+
+        if data.get('forkServer'):
+            self._envOptions.append('--fork-server')
+
+        if data.get('preload'):
+            self._envOptions.append('--preload')
+            self._envOptions.append(','.join(data['preload']))
+
+        self._warming = 0
+        self._terminating = False
+
         # Network configuration
         self._bridgeIF = bridgeIF
         self._bridgeIP = bridgeIP
@@ -502,51 +838,35 @@ class ContainerClient(Referenceable):
         # Virtual network
         self._bridges = set()
         self._uid = {}
+        self._helper = None
 
-        # Physical parameters of machine
-        # TODO: Is a human settings at this time,
-        #       rce.util.sysinfo should fill this role soon
-        self._size = data.get('size')
-        self._cpu = data.get('cpu')
-        self._memeory = data.get('memory')
-        self._bandwidth = data.get('bandwidth')
-        self._specialFeatures = data.get('special_features')
-
-        # Common iptables references
-        nat = iptc.Table(iptc.Table.NAT)
-        self._prerouting = iptc.Chain(nat, 'PREROUTING')
-        self._output = iptc.Chain(nat, 'OUTPUT')
+        # Batches have to be applied one at a time as each batch is
+        # validated against the state left by the previous batches
+        self._networkLock = DeferredLock()
 
-    def remote_getSysinfo(self, request):
-        """ Get realtime Sysinfo data from machine.
-
-            @param request:     data desired
-            @type  request:     # TODO: Add type
-
-            @return:            # TODO: What?
-            @rtype:             # TODO: Add type
-        """
-        # TODO : replace these calls with call to rce.util.sysinfo
-        response_table = {
-            'size':self._size,
-            'cpu':self._cpu,
-            'memory': self._memeory,
-            'bandwidth': self._bandwidth,
-            # 'keyword': some value or function to provide the data
-        }
+        helperPath = data.get('netHelper')
 
-        return response_table[request]
+        if helperPath:
+            factory = PBClientFactory()
+            reactor.connectUNIX(helperPath, factory)
+            factory.getRootObject().addCallbacks(self._helperConnected,
+                                                 self._helperFailed)
 
-    def remote_setSysinfo(self, request, value):
-        """ Set some system parameter to the machine.
+        # Port forwarding to the containers
+        self._rules = RuleManager(reactor, intIP)
 
-            @param request:     data desired
-            @type  request:     # TODO: Add type
+        # Telemetry which is periodically pushed to the Master
+        self._avatar = None
+        self._sampler = sysinfo.Sampler()
+        self._reported = {}
+        self._reports = 0
+        self._telemetry = LoopingCall(self._pushTelemetry)
+        self._telemetry.clock = reactor
+        reactor.callWhenRunning(self._telemetry.start,
+                                data.get('telemetry', 10), False)
 
-            @param value:       data value
-            @type  value:       # TODO: Add type
-        """
-        raise NotImplementedError
+        if self._poolSize:
+            reactor.callWhenRunning(self._fillPool)
 
     @property
     def reactor(self):
@@ -592,6 +912,18 @@ class ContainerClient(Referenceable):
         """ Filesystem path of temporary data directory. """
         return self._dataDir
 
+    @property
+    def envOptions(self):
+        """ Additional command line options for the environment process. """
+        return self._envOptions
+
+    @property
+    def overlay(self):
+        """ Flag which is True if the containers use copy-on-write
+            filesystems.
+        """
+        return self._overlay
+
     @property
     def pkgDirIter(self):
         """ Iterator over all file system paths of package directories. """
@@ -638,14 +970,9 @@ class ContainerClient(Referenceable):
         return self._infraPasswd
 
     @property
-    def prerouting(self):
-        """ Reference to iptables' chain PREROUTING of the table NAT. """
-        return self._prerouting
-
-    @property
-    def output(self):
-        """ Reference to iptables' chain OUTPUT of the table NAT. """
-        return self._output
+    def rules(self):
+        """ Manager of the iptables rules used for the port forwarding. """
+        return self._rules
 
     def remote_createContainer(self, uid, data):
         """ Create a new Container.
@@ -662,113 +989,250 @@ class ContainerClient(Referenceable):
             @return:            New Container instance.
             @rtype:             rce.container.RCEContainer
         """
+        # Containers which are part of a network group need an additional
+        # network interface which can only be added before the start
+        if self._pool and not (data.get('name') and data.get('ip')):
+            container = self._pool.pop()
+            container.assign(uid)
+            self._reactor.callLater(0, self._fillPool)
+            d = container.limit(data)
+            d.addErrback(self._containerFailed, container)
+            return d.addCallback(lambda _: container)
+
         try:
             nr = self._nrs.pop()
         except KeyError:
             raise MaxNumberExceeded('Can not manage any additional container.')
 
-        container = RCEContainer(self, nr, uid, data)
-        return container.start().addCallback(lambda _: container)
+        try:
+            container = RCEContainer(self, nr, data)
+        except Exception:
+            self._nrs.add(nr)
+            raise
+
+        container.assign(uid)
+        d = container.start()
+        d.addCallback(lambda _: container.limit(data))
+        d.addErrback(self._containerFailed, container)
+        return d.addCallback(lambda _: container)
+
+    def _containerFailed(self, failure, container):
+        """ Internally used method to destroy a container which could not be
+            set up for a request; the failure is passed on to the caller.
+        """
+        container.remote_destroy()
+        return failure
 
-    def registerContainer(self, container):
-        assert container not in self._containers
-        self._containers.add(container)
+    def _fillPool(self):
+        """ Internally used method to start new unassigned containers in the
+            background until the pool has reached its target size.
+        """
+        while (not self._terminating and self._nrs and
+               len(self._pool) + self._warming < self._poolSize):
+            nr = self._nrs.pop()
 
-    def remote_createBridge(self, name):
-        """ Create a new OVS Bridge.
+            try:
+                container = RCEContainer(self, nr, {})
+            except ValueError as e:
+                self._nrs.add(nr)
+                log.msg('Could not create a container for the pool: '
+                        '{0}'.format(e))
+                break
 
-            @param name:        Unique name of the network group.
-            @type  name:        str
+            self._warming += 1
+            d = maybeDeferred(container.start)
+            d.addCallbacks(self._poolContainerStarted,
+                           self._poolContainerFailed,
+                           callbackArgs=(container,),
+                           errbackArgs=(container,))
 
-            @return:            Exit status of command.
-            @rtype:             twisted.internet.defer.Deferred
-        """
-        if name in self._bridges:
-            raise InternalError('Bridge already exists.')
+    def _poolContainerStarted(self, _, container):
+        self._warming -= 1
 
-        self._bridges.add(name)
-        return execute(('/usr/bin/ovs-vsctl', '--', '--may-exist', 'add-br',
-                        'br-{0}'.format(name)), reactor=self._reactor)
+        if not self._terminating:
+            self._pool.append(container)
 
-    def remote_destroyBridge(self, name):
-        """ Destroy a OVS Bridge.
+    def _poolContainerFailed(self, failure, container):
+        self._warming -= 1
+        log.msg('Could not start a container for the pool: '
+                '{0}'.format(failure.getErrorMessage()))
+        container.remote_destroy()
 
-            @param name:        Unique name of the network group.
-            @type  name:        str
+    def registerContainer(self, container):
+        assert container not in self._containers
+        self._containers.add(container)
 
-            @return:            Exit status of command.
+    def remote_configureNetwork(self, ops):
+        """ Apply a batch of changes to the virtual network. All changes are
+            applied in a single OVS transaction, i.e. either all or none of
+            them are applied.
+
+            @param ops:         Changes which should be applied in the given
+                                order. Each change is a tuple of the form
+                                    ('createBridge', name)
+                                    ('destroyBridge', name)
+                                    ('createTunnel', name, targetIP)
+                                    ('destroyTunnel', name, targetIP)
+                                where name is the unique name of the network
+                                group and targetIP is the target IP for the
+                                GRE Tunnel.
+            @type  ops:         [ tuple ]
+
+            @return:            Result of each operation. For the format see
+                                rce.nethelper.applyOperations.
             @rtype:             twisted.internet.defer.Deferred
         """
-        if name not in self._bridges:
-            raise InternalError('Bridge does not exist.')
+        return self._networkLock.run(self._configureNetwork, ops)
 
-        self._bridges.remove(name)
-        return execute(('/usr/bin/ovs-vsctl', 'del-br',
-                        'br-{0}'.format(name)), reactor=self._reactor)
+    def _configureNetwork(self, ops):
+        """ Internally used method to apply a batch of changes to the
+            virtual network. (Has to be called while holding the network
+            lock; use remote_configureNetwork instead.)
+        """
+        bridges = set(self._bridges)
+        tunnels = dict(self._uid)
+        cmd = []
 
+        for op in ops:
+            name = op[1]
 
-    def remote_createTunnel(self, name, targetIP):
-        """ Create a new GRE Tunnel.
+            if op[0] == 'createBridge':
+                if name in bridges:
+                    raise InternalError('Bridge already exists.')
 
-            @param name:        Unique name of the network group.
-            @type  name:        str
+                bridges.add(name)
+                cmd.append(('--may-exist', 'add-br', 'br-{0}'.format(name)))
+            elif op[0] == 'destroyBridge':
+                if name not in bridges:
+                    raise InternalError('Bridge does not exist.')
 
-            @param targetIP:    Target IP for the GRE Tunnel.
-            @type  targetIP:    str
+                bridges.remove(name)
+                cmd.append(('del-br', 'br-{0}'.format(name)))
+            elif op[0] == 'createTunnel':
+                key = (name, op[2])
 
-            @return:            Exit status of command.
-            @rtype:             twisted.internet.defer.Deferred
-        """
-        if name not in self._bridges:
-            raise InternalError('Bridge does not exist.')
+                if name not in bridges:
+                    raise InternalError('Bridge does not exist.')
 
-        key = (name, targetIP)
+                if key in tunnels:
+                    raise InternalError('Tunnel already exists.')
 
-        if key in self._uid:
-            raise InternalError('Tunnel already exists.')
+                while 1:
+                    uid = randomString(self._UID_LEN)
 
-        while 1:
-            uid = randomString(self._UID_LEN)
+                    if uid not in tunnels.itervalues():
+                        break
 
-            if uid not in self._uid.itervalues():
-                break
+                tunnels[key] = uid
+                port = 'gre-{0}'.format(uid)
+                cmd.append(('add-port', 'br-{0}'.format(name), port,
+                            '--', 'set', 'interface', port, 'type=gre',
+                            'options:remote_ip={0}'.format(op[2])))
+            elif op[0] == 'destroyTunnel':
+                key = (name, op[2])
+
+                if name not in bridges:
+                    raise InternalError('Bridge does not exist.')
 
-        self._uid[key] = uid
-        port = 'gre-{0}'.format(uid)
+                if key not in tunnels:
+                    raise InternalError('Tunnel does not exist.')
 
-        return execute(('/usr/bin/ovs-vsctl', 'add-port', 'br-{0}'.format(name),
-                        port, '--', 'set', 'interface', port, 'type=gre',
-                        'options:remote_ip={0}'.format(targetIP)),
-                       reactor=self._reactor)
+                cmd.append(('del-port', 'gre-{0}'.format(tunnels.pop(key))))
+            else:
+                raise InternalError('Invalid network operation.')
+
+        def cb(results):
+            # ovs-vsctl applies the whole batch or nothing; therefore, the
+            # bookkeeping is only updated after the batch succeeded
+            self._bridges = bridges
+            self._uid = tunnels
+            return results
 
-    def remote_destroyTunnel(self, name, targetIP):
-        """ Destroy a GRE Tunnel.
+        d = self._applyNetworkOperations([('ovs-vsctl', args)
+                                          for args in cmd])
+        return d.addCallback(cb)
 
-            @param name:        Unique name of the network group.
-            @type  name:        str
+    def shapeTraffic(self, iface, bandwidth):
+        """ Limit the bandwidth of the network interface of a container. The
+            traffic sent to the container is shaped using a token bucket
+            filter and the traffic received from the container is policed.
 
-            @param targetIP:    Target IP for the GRE Tunnel.
-            @type  targetIP:    str
+            @param iface:       Name of the host side of the network interface
+                                of the container.
+            @type  iface:       str
 
-            @return:            Exit status of command.
+            @param bandwidth:   Bandwidth limit in each direction in kbit/s.
+            @type  bandwidth:   int
+
+            @return:            Result of each operation. For the format see
+                                rce.nethelper.applyOperations.
             @rtype:             twisted.internet.defer.Deferred
         """
-        if name not in self._bridges:
-            raise InternalError('Bridge does not exist.')
+        rate = '{0}kbit'.format(bandwidth)
+
+        # Bucket size of 10ms of traffic, but at least a full frame
+        burst = str(max(self.TC_MIN_BURST, bandwidth * 125 // 100))
+
+        return self._applyNetworkOperations([
+            ('tc', ('qdisc', 'replace', 'dev', iface, 'root', 'tbf',
+                    'rate', rate, 'burst', burst,
+                    'latency', self.TC_LATENCY)),
+            ('tc', ('qdisc', 'add', 'dev', iface, 'ingress')),
+            ('tc', ('filter', 'add', 'dev', iface, 'parent', 'ffff:',
+                    'protocol', 'all', 'u32', 'match', 'u32', '0', '0',
+                    'police', 'rate', rate, 'burst', burst, 'drop',
+                    'flowid', ':1'))
+        ])
+
+    def _applyNetworkOperations(self, ops):
+        """ Internally used method to apply network operations using the
+            network helper if it is available.
+        """
+        if self._helper:
+            d = self._helper.callRemote('apply', ops)
+        else:
+            d = applyOperations(self._reactor, ops)
+
+        return d.addCallback(self._checkNetworkResults)
+
+    def _checkNetworkResults(self, results):
+        """ Internally used method to check the results of the network
+            operations.
+        """
+        for success, msg, _ in results:
+            if not success:
+                raise InternalError('Network configuration failed: '
+                                    '{0}'.format(msg))
+
+        return results
 
-        key = (name, targetIP)
+    def _helperConnected(self, ref):
+        """ Internally used method which is called when the connection to
+            the network helper has been established.
+        """
+        self._helper = ref
+        ref.notifyOnDisconnect(self._helperDisconnected)
 
-        if key not in self._uid:
-            raise InternalError('Tunnel deos not exist.')
+    def _helperDisconnected(self, _):
+        log.msg('Connection to network helper lost; network operations are '
+                'applied by the container process.')
+        self._helper = None
 
-        return execute(('/usr/bin/ovs-vsctl', 'del-port',
-                        'gre-{0}'.format(self._uid.pop(key))),
-                       reactor=self._reactor)
+    def _helperFailed(self, failure):
+        log.msg('Could not connect to network helper: '
+                '{0}'.format(failure.getErrorMessage()))
 
     def unregisterContainer(self, container):
         assert container in self._containers
         self._containers.remove(container)
 
+        if container in self._pool:
+            self._pool.remove(container)
+
+        # The Master does not know about containers from the pool
+        if not container.assigned:
+            return
+
         def eb(failure):
             if not failure.check(PBConnectionLost):
                 log.err(failure)
@@ -778,6 +1242,78 @@ class ContainerClient(Referenceable):
         except (DeadReferenceError, PBConnectionLost):
             pass
 
+    def _sampleHost(self):
+        """ Internally used method to get the resources which are used by the
+            host machine since the last call of this method.
+
+            For the description of the return value see
+            rce.container.RCEContainer.sampleUsage.
+        """
+        sample = self._sampler.sample()
+
+        # The container traffic is also counted on the physical interfaces
+        traffic = sum(rate.bytes_sent + rate.bytes_recv for name, rate in
+                      sample.net_io.iteritems()
+                      if name not in ('lo', self._bridgeIF) and
+                         not name.startswith('veth'))
+
+        return (sample.cpu_percent * sysinfo.NUM_CPUS,
+                (sample.mem.total - sample.mem.available) / 1048576.0,
+                traffic * 8 / 1e3)
+
+    def _pushTelemetry(self):
+        """ Internally used method to push the resources used by the host
+            machine and by the assigned containers to the Master.
+
+            Only the values which have changed since the last push are sent;
+            every TELEMETRY_FULL pushes all values are sent to keep the Master
+            in sync.
+        """
+        if not self._avatar:
+            return
+
+        now = time.time()
+        samples = {}
+
+        samples['host'] = self._sampleHost()
+
+        for container in self._containers:
+            if container.assigned:
+                sample = container.sampleUsage(now)
+
+                if sample:
+                    samples[container.uid] = sample
+
+        # Rounding suppresses changes which are only noise
+        samples = dict((key, tuple(int(round(value)) for value in sample))
+                       for key, sample in samples.iteritems())
+
+        full = not self._reports % self.TELEMETRY_FULL
+        self._reports += 1
+
+        if full:
+            delta = samples
+        else:
+            delta = dict((key, sample) for key, sample in samples.iteritems()
+                         if self._reported.get(key) != sample)
+            delta.update((key, None) for key in self._reported
+                         if key not in samples)
+
+        self._reported = samples
+
+        if not (delta or full):
+            return
+
+        def eb(failure):
+            if not failure.check(PBConnectionLost):
+                log.err(failure)
+
+        try:
+            d = self._avatar.callRemote('reportTelemetry', delta, full)
+            d.addErrback(eb)
+        except (DeadReferenceError, PBConnectionLost):
+            pass
+
     def returnNr(self, nr):
         """ Callback for Container to return a container number when it is
             no longer in use such that it can be reused.
@@ -793,14 +1329,22 @@ class ContainerClient(Referenceable):
         for _, path in self._pkgDir:
             os.rmdir(os.path.join(self._rootfs, path))
 
+        self._rules.cleanUp()
+
         assert len(self._containers) == 0
 
     def terminate(self):
         """ Method should be called to terminate all running containers before
             the reactor is stopped.
         """
+        self._terminating = True
         deferreds = []
 
+        if self._telemetry.running:
+            self._telemetry.stop()
+
+        self._sampler.close()
+
         for container in self._containers.copy():
             deferreds.append(container.remote_destroy())
 
@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-core/rce/core/autoscale.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+# Python specific imports
+from math import ceil
+
+# twisted specific imports
+from twisted.python import log
+from twisted.python.failure import Failure
+from twisted.internet.task import LoopingCall
+
+# rce specific imports
+from rce.util.error import InternalError
+
+
+class Autoscaler(object):
+    """ The Autoscaler adds and removes machines using an IaaS hook depending
+        on the demand of the Load Balancer.
+
+        Containers which do not fit in any machine are queued while new
+        instances are spun up instead of being rejected. Additionally, a
+        number of idle machines is kept as headroom for bursts and machines
+        which were started by the Autoscaler and are idle for longer than the
+        idle timeout are spun down again.
+    """
+    # CONFIG
+    CHECK_INTERVAL = 10
+    QUEUE_TIMEOUT = 300
+    SPIN_UP_TIMEOUT = 600
+
+    def __init__(self, reactor, balancer, hook, headroom=0, idleTimeout=600):
+        """ Initialize the Autoscaler.
+
+            @param reactor:     Reference to the twisted reactor.
+            @type  reactor:     twisted::reactor
+
+            @param balancer:    Load Balancer whose demand should be covered.
+            @type  balancer:    rce.core.machine.LoadBalancer
+
+            @param hook:        IaaS hook which is used to start and stop the
+                                instances.
+            @type  hook:        rce.util.iaas.IaasHook
+
+            @param headroom:    Number of idle machines which should be kept
+                                running.
+            @type  headroom:    int
+
+            @param idleTimeout: Time in seconds after which an idle machine
+                                started by the Autoscaler is spun down.
+            @type  idleTimeout: int
+        """
+        self._reactor = reactor
+        self._balancer = balancer
+        self._hook = hook
+        self._headroom = headroom
+        self._idleTimeout = idleTimeout
+
+        # Containers waiting for a machine: [(container, uid, timestamp)]
+        self._queue = []
+
+        # Machines which are registered with the Load Balancer: {ip : machine}
+        self._machines = {}
+        self._idleSince = {}
+        self._draining = set()
+        self._instanceSize = 1
+
+        # Instances which have been requested from the IaaS hook
+        self._requested = 0
+        self._expected = {}
+        self._instances = set()
+
+        self._loop = LoopingCall(self._check)
+        self._loop.clock = reactor
+
+    @property
+    def booting(self):
+        """ Number of instances which have been requested but whose container
+            process has not yet logged in.
+        """
+        return self._requested + len(self._expected)
+
+    def start(self):
+        """ Start the periodic check of the demand.
+        """
+        self._loop.start(self.CHECK_INTERVAL, now=True)
+
+    def stop(self):
+        """ Stop the Autoscaler, reject all queued containers, and disconnect
+            the IaaS hook.
+        """
+        if self._loop.running:
+            self._loop.stop()
+
+        queue, self._queue = self._queue, []
+
+        for container, _, _ in queue:
+            container.dontNotifyOnDeath(self._dropped)
+            container.errback(Failure(InternalError('Container can not be '
+                                                    'created.')))
+
+        self._hook.disconnect()
+        self._instances = set()
+
+    def enqueue(self, container, uid):
+        """ Queue a container which did not fit in any machine until a new
+            machine is available.
+
+            @param container:   Container which should be created.
+            @type  container:   rce.core.container.Container
+
+            @param uid:         Unique ID which is used to identify the
+                                environment process.
+            @type  uid:         str
+        """
+        self._queue.append((container, uid, self._reactor.seconds()))
+        container.notifyOnDeath(self._dropped)
+        self._scale()
+
+    def machineAdded(self, machine):
+        """ Callback for the Load Balancer to inform the Autoscaler that a new
+            machine has been registered.
+
+            @param machine:     Machine which has been registered.
+            @type  machine:     rce.core.machine.Machine
+        """
+        ip = machine.IP
+        self._machines[ip] = machine
+        self._expected.pop(ip, None)
+
+        if machine.size:
+            self._instanceSize = max(self._instanceSize, machine.size)
+
+        self.machineUpdated(machine)
+        self._drain()
+        self._scale()
+
+    def machineRemoved(self, machine):
+        """ Callback for the Load Balancer to inform the Autoscaler that a
+            machine has been unregistered.
+
+            @param machine:     Machine which has been unregistered.
+            @type  machine:     rce.core.machine.Machine
+        """
+        ip = machine.IP
+        self._machines.pop(ip, None)
+        self._idleSince.pop(machine, None)
+
+        if machine in self._draining:
+            self._draining.remove(machine)
+        elif ip in self._instances:
+            # The container process of an instance which was started by the
+            # Autoscaler died; make sure the instance does not keep running
+            log.msg('Container process of instance {0} lost.'.format(ip))
+            self._spinDown(ip)
+
+    def machineUpdated(self, machine):
+        """ Callback for the Load Balancer to inform the Autoscaler that the
+            containers of a machine have changed.
+
+            @param machine:     Machine which has been changed.
+            @type  machine:     rce.core.machine.Machine
+        """
+        if machine.active:
+            self._idleSince.pop(machine, None)
+        else:
+            self._idleSince.setdefault(machine, self._reactor.seconds())
+
+    def _dropped(self, container):
+        """ Internally used method which is called when a queued container is
+            destroyed before it could be assigned to a machine.
+        """
+        self._queue = [entry for entry in self._queue
+                       if entry[0] is not container]
+
+    def _drain(self):
+        """ Internally used method to assign the queued containers to the
+            available machines.
+        """
+        queue, self._queue = self._queue, []
+
+        for entry in queue:
+            container, uid, _ = entry
+
+            if self._balancer.placeContainer(container, uid):
+                container.dontNotifyOnDeath(self._dropped)
+            else:
+                self._queue.append(entry)
+
+    def _scale(self):
+        """ Internally used method to spin up new instances if the queued
+            containers and the headroom are not covered by the instances which
+            are already booting.
+        """
+        demand = sum(container.size for container, _, _ in self._queue)
+        needed = int(ceil(demand / float(self._instanceSize)))
+
+        idle = len(self._idleSince) - len(self._draining)
+        needed += max(0, self._headroom - idle)
+        needed -= self.booting
+
+        if needed > 0:
+            features = set()
+
+            for container, _, _ in self._queue:
+                features.update(container.specialFeatures)
+
+            self._spinUp(needed, list(features) or None)
+
+    def _spinUp(self, count, specialRequest):
+        """ Internally used method to request new instances.
+        """
+        self._requested += count
+
+        def cb(ips):
+            self._requested -= count
+            now = self._reactor.seconds()
+
+            for ip in ips:
+                self._instances.add(ip)
+
+                if ip not in self._machines:
+                    self._expected[ip] = now
+
+            log.msg('Spun up {0} instance(s): {1}'.format(len(ips),
+                                                          ', '.join(ips)))
+
+        def eb(failure):
+            self._requested -= count
+            log.msg('Instances could not be spun up: '
+                    '{0}'.format(failure.getErrorMessage()))
+
+        self._hook.spin_up(count, specialRequest=specialRequest).addCallbacks(
+                                                                        cb, eb)
+
+    def _spinDown(self, ip):
+        """ Internally used method to stop an instance.
+        """
+        def eb(failure):
+            log.msg('Instance {0} could not be spun down: '
+                    '{1}'.format(ip, failure.getErrorMessage()))
+
+        self._instances.discard(ip)
+        self._hook.spin_down(ip).addErrback(eb)
+
+    def _check(self):
+        """ Internally used method which is called periodically to expire
+            queued containers and booting instances and to spin down idle
+            machines.
+        """
+        now = self._reactor.seconds()
+
+        # Reject containers which waited too long for a machine
+        queue, self._queue = self._queue, []
+
+        for entry in queue:
+            container, _, timestamp = entry
+
+            if now - timestamp > self.QUEUE_TIMEOUT:
+                container.dontNotifyOnDeath(self._dropped)
+                container.errback(Failure(InternalError('Container can not be '
+                                                        'created.')))
+            else:
+                self._queue.append(entry)
+
+        # Give up on instances whose container process never logged in
+        for ip, timestamp in self._expected.items():
+            if now - timestamp > self.SPIN_UP_TIMEOUT:
+                log.msg('Instance {0} did not log in.'.format(ip))
+                del self._expected[ip]
+                self._spinDown(ip)
+
+        # Spin down idle machines which were started by the Autoscaler, while
+        # keeping the headroom
+        spare = len(self._idleSince) - len(self._draining) - self._headroom
+        idle = sorted(((timestamp, machine) for machine, timestamp
+                       in self._idleSince.iteritems()
+                       if machine not in self._draining),
+                      key=lambda entry: entry[0])
+
+        for timestamp, machine in idle:
+            if spare <= 0 or now - timestamp <= self._idleTimeout:
+                break
+
+            if machine.IP in self._instances:
+                spare -= 1
+                self._draining.add(machine)
+                self._balancer.retireMachine(machine)
+                self._spinDown(machine.IP)
+
+        self._scale()
@@ -37,6 +37,7 @@ from twisted.internet.defer import Deferred, succeed
 # rce specific imports
 from rce.core.base import Proxy
 from rce.util.error import InternalError
+from rce.core.error import InvalidRequest
 
 
 class Container(Proxy):
@@ -65,10 +66,19 @@ class Container(Proxy):
         self._memory = data.pop('memory', 0)
         self._bandwidth = data.pop('bandwidth', 0)
         self._specialFeatures = data.pop('specialFeatures', [])
+        self._antiAffinity = data.pop('antiAffinity', False)
+        self._priority = data.pop('priority', 'normal')
+
+        if self._priority not in ('high', 'normal', 'low'):
+            raise InvalidRequest("Container priority has to be either 'high', "
+                                 "'normal', or 'low'.")
 
         self._pending = set()
         self._address = None
 
+        self._status = None
+        self._statusCbs = set()
+
     @property
     def size(self):
         """ # TODO: Add doc """
@@ -76,17 +86,18 @@ class Container(Proxy):
 
     @property
     def cpu(self):
-        """ # TODO: Add doc """
+        """ CPU time reserved for the container in percent of a single core.
+        """
         return self._cpu
 
     @property
     def memory(self):
-        """ # TODO: Add doc """
+        """ Memory reserved for the container in MB. """
         return self._memory
 
     @property
     def bandwidth(self):
-        """ # TODO: Add doc """
+        """ Network bandwidth reserved for the container in kbit/s. """
         return self._bandwidth
 
     @property
@@ -94,11 +105,30 @@ class Container(Proxy):
         """ # TODO: Add doc """
         return self._specialFeatures
 
+    @property
+    def antiAffinity(self):
+        """ Flag which is True if the container should not be placed in a
+            machine which already hosts containers of the same user.
+        """
+        return self._antiAffinity
+
+    @property
+    def priority(self):
+        """ Priority class which is used to schedule the creation of the
+            container.
+        """
+        return self._priority
+
     @property
     def userID(self):
         """ # TODO: Add doc """
         return self._userID
 
+    @property
+    def group(self):
+        """ Network group to which the container belongs. """
+        return self._group
+
     @property
     def machine(self):
         """ Reference to the machine proxy in which the container resides. """
@@ -109,7 +139,8 @@ class Container(Proxy):
         """ Property is used to store the relevant container information for
             the container process.
         """
-        return {'name':self._group.name, 'ip':self._ip}
+        return {'name':self._group.name, 'ip':self._ip, 'cpu':self._cpu,
+                'memory':self._memory, 'bandwidth':self._bandwidth}
 
     def assignMachine(self, machine):
         """ # TODO: Add doc
@@ -123,6 +154,37 @@ class Container(Proxy):
         self._group.registerContainer(self)
         machine.registerContainer(self)
 
+    def setStatus(self, status, info=None):
+        """ Update the status of the creation of the container.
+
+            @param status:      New status, i.e. 'queued', 'creating',
+                                'created', or 'failed'.
+            @type  status:      str
+
+            @param info:        Additional information about the status.
+            @type  info:        dict
+        """
+        self._status = (status, info or {})
+
+        for cb in self._statusCbs.copy():
+            cb(self, *self._status)
+
+    def notifyOnStatus(self, cb):
+        """ Register a callback which will be called whenever the status of
+            the container changes. If the container already has a status the
+            callback is called immediately.
+
+            @param cb:          Callback which should be registered. It should
+                                take this instance, the status, and the
+                                additional information as arguments.
+            @type  cb:          callable
+        """
+        assert callable(cb)
+        self._statusCbs.add(cb)
+
+        if self._status:
+            cb(self, *self._status)
+
     def getAddress(self):
         """ Get the address which should be used to connect to the environment
             process for the cloud engine internal communication. The method
@@ -170,6 +232,7 @@ class Container(Proxy):
                 self._machine = None
 
             self._group = None
+            self._statusCbs = set()
 
             super(Container, self).destroy()
         else:
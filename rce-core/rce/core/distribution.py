@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-core/rce/core/distribution.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+# Python specific imports
+from bisect import bisect
+from hashlib import md5
+
+
+class DistributionPolicy(object):
+    """ Base class for the policies which are used by the Distributor to rate
+        the robot processes. The robot process with the lowest score is the
+        preferred location for a new robot WebSocket connection.
+    """
+    # CONFIG
+    # Maximal difference of the score between the least loaded robot process
+    # and a robot process which is preferred due to locality or stickiness
+    SLACK = 0
+
+    def score(self, robot):
+        """ Rate a robot process.
+
+            @param robot:       Robot process which should be rated.
+            @type  robot:       rce.core.robot.RobotEndpoint
+
+            @return:            Score of the robot process.
+            @rtype:             float
+        """
+        raise NotImplementedError
+
+
+class ConnectionPolicy(DistributionPolicy):
+    """ Policy which rates the robot processes only by the number of robot
+        WebSocket connections.
+    """
+    SLACK = 2
+
+    def score(self, robot):
+        return robot.active
+
+
+class LoadPolicy(DistributionPolicy):
+    """ Policy which rates the robot processes by the load which they report,
+        i.e. the used CPU, the used bandwidth, and the time spent converting
+        messages. The number of connections is used to break ties, e.g. before
+        the first report has arrived.
+    """
+    SLACK = 0.2
+
+    # Bandwidth in bytes per second which counts as much as a fully used CPU
+    BANDWIDTH_SCALE = 12.5e6
+
+    # Score added for each robot WebSocket connection
+    CONNECTION_WEIGHT = 0.01
+
+    def score(self, robot):
+        load = robot.load
+        return (load.get('cpu', 0.0) + load.get('conversion', 0.0) +
+                load.get('bandwidth', 0.0) / self.BANDWIDTH_SCALE +
+                robot.active * self.CONNECTION_WEIGHT)
+
+
+POLICIES = {'connections':ConnectionPolicy, 'load':LoadPolicy}
+
+
+class HashRing(object):
+    """ Consistent hash ring which maps keys to the robot processes such that
+        only a small fraction of the keys is remapped when a robot process is
+        added or removed.
+    """
+    # CONFIG
+    REPLICAS = 64
+
+    def __init__(self, robots):
+        """ Initialize the Hash Ring.
+
+            @param robots:      Robot processes which should be part of the
+                                ring. The WebSocket address of the robot
+                                process is used as its key; robot processes
+                                whose address is not yet known are skipped.
+            @type  robots:      [ rce.core.robot.RobotEndpoint ]
+        """
+        ring = []
+
+        for robot in robots:
+            if not robot.websocketAddress:
+                continue
+
+            for i in xrange(self.REPLICAS):
+                key = '{0}-{1}'.format(robot.websocketAddress, i)
+                ring.append((self._hash(key), robot))
+
+        ring.sort(key=lambda entry: entry[0])
+        self._keys = [entry[0] for entry in ring]
+        self._robots = [entry[1] for entry in ring]
+
+    @staticmethod
+    def _hash(key):
+        return int(md5(key).hexdigest()[:16], 16)
+
+    def get(self, key):
+        """ Get the robot process which is responsible for the key.
+
+            @param key:         Key which should be looked up.
+            @type  key:         str
+
+            @return:            Robot process responsible for the key or None
+                                if the ring is empty.
+            @rtype:             rce.core.robot.RobotEndpoint
+        """
+        if not self._robots:
+            return None
+
+        pos = bisect(self._keys, self._hash(key)) % len(self._robots)
+        return self._robots[pos]
@@ -137,12 +137,39 @@ class Environment(Namespace):
             @type  name:        str
 
             @param value:       Value of the parameter which should be added.
-            @type  value:       str, int, float, bool, list
+                                A dictionary sets a whole namespace.
+            @type  value:       str, int, float, bool, list, dict
         """
         parameter = Parameter(self)
         self.callRemote('createParameter', name, value).chainDeferred(parameter)
         return parameter
 
+    def createParameters(self, parameters):
+        """ Create several parameters (in ROS parameter server) inside the
+            environment using a single request.
+
+            @param parameters:  Names and values of the parameters which
+                                should be added. For the description of the
+                                name and value see 'createParameter'.
+            @type  parameters:  [ (str, str/int/float/bool/list/dict) ]
+
+            @return:            New Parameter instances in the same order as
+                                the given names and values.
+            @rtype:             [ rce.core.environment.Parameter ]
+        """
+        created = [Parameter(self) for _ in parameters]
+
+        def cb(refs):
+            for parameter, ref in zip(created, refs):
+                parameter.callback(ref)
+
+        def eb(failure):
+            for parameter in created:
+                parameter.errback(failure)
+
+        self.callRemote('createParameters', parameters).addCallbacks(cb, eb)
+        return created
+
     def getAddress(self):
         """ Get the address of the endpoint of the environment namespace.
         """
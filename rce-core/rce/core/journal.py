@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-core/rce/core/journal.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+# Python specific imports
+import os
+import json
+from copy import deepcopy
+
+# twisted specific imports
+from twisted.python import log
+from twisted.internet.task import LoopingCall
+
+
+class Journal(object):
+    """ Append-only journal of the configuration changes which the users made
+        through the ControlView. The journal is periodically compacted into a
+        snapshot such that on a restart of the Master only the snapshot and the
+        few entries written after it have to be read.
+
+        The state kept for each user has the form:
+
+            { 'containers'  : { cTag : { 'data'       : dict,
+                                         'nodes'      : { nTag : list },
+                                         'parameters' : { name : value },
+                                         'interfaces' : { iTag : list } } },
+              'connections' : [ [tagA, tagB] ] }
+    """
+    # CONFIG
+    SNAPSHOT_INTERVAL = 300
+
+    def __init__(self, path):
+        """ Initialize the Journal.
+
+            @param path:        Path to the journal file. The snapshot is
+                                stored next to it with the suffix '.snapshot'.
+            @type  path:        str
+        """
+        self._journalPath = path
+        self._snapshotPath = '{0}.snapshot'.format(path)
+
+        self._state = {}
+        self._file = None
+        self._compactor = LoopingCall(self.snapshot)
+
+    def load(self):
+        """ Load the last snapshot and replay all journal entries which were
+            written after it.
+
+            @return:            Copy of the state of all users which was
+                                restored, such that it is not modified by
+                                the changes recorded while it is used. The
+                                dictionary maps user IDs to the user state.
+            @rtype:             dict
+        """
+        self._state = {}
+
+        if os.path.isfile(self._snapshotPath):
+            with open(self._snapshotPath, 'r') as f:
+                self._state = json.load(f)
+
+        if os.path.isfile(self._journalPath):
+            with open(self._journalPath, 'r') as f:
+                for line in f:
+                    try:
+                        userID, op, args = json.loads(line)
+                    except ValueError:
+                        # Last entry was only partially written; ignore it
+                        log.msg('Truncated journal entry ignored.')
+                        break
+
+                    self._apply(userID, op, args)
+
+        return deepcopy(self._state)
+
+    def start(self):
+        """ Open the journal for appending new entries and start the periodic
+            compaction into snapshots.
+        """
+        self.snapshot()
+        self._compactor.start(self.SNAPSHOT_INTERVAL, now=False)
+
+    def stop(self):
+        """ Write a final snapshot and close the journal.
+        """
+        if self._compactor.running:
+            self._compactor.stop()
+
+        self.snapshot()
+        self._file.close()
+        self._file = None
+
+    def record(self, userID, op, *args):
+        """ Append a new entry to the journal.
+
+            @param userID:      User ID of the user who made the change.
+            @type  userID:      str
+
+            @param op:          Name of the ControlView operation without the
+                                prefix 'view_', e.g. 'addNode'.
+            @type  op:          str
+
+            @param *args:       Arguments of the operation (without the user).
+        """
+        self._apply(userID, op, args)
+
+        if self._file:
+            self._file.write(json.dumps((userID, op, args)))
+            self._file.write('\n')
+            self._file.flush()
+
+    def snapshot(self):
+        """ Write the current state to the snapshot file and truncate the
+            journal.
+        """
+        tmp = '{0}.tmp'.format(self._snapshotPath)
+
+        with open(tmp, 'w') as f:
+            json.dump(self._state, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.rename(tmp, self._snapshotPath)
+
+        if self._file:
+            self._file.close()
+
+        self._file = open(self._journalPath, 'w')
+
+    def _apply(self, userID, op, args):
+        try:
+            handler = getattr(self, '_{0}'.format(op))
+        except AttributeError:
+            log.msg("Unknown journal operation '{0}' ignored.".format(op))
+            return
+
+        state = self._state.setdefault(userID, {'containers':{},
+                                                'connections':[]})
+
+        try:
+            handler(state, *args)
+        except KeyError:
+            # The referenced container does no longer exist
+            pass
+
+        if not (state['containers'] or state['connections']):
+            del self._state[userID]
+
+    def _createContainer(self, state, tag, data):
+        state['containers'][tag] = {'data':data, 'nodes':{},
+                                    'parameters':{}, 'interfaces':{}}
+
+    def _destroyContainer(self, state, tag):
+        del state['containers'][tag]
+        state['connections'] = [c for c in state['connections']
+                                if not any(t.split('/', 1)[0] == tag
+                                           for t in c)]
+
+    def _addNode(self, state, cTag, nTag, *args):
+        state['containers'][cTag]['nodes'][nTag] = list(args)
+
+    def _removeNode(self, state, cTag, nTag):
+        state['containers'][cTag]['nodes'].pop(nTag, None)
+
+    def _addParameter(self, state, cTag, name, value):
+        state['containers'][cTag]['parameters'][name] = value
+
+    def _removeParameter(self, state, cTag, name):
+        state['containers'][cTag]['parameters'].pop(name, None)
+
+    def _addInterface(self, state, cTag, iTag, *args):
+        state['containers'][cTag]['interfaces'][iTag] = list(args)
+
+    def _removeInterface(self, state, cTag, iTag):
+        state['containers'][cTag]['interfaces'].pop(iTag, None)
+
+        name = '{0}/{1}'.format(cTag, iTag)
+        state['connections'] = [c for c in state['connections']
+                                if name not in c]
+
+    def _addConnection(self, state, tagA, tagB):
+        self._removeConnection(state, tagA, tagB)
+        state['connections'].append([tagA, tagB])
+
+    def _removeConnection(self, state, tagA, tagB):
+        state['connections'] = [c for c in state['connections']
+                                if set(c) != set((tagA, tagB))]
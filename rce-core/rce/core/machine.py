@@ -36,6 +36,7 @@ from random import choice
 from string import letters
 
 # twisted specific imports
+from twisted.python import log
 from twisted.spread.pb import Avatar
 
 # rce specific imports
@@ -43,6 +44,9 @@ from rce.util.error import InternalError
 from rce.util.settings import getSettings
 from rce.util.network import isLocalhost
 from rce.util.iaas import IaasHook
+from rce.core.autoscale import Autoscaler
+from rce.core.scheduler import CreationScheduler
+from rce.core.distribution import POLICIES, HashRing
 from rce.core.error import InvalidRequest, MaxNumberExceeded
 from rce.core.container import Container
 
@@ -66,34 +70,91 @@ class Distributor(object):
         process to create a WebSocket connection. It therefore also keeps track
         of all the robot processes registered with the cloud engine.
 
+        The robot processes are rated using a distribution policy. Robot
+        processes in machines which host containers of the user and the robot
+        process to which the user is mapped using consistent hashing, such that
+        reconnecting robots return to the same process, are preferred as long
+        as their score is close to the score of the best robot process.
+
         There should only one instance running in the Master process.
     """
-    def __init__(self):
+    def __init__(self, policy='load'):
         """ Initialize the Distributor.
+
+            @param policy:      Name of the distribution policy which is used
+                                to rate the robot processes, i.e. 'load' or
+                                'connections'.
+            @type  policy:      str
         """
         self._robots = set()
+        self._ring = None
+
+        try:
+            self._policy = POLICIES[policy]()
+        except KeyError:
+            raise InternalError("Unknown distribution policy '{0}'.".format(
+                                    policy))
 
     def registerRobotProcess(self, robot):
         assert robot not in self._robots
         self._robots.add(robot)
+        self._ring = None
 
     def unregisterRobotProcess(self, robot):
         assert robot in self._robots
         self._robots.remove(robot)
+        self._ring = None
 
-    def getNextLocation(self):
+    def robotProcessChanged(self, robot):
+        """ Callback for RobotEndpoint to notify the distributor that the
+            WebSocket address of the robot process is known.
+        """
+        self._ring = None
+
+    def getNextLocation(self, userID=None, hosts=()):
         """ Get the next endpoint running in an robot process to create a new
             robot WebSocket connection.
 
+            @param userID:      User ID under which the robot will login, or
+                                None if it is not known.
+            @type  userID:      str
+
+            @param hosts:       IP addresses of the machines which host
+                                containers of the user.
+            @type  hosts:       [ str ]
+
             @return:            Next robot endpoint.
             @rtype:             rce.core.robot.RobotEndpoint
                                 (subclass of rce.core.base.Proxy)
         """
-        try:
-            return min(self._robots, key=lambda r: r.active)
-        except ValueError:
+        if not self._robots:
             raise RobotProcessError('There is no free robot process.')
 
+        score = self._policy.score
+        best = min(self._robots, key=score)
+        limit = score(best) + self._policy.SLACK
+
+        # Prefer robot processes in the same machine as the containers
+        local = [r for r in self._robots if r.IP in hosts]
+
+        if local:
+            candidate = min(local, key=score)
+
+            if score(candidate) <= limit:
+                return candidate
+
+        # Prefer the robot process to which the user is mapped
+        if userID:
+            if self._ring is None:
+                self._ring = HashRing(self._robots)
+
+            candidate = self._ring.get(userID)
+
+            if candidate and score(candidate) <= limit:
+                return candidate
+
+        return best
+
     def cleanUp(self):
         assert len(self._robots) == 0
 
@@ -108,14 +169,27 @@ class LoadBalancer(object):
     """
     _UID_LEN = 8
 
-    def __init__(self):
+    def __init__(self, concurrency=2):
         """ Initialize the Load Balancer.
+
+            @param concurrency: Maximum number of containers which are started
+                                concurrently in a single machine.
+            @type  concurrency: int
         """
         self._empty = EmptyNetworkGroup()
         self._groups = {}
         self._uid = set()
         self._machines = set()
+        self._retired = set()
+        self._users = {}
         self._iaas = None
+        self._autoscaler = None
+        self._scheduler = CreationScheduler(concurrency)
+
+    @property
+    def scheduler(self):
+        """ Scheduler which is used to start the containers. """
+        return self._scheduler
 
     def createMachine(self, ref, data):
         """ Create a new Machine object, which can be used to create new
@@ -137,6 +211,10 @@ class LoadBalancer(object):
             raise InternalError('Tried to add the same machine multiple times.')
 
         self._machines.add(machine)
+
+        if self._autoscaler:
+            self._autoscaler.machineAdded(machine)
+
         return machine
 
     def destroyMachine(self, machine):
@@ -150,8 +228,68 @@ class LoadBalancer(object):
         except KeyError:
             raise InternalError('Tried to remove a non existent machine.')
 
+        self._retired.discard(machine)
+
+        if self._autoscaler:
+            self._autoscaler.machineRemoved(machine)
+
         machine.destroy()
 
+    def retireMachine(self, machine):
+        """ Stop assigning new containers to a machine which is about to be
+            shut down.
+
+            @param machine:     Machine which should be retired.
+            @type  machine:     rce.core.machine.Machine
+        """
+        if machine in self._machines:
+            self._retired.add(machine)
+
+    def updateMachine(self, machine, userID):
+        """ Callback for Machine to notify the load balancer that a container
+            of a user has been added to or removed from the machine.
+
+            @param machine:     Machine which has been changed.
+            @type  machine:     rce.core.machine.Machine
+
+            @param userID:      UserID of the user who owns the container.
+            @type  userID:      str
+        """
+        self.updateLoad(machine)
+
+        if machine.getUserCount(userID):
+            self._users.setdefault(userID, set()).add(machine)
+        else:
+            machines = self._users.get(userID)
+
+            if machines:
+                machines.discard(machine)
+
+                if not machines:
+                    del self._users[userID]
+
+    def updateLoad(self, machine):
+        """ Callback for Machine to notify the load balancer that the load of
+            the machine has changed.
+
+            @param machine:     Machine which has been changed.
+            @type  machine:     rce.core.machine.Machine
+        """
+        if self._autoscaler:
+            self._autoscaler.machineUpdated(machine)
+
+    def getUserHosts(self, userID):
+        """ Get the IP addresses of the machines which host containers of a
+            user.
+
+            @param userID:      UserID of the user.
+            @type  userID:      str
+
+            @return:            IP addresses of the machines.
+            @rtype:             [ str ]
+        """
+        return [machine.IP for machine in self._users.get(userID, ())]
+
     def _createContainer(self, data, userID):
         """ # TODO: Add doc
         """
@@ -188,36 +326,37 @@ class LoadBalancer(object):
                                 assigned.
             @rtype:             rce.core.machine.Machine
         """
-        size = container.size
         userID = container.userID
+        userMachines = self._users.get(userID, ())
 
-        # TODO: At the moment not used
-#        cpu = container.cpu
-#        memory = container.memory
-#        bandwidth = container.bandwidth
-#        specialFeatures = container.specialFeatures
-
-        machines = [m for m in self._machines if m.availability >= size]
-
-        # TODO: The above uses block assumptions, implement fine grain control
-        #       at bottom. Like check memory data, use filters to get machines
-        #       with special features like gpu, avxii, mmx sse
-        if not machines:
-#            if self._iaas:
-#                self._iaas.spin_up()  # count, type, special_request
-#                # TODO: Need to get the current list of machines here!
-#                #       However, spin up of a new instance has most certainly a
-#                #       delay; therefore, probably a Deferred has to be used...
-#            else:
-                raise ContainerProcessError('You seem to have run out of '
-                                            'capacity. Add more nodes.')
-
-        candidates = [m for m in machines if m.getUserCount(userID)]
-
-        if candidates:
-            return max(candidates, key=lambda m: m.availability)
+        if container.antiAffinity:
+            # Spread the containers of the user over different machines
+            excluded = userMachines
+            preferred = ()
         else:
-            return max(machines, key=lambda m: m.availability)
+            # Machines which already host the network group of the container
+            # or other containers of the user are preferred
+            excluded = ()
+            preferred = container.group.machines or userMachines
+
+        candidates = [m for m in preferred
+                      if m not in self._retired and m.fits(container)]
+
+        if not candidates:
+            candidates = [m for m in self._machines
+                          if m not in self._retired and m not in excluded and
+                          m.fits(container)]
+
+        if not candidates:
+            raise ContainerProcessError('You seem to have run out of '
+                                        'capacity. Add more nodes.')
+
+        # Best-fit: the machine which has the least resources left over after
+        # the container has been assigned is used, such that large blocks of
+        # free resources remain available on the other machines
+        return min(candidates,
+                   key=lambda m: sum(share * share
+                                     for share in m.leftover(container)))
 
     def createContainer(self, uid, userID, data):
         """ Select an appropriate machine and create a container.
@@ -233,29 +372,85 @@ class LoadBalancer(object):
             @param data:        Extra data used to configure the container.
             @type  data:        dict
 
-            @return:            New Container instance.
+            @return:            New Container instance. If an IaaS hook is
+                                registered and no machine has enough free
+                                resources, the container is queued until a
+                                new machine is available.
             @rtype:             rce.core.container.Container
         """
         container = self._createContainer(data, userID)
-        self._getMachine(container).assignContainer(container, uid)
+
+        if not self.placeContainer(container, uid):
+            if not self._autoscaler:
+                raise ContainerProcessError('You seem to have run out of '
+                                            'capacity. Add more nodes.')
+
+            self._autoscaler.enqueue(container, uid)
+
         return container
 
-    def registerIAASHook(self, hook):
-        """ Register an IAAS Hook object.
+    def placeContainer(self, container, uid):
+        """ Try to assign a container to a machine.
+
+            @param container:   Container which should be created.
+            @type  container:   rce.core.container.Container
+
+            @param uid:         Unique ID which is used to identify the
+                                environment process.
+            @type  uid:         str
+
+            @return:            True if the container has been assigned to a
+                                machine; False if no machine has enough free
+                                resources.
+            @rtype:             bool
+        """
+        try:
+            machine = self._getMachine(container)
+        except ContainerProcessError:
+            return False
+
+        machine.assignContainer(container, uid)
+        return True
+
+    def registerIAASHook(self, hook, reactor, headroom=0, idleTimeout=600):
+        """ Register an IAAS Hook object which is used to add and remove
+            machines depending on the demand.
+
+            @param hook:        IaaS hook which should be registered.
+            @type  hook:        rce.util.iaas.IaasHook
+
+            @param reactor:     Reference to the twisted reactor.
+            @type  reactor:     twisted::reactor
 
-             # TODO: Add doc
+            @param headroom:    Number of idle machines which should be kept
+                                running.
+            @type  headroom:    int
+
+            @param idleTimeout: Time in seconds after which an idle machine
+                                started through the hook is spun down.
+            @type  idleTimeout: int
         """
         if not isinstance(hook, IaasHook):
             raise InternalError('IAAS hook has to be a subclass of '
                                 'rce.util.iaas.IaasHook.')
 
+        self.unregisterIAASHook()
+
         self._iaas = hook
+        self._autoscaler = Autoscaler(reactor, self, hook, headroom,
+                                      idleTimeout)
+
+        for machine in self._machines:
+            self._autoscaler.machineAdded(machine)
+
+        self._autoscaler.start()
 
     def unregisterIAASHook(self):
         """ Method should be called to destroy all machines.
         """
         if self._iaas:
-            self._iaas.disconnect()
+            self._autoscaler.stop()
+            self._autoscaler = None
             self._iaas = None
 
     def freeGroup(self, key, uid):
@@ -267,6 +462,8 @@ class LoadBalancer(object):
     def cleanUp(self):
         """ Method should be called to destroy all machines.
         """
+        self.unregisterIAASHook()
+
         for group in self._groups.values():
             group.destroy()
 
@@ -277,8 +474,6 @@ class LoadBalancer(object):
 
         assert len(self._machines) == 0
 
-        self.unregisterIAASHook()
-
 
 class Machine(object):
     """ Representation of a machine in which containers can be created. It
@@ -302,9 +497,9 @@ class Machine(object):
 
         self._size = data.get('size')
         self._cpu = data.get('cpu')
-        self._memeory = data.get('memory')
+        self._memory = data.get('memory')
         self._bandwidth = data.get('bandwidth')
-        self._specialFeatures = data.get('specialFeatures')
+        self._specialFeatures = data.get('specialFeatures') or []
 
         ip = ref.broker.transport.getPeer().host
         self._ip = getSettings().internal_IP if isLocalhost(ip) else ip
@@ -312,6 +507,17 @@ class Machine(object):
 
         self._containers = set()
         self._users = Counter()
+        self._uids = {}
+
+        # Resources which are reserved by the running containers
+        self._usedSize = 0
+        self._usedCpu = 0
+        self._usedMemory = 0
+        self._usedBandwidth = 0
+
+        # Resources which are actually used as reported by the telemetry
+        self._hostUsage = None
+        self._usage = {}
 
     @property
     def active(self):
@@ -325,17 +531,17 @@ class Machine(object):
 
     @property
     def cpu(self):
-        """ Machine CPU Info. """
+        """ Machine CPU capacity in percent of a single core. """
         return self._cpu
 
     @property
     def memory(self):
-        """ Machine Memory Info. """
+        """ Machine memory capacity in MB. """
         return self._memory
 
     @property
     def bandwidth(self):
-        """ Machine Bandwidth Info. """
+        """ Machine bandwidth capacity in kbit/s. """
         return self._bandwidth
 
     @property
@@ -346,7 +552,52 @@ class Machine(object):
     @property
     def availability(self):
         """ Free Machine Capacity. """
-        return self._size - sum(c.size for c in self._containers)
+        return self._size - self._usedSize
+
+    @property
+    def usage(self):
+        """ Resources which are actually used in the machine as reported by
+            the telemetry of the container process, i.e. a tuple containing
+            the CPU usage in percent of a single core, the memory in MB, and
+            the network traffic in kbit/s. If no value for the whole machine
+            has been reported, the sum of the containers is used.
+        """
+        if self._hostUsage:
+            return self._hostUsage
+
+        samples = self._usage.values()
+        return tuple(sum(sample[i] for sample in samples) for i in xrange(3))
+
+    @property
+    def load(self):
+        """ Fraction of the most used resource of the machine, i.e. 0 for an
+            idle machine and 1 for a full machine. For each resource the larger
+            value of the reserved and the actually used amount is considered.
+            Resources for which the machine has no capacity configured are
+            ignored.
+        """
+        cpu, memory, bandwidth = self.usage
+        shares = [used / float(capacity) for capacity, used in
+                  ((self._size, self._usedSize),
+                   (self._cpu, max(self._usedCpu, cpu)),
+                   (self._memory, max(self._usedMemory, memory)),
+                   (self._bandwidth, max(self._usedBandwidth, bandwidth)))
+                  if capacity]
+        return max(shares) if shares else 0.0
+
+    @property
+    def stats(self):
+        """ Statistics of the machine, i.e. the number of active containers,
+            the load, and for the resources CPU, memory, and bandwidth a tuple
+            containing the capacity, the reserved, and the actually used
+            amount.
+        """
+        cpu, memory, bandwidth = self.usage
+        return {'active':self.active, 'size':self._size, 'load':self.load,
+                'cpu':(self._cpu, self._usedCpu, cpu),
+                'memory':(self._memory, self._usedMemory, memory),
+                'bandwidth':(self._bandwidth, self._usedBandwidth,
+                             bandwidth)}
 
     @property
     def IP(self):
@@ -359,79 +610,138 @@ class Machine(object):
         """
         return self._users[userID]
 
+    def fits(self, container):
+        """ Check whether the machine has enough free resources and all
+            special features which are required by the container.
+
+            @param container:   Container which should be checked.
+            @type  container:   rce.core.container.Container
+
+            @return:            True if the container fits in the machine.
+            @rtype:             bool
+        """
+        if self.availability < container.size:
+            return False
+
+        for capacity, used, required in ((self._cpu, self._usedCpu,
+                                          container.cpu),
+                                         (self._memory, self._usedMemory,
+                                          container.memory),
+                                         (self._bandwidth, self._usedBandwidth,
+                                          container.bandwidth)):
+            if capacity and used + required > capacity:
+                return False
+
+        return all(feature in self._specialFeatures
+                   for feature in container.specialFeatures)
+
+    def leftover(self, container):
+        """ Get the free share of each resource which would be left over if
+            the container was assigned to the machine. For each resource the
+            larger value of the reserved and the actually used amount is
+            considered. Resources for which the machine has no capacity
+            configured are ignored.
+
+            @param container:   Container which should be assigned.
+            @type  container:   rce.core.container.Container
+
+            @return:            Free share of each resource, i.e. 0 for a
+                                resource which would be fully used.
+            @rtype:             ( float )
+        """
+        cpu, memory, bandwidth = self.usage
+        return tuple((capacity - used - required) / float(capacity)
+                     for capacity, used, required in
+                     ((self._size, self._usedSize, container.size),
+                      (self._cpu, max(self._usedCpu, cpu), container.cpu),
+                      (self._memory, max(self._usedMemory, memory),
+                       container.memory),
+                      (self._bandwidth, max(self._usedBandwidth, bandwidth),
+                       container.bandwidth))
+                     if capacity)
+
     def assignContainer(self, container, uid):
         """ # TODO: Add doc
         """
-        if self.availability < container.size:
+        if not self.fits(container):
             raise MaxNumberExceeded('Machine has run out of container '
                                     'capacity.')
 
         container.assignMachine(self)
-        d = self._ref.callRemote('createContainer', uid, container.serialized)
-        d.chainDeferred(container)
+        self._uids[uid] = container
 
-    def createBridge(self, name):
-        """ Create a new OVS Bridge.
-
-            @param name:        Unique name of the network group.
-            @type  name:        str
-        """
-        return self._ref.callRemote('createBridge', name)
+        create = lambda: self._ref.callRemote('createContainer', uid,
+                                              container.serialized)
+        d = self._balancer.scheduler.submit(self, container, create)
+        d.chainDeferred(container)
 
-    def destroyBridge(self, name):
-        """ Destroy a OVS Bridge.
+    def configureNetwork(self, ops):
+        """ Apply a batch of changes to the virtual network of the machine in
+            a single transaction.
 
-            @param name:        Unique name of the network group.
-            @type  name:        str
+            @param ops:         Changes which should be applied. For the
+                                format see
+                                rce.container.ContainerClient.
+                                remote_configureNetwork.
+            @type  ops:         [ tuple ]
         """
-        return self._ref.callRemote('destroyBridge', name)
+        def eb(failure):
+            log.msg('Network configuration of machine {0} failed: '
+                    '{1}'.format(self._ip, failure.getErrorMessage()))
 
-    def createTunnel(self, name, targetIP):
-        """ Create a new GRE Tunnel.
+        d = self._ref.callRemote('configureNetwork', ops)
+        return d.addErrback(eb)
 
-            @param name:        Unique name of the network group.
-            @type  name:        str
-
-            @param targetIP:    Target IP for the GRE Tunnel.
-            @type  targetIP:    str
-        """
-        return self._ref.callRemote('createTunnel', name, targetIP)
+    def updateTelemetry(self, delta, full):
+        """ Update the resources which are actually used in the machine.
 
-    def destroyTunnel(self, name, targetIP):
-        """ Destroy a GRE Tunnel.
+            @param delta:       Resources used by the whole machine and by each
+                                container which have changed since the last
+                                update. The key is 'host' for the whole
+                                machine and the unique ID for a container; the
+                                value is a tuple containing the CPU usage in
+                                percent of a single core, the memory in MB,
+                                and the network traffic in kbit/s, or None if
+                                no value is available anymore.
+            @type  delta:       { str : (int, int, int) }
 
-            @param name:        Unique name of the network group.
-            @type  name:        str
-
-            @param targetIP:    Target IP for the GRE Tunnel.
-            @type  targetIP:    str
+            @param full:        Flag which is True if the delta contains all
+                                values, i.e. all missing values should be
+                                discarded.
+            @type  full:        bool
         """
-        return self._ref.callRemote('destroyTunnel', name, targetIP)
+        if full:
+            self._hostUsage = None
+            self._usage = {}
 
-    def getSysinfo(self, request):
-        """ Get realtime Sysinfo data from machine.
+        for key, sample in delta.iteritems():
+            if key == 'host':
+                self._hostUsage = sample
+                continue
 
-            @param request:     data desired
-            @type  request:     # TODO: Add type
-        """
-        return self._ref.callRemote('getSysinfo')
+            container = self._uids.get(key)
 
-    def setSysinfo(self, request, value):
-        """ Set some system parameter to the machine.
+            if not container:
+                continue
 
-            @param request:     data desired
-            @type  request:     # TODO: Add type
+            if sample:
+                self._usage[container] = sample
+            else:
+                self._usage.pop(container, None)
 
-            @param value:       data value
-            @type  value:       # TODO: Add type
-        """
-        return self._ref.callRemote('setSysinfo', value)
+        self._balancer.updateLoad(self)
 
     def registerContainer(self, container):
         assert container not in self._containers
         self._containers.add(container)
         self._users[container.userID] += 1
 
+        self._usedSize += container.size
+        self._usedCpu += container.cpu
+        self._usedMemory += container.memory
+        self._usedBandwidth += container.bandwidth
+        self._balancer.updateMachine(self, container.userID)
+
     def unregisterContainer(self, container):
         assert container in self._containers
         self._containers.remove(container)
@@ -441,6 +751,19 @@ class Machine(object):
         else:
             del self._users[container.userID]
 
+        self._usedSize -= container.size
+        self._usedCpu -= container.cpu
+        self._usedMemory -= container.memory
+        self._usedBandwidth -= container.bandwidth
+
+        for uid, c in self._uids.iteritems():
+            if c is container:
+                del self._uids[uid]
+                break
+
+        self._usage.pop(container, None)
+        self._balancer.updateMachine(self, container.userID)
+
 # TODO: Not used
 #    def listContainers(self):
 #        """ # TODO: Add doc
@@ -496,6 +819,14 @@ class MachineAvatar(Avatar):
         """
         self._machine.destroyContainer(remoteContainer)
 
+    def perspective_reportTelemetry(self, delta, full):
+        """ Report the resources which are actually used in the machine.
+
+            For the description of the arguments see
+            rce.core.machine.Machine.updateTelemetry.
+        """
+        self._machine.updateTelemetry(delta, full)
+
     def logout(self):
         """ Callback which should be called upon disconnection of the Machine
         """
@@ -510,6 +841,11 @@ class EmptyNetworkGroup(object):
         """ Name of the network group. """
         return None
 
+    @property
+    def machines(self):
+        """ Machines which host containers of the network group. """
+        return ()
+
     def createContainer(self, data, userID):
         return Container(data, userID, self, None)
 
@@ -521,7 +857,13 @@ class EmptyNetworkGroup(object):
 
 
 class NetworkGroup(object):
-    """ # TODO: Add doc
+    """ Virtual network which connects the containers of a user which are in
+        the same group.
+
+        The machines of a network group are connected using GRE tunnels
+        either in a full mesh or, to scale to larger groups, in a star where
+        every machine has a single tunnel to the hub machine whose bridge
+        forwards the traffic between the tunnels.
     """
     # TODO: Should the IP address be configurable?
     _NETWORK_ADDR = '192.168.1'
@@ -535,12 +877,19 @@ class NetworkGroup(object):
         self._ips = set(xrange(2, 255))
         self._containers = set()
         self._machines = {}
+        self._star = getSettings().group_topology == 'star'
+        self._hub = None
 
     @property
     def name(self):
         """ Name of the network group. """
         return self._uid
 
+    @property
+    def machines(self):
+        """ Machines which host containers of the network group. """
+        return self._machines.keys()
+
     def createContainer(self, data, userID):
         """ # TODO: Add doc
         """
@@ -583,16 +932,26 @@ class NetworkGroup(object):
     def _registerMachine(self, machine):
         """ # TODO: Add doc
         """
-        if machine not in self._machines:
-            machine.createBridge(self._uid)
+        if machine in self._machines:
+            self._machines[machine] += 1
+            return
 
-            for m in self._machines:
-                machine.createTunnel(self._uid, m.IP)
-                m.createTunnel(self._uid, machine.IP)
+        uid = self._uid
+        ops = [('createBridge', uid)]
 
-            self._machines[machine] = 1
+        if self._star:
+            if self._hub:
+                ops.append(('createTunnel', uid, self._hub.IP))
+                self._hub.configureNetwork([('createTunnel', uid, machine.IP)])
+            else:
+                self._hub = machine
         else:
-            self._machines[machine] += 1
+            for m in self._machines:
+                ops.append(('createTunnel', uid, m.IP))
+                m.configureNetwork([('createTunnel', uid, machine.IP)])
+
+        machine.configureNetwork(ops)
+        self._machines[machine] = 1
 
     def _unregisterMachine(self, machine):
         """ # TODO: Add doc
@@ -601,14 +960,40 @@ class NetworkGroup(object):
 
         if cnt:
             self._machines[machine] = cnt
-        else:
-            del self._machines[machine]
+            return
 
-            for m in self._machines:
-                machine.destroyTunnel(self._uid, m.IP)
-                m.destroyTunnel(self._uid, machine.IP)
+        del self._machines[machine]
+        uid = self._uid
+
+        if not self._star:
+            ops = [('destroyTunnel', uid, m.IP) for m in self._machines]
 
-            machine.destroyBridge(self._uid)
+            for m in self._machines:
+                m.configureNetwork([('destroyTunnel', uid, machine.IP)])
+        elif machine != self._hub:
+            ops = [('destroyTunnel', uid, self._hub.IP)]
+            self._hub.configureNetwork([('destroyTunnel', uid, machine.IP)])
+        else:
+            # The hub leaves the group; all remaining machines have to be
+            # connected to a new hub
+            ops = [('destroyTunnel', uid, m.IP) for m in self._machines]
+
+            if self._machines:
+                self._hub = hub = iter(self._machines).next()
+                hubOps = [('destroyTunnel', uid, machine.IP)]
+
+                for m in self._machines:
+                    if m != hub:
+                        hubOps.append(('createTunnel', uid, m.IP))
+                        m.configureNetwork([('destroyTunnel', uid, machine.IP),
+                                            ('createTunnel', uid, hub.IP)])
+
+                hub.configureNetwork(hubOps)
+            else:
+                self._hub = None
+
+        ops.append(('destroyBridge', uid))
+        machine.configureNetwork(ops)
 
     def destroy(self):
         """ # TODO: Add doc
@@ -493,7 +493,7 @@ class Namespace(Proxy):
 
         self._interfaces = set()
 
-    def createInterface(self, iType, clsName, addr):
+    def createInterface(self, iType, clsName, addr, fields=None, timeout=None):
         """ Create an Interface object in the namespace and therefore endpoint.
 
             @param iType:       Type of the interface encoded as an integer.
@@ -506,6 +506,15 @@ class Namespace(Proxy):
                                 i.e. 'std_msgs/Int32'.
             @type  clsName:     str
 
+            @param fields:      Top-level fields which should be converted to
+                                JSON by a Converter, or None.
+            @type  fields:      [str]
+
+            @param timeout:     Time in seconds after which an unanswered
+                                request of a Service-Client Converter or
+                                Forwarder is dropped, or None.
+            @type  timeout:     float
+
             @return:            New Interface instance.
             @rtype:             rce.core.network.Interface
                                 (subclass of rce.core.base.Proxy)
@@ -513,7 +522,7 @@ class Namespace(Proxy):
         uid = self._endpoint.getUID()
         interface = Interface(self._endpoint, self, uid)
         self.callRemote('createInterface', uid.bytes, iType, clsName,
-                        addr).chainDeferred(interface)
+                        addr, fields, timeout).chainDeferred(interface)
         return interface
 
     def registerInterface(self, interface):
@@ -31,7 +31,9 @@
 #
 
 # twisted specific imports
+from twisted.python import log
 from twisted.internet.address import IPv4Address
+from twisted.internet.defer import succeed
 
 # rce specific imports
 from rce.util.settings import getSettings
@@ -69,7 +71,7 @@ class RobotEndpoint(Endpoint):
         for WebSocket connections from robots and is part of the cloud engine
         internal communication.
     """
-    def __init__(self, network, distributor, port):
+    def __init__(self, network, distributor):
         """ Initialize the Environment Endpoint.
 
             @param network:     Network to which the endpoint belongs.
@@ -79,17 +81,16 @@ class RobotEndpoint(Endpoint):
                                 new robot WebSocket connections to robot
                                 endpoints.
             @type  distributor: rce.core.robot.Distributor
-
-            @param port:        Port where the robot process is listening for
-                                connections to other endpoints.
-            @type  port:        int
         """
         super(RobotEndpoint, self).__init__(network)
 
         self._distributor = distributor
         distributor.registerRobotProcess(self)
 
-        self._port = port
+        self._port = None
+        self._ip = None
+        self._websocketAddress = None
+        self._load = {}
 
     @property
     def active(self):
@@ -98,6 +99,56 @@ class RobotEndpoint(Endpoint):
         """
         return len(self._namespaces)
 
+    @property
+    def IP(self):
+        """ The IP address of the machine in which the robot process is
+            running, or None if the robot process is not yet connected.
+        """
+        return self._ip
+
+    @property
+    def websocketAddress(self):
+        """ The address of the WebSocket server of the robot process, or None
+            if it is not yet known.
+        """
+        return self._websocketAddress
+
+    @property
+    def load(self):
+        """ The last load reported by the robot process. The dictionary
+            contains the keys 'cpu' (fraction of a CPU), 'bandwidth' (bytes
+            per second), and 'conversion' (fraction of the time spent
+            converting messages).
+        """
+        return self._load
+
+    def callback(self, obj):
+        ip = obj.broker.transport.getPeer().host
+        self._ip = getSettings().internal_IP if isLocalhost(ip) else ip
+
+        super(RobotEndpoint, self).callback(obj)
+
+        def cb(address):
+            self._websocketAddress = address
+
+            if self._distributor:
+                self._distributor.robotProcessChanged(self)
+
+        def eb(failure):
+            log.msg('Could not get the WebSocket address of the robot '
+                    'process: {0}'.format(failure.getErrorMessage()))
+
+        self.callRemote('getWebsocketAddress').addCallbacks(cb, eb)
+
+    def updateLoad(self, load):
+        """ Update the load of the robot process.
+
+            @param load:        Load reported by the robot process. For the
+                                keys of the dictionary see the property 'load'.
+            @type  load:        dict
+        """
+        self._load = load
+
     def getAddress(self):
         """ Get the address of the robot endpoint's internal communication
             server.
@@ -107,12 +158,14 @@ class RobotEndpoint(Endpoint):
                                 (type: twisted.internet.address.IPv4Address)
             @rtype:             twisted.internet.defer.Deferred
         """
-        def cb(remote):
-            ip = remote.broker.transport.getPeer().host
-            ip = getSettings().internal_IP if isLocalhost(ip) else ip
-            return IPv4Address('TCP', ip, self._port)
+        if self._port:
+            return succeed(IPv4Address('TCP', self._ip, self._port))
+
+        def cb(port):
+            self._port = port
+            return IPv4Address('TCP', self._ip, port)
 
-        return self().addCallback(cb)
+        return self.callRemote('getCommPort').addCallback(cb)
 
     def getWebsocketAddress(self):
         """ Get the address which can be used to connect to the robot
@@ -122,6 +175,9 @@ class RobotEndpoint(Endpoint):
                                 has the form [IP]:[port] (type: str)
             @rtype:             twisted.internet.defer.Deferred
         """
+        if self._websocketAddress:
+            return succeed(self._websocketAddress)
+
         return self.callRemote('getWebsocketAddress')
 
     def registerRemoteRobot(self, remoteRobot):
@@ -176,3 +232,13 @@ class RobotEndpointAvatar(EndpointAvatar):
         except InvalidRequest:
             robot.destroy()
             raise
+
+    def perspective_reportLoad(self, load):
+        """ Report the load of the robot process.
+
+            @param load:        Load of the robot process. For the keys of the
+                                dictionary see
+                                rce.core.robot.RobotEndpoint.load.
+            @type  load:        dict
+        """
+        self._endpoint.updateLoad(load)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-core/rce/core/scheduler.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+# Python specific imports
+from collections import deque, OrderedDict
+
+# twisted specific imports
+from twisted.python.failure import Failure
+from twisted.internet.defer import Deferred
+
+
+class _MachineQueue(object):
+    """ Queue of the containers which are waiting to be created in a single
+        machine.
+    """
+    def __init__(self, levels):
+        self.running = 0
+        self.pending = 0
+
+        # One queue per priority class; each maps the user IDs to the
+        # containers of the user such that the users are served round-robin
+        self.queues = [OrderedDict() for _ in xrange(levels)]
+
+        # Last position which has been reported for each queued container
+        self.positions = {}
+
+    def push(self, level, entry):
+        self.queues[level].setdefault(entry[0].userID, deque()).append(entry)
+        self.pending += 1
+
+    def pop(self):
+        for queue in self.queues:
+            if queue:
+                userID, entries = queue.popitem(last=False)
+                entry = entries.popleft()
+
+                if entries:
+                    queue[userID] = entries
+
+                self.pending -= 1
+                self.positions.pop(entry[0], None)
+                return entry
+
+    def remove(self, container):
+        for queue in self.queues:
+            entries = queue.get(container.userID)
+
+            if not entries:
+                continue
+
+            for entry in entries:
+                if entry[0] is container:
+                    entries.remove(entry)
+                    self.pending -= 1
+                    self.positions.pop(container, None)
+
+                    if not entries:
+                        del queue[container.userID]
+
+                    return True
+
+        return False
+
+    def order(self):
+        """ Get the queued containers in the order in which they will be
+            dispatched, i.e. by priority class and within a priority class
+            round-robin over the users.
+        """
+        order = []
+
+        for queue in self.queues:
+            entries = queue.values()
+            i = 0
+
+            while 1:
+                batch = [e[i][0] for e in entries if len(e) > i]
+
+                if not batch:
+                    break
+
+                order.extend(batch)
+                i += 1
+
+        return order
+
+
+class CreationScheduler(object):
+    """ The Creation Scheduler limits the number of containers which are
+        started concurrently in a machine. Containers which can not be started
+        immediately are queued; higher priority classes are served first and
+        within a priority class the users are served in turn.
+
+        The progress of the creation is reported through the status of the
+        containers.
+    """
+    # Priority classes which can be requested using the key 'priority' in the
+    # configuration data of the container
+    PRIORITIES = ('high', 'normal', 'low')
+
+    def __init__(self, concurrency):
+        """ Initialize the Creation Scheduler.
+
+            @param concurrency: Maximum number of containers which are started
+                                concurrently in a single machine.
+            @type  concurrency: int
+        """
+        self._concurrency = concurrency
+        self._machines = {}
+
+    def submit(self, machine, container, create):
+        """ Schedule the creation of a container in a machine.
+
+            @param machine:     Machine in which the container is created.
+            @type  machine:     rce.core.machine.Machine
+
+            @param container:   Container which should be created.
+            @type  container:   rce.core.container.Container
+
+            @param create:      Callable which starts the creation of the
+                                container and returns a Deferred which fires
+                                as soon as the container has been started.
+            @type  create:      callable
+
+            @return:            Deferred which fires with the result of
+                                'create'. It does not fire if the container is
+                                destroyed while it is queued.
+            @rtype:             twisted.internet.defer.Deferred
+        """
+        queue = self._machines.get(machine)
+
+        if not queue:
+            queue = _MachineQueue(len(self.PRIORITIES))
+            self._machines[machine] = queue
+
+        d = Deferred()
+        level = self.PRIORITIES.index(container.priority)
+        queue.push(level, (container, create, d))
+        container.notifyOnDeath(self._dropped)
+
+        if queue.running < self._concurrency:
+            self._dispatch(machine)
+        else:
+            self._reportPositions(queue)
+
+        return d
+
+    def _dropped(self, container):
+        """ Internally used method which is called when a queued container is
+            destroyed before it could be created.
+        """
+        for machine, queue in self._machines.items():
+            if queue.remove(container):
+                if not (queue.running or queue.pending):
+                    del self._machines[machine]
+                else:
+                    self._reportPositions(queue)
+
+                break
+
+    def _reportPositions(self, queue):
+        """ Internally used method to report the position in the queue of
+            all queued containers of a machine whose position has changed.
+        """
+        positions = queue.positions
+
+        for position, container in enumerate(queue.order(), 1):
+            if positions.get(container) != position:
+                positions[container] = position
+                container.setStatus('queued', {'position':position})
+
+    def _dispatch(self, machine):
+        """ Internally used method to start the creation of the next queued
+            containers in the machine.
+        """
+        queue = self._machines[machine]
+        dispatched = False
+
+        while queue.pending and queue.running < self._concurrency:
+            container, create, d = queue.pop()
+            container.dontNotifyOnDeath(self._dropped)
+            container.setStatus('creating')
+
+            queue.running += 1
+            dispatched = True
+            create().addBoth(self._done, machine, container, d)
+
+        if not (queue.running or queue.pending):
+            del self._machines[machine]
+        elif dispatched and queue.pending:
+            self._reportPositions(queue)
+
+    def _done(self, result, machine, container, d):
+        """ Internally used method which is called when the creation of a
+            container has finished.
+        """
+        self._machines[machine].running -= 1
+        self._dispatch(machine)
+
+        if isinstance(result, Failure):
+            container.setStatus('failed', {'reason':result.getErrorMessage()})
+            d.errback(result)
+        else:
+            container.setStatus('created')
+            d.callback(result)
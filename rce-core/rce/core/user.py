@@ -124,6 +124,29 @@ class User(Avatar):
             raise InvalidRequest('Can not get a non existent endpoint '
                                  "'{0}'.".format(tag))
 
+    def reportStatus(self, tag, status, info):
+        """ Send a status message about a container to all robots of the
+            user.
+
+            @param tag:         Tag of the container.
+            @type  tag:         str
+
+            @param status:      Status of the container.
+            @type  status:      str
+
+            @param info:        Additional information about the status.
+            @type  info:        dict
+        """
+        if not self.robots:
+            return
+
+        msg = dict(info)
+        msg['containerTag'] = tag
+        msg['status'] = status
+
+        for robot in self.robots.itervalues():
+            robot.reportStatus(msg)
+
     def containerDied(self, container):
         """ Callback which is used to inform the user of the death of a
             container.
@@ -131,6 +154,9 @@ class User(Avatar):
         if self.containers:
             for uid, candidate in self.containers.iteritems():
                 if candidate == container:
+                    # The death is not recorded in the journal; the container
+                    # was not destroyed by the user, e.g. its machine was lost,
+                    # and should be restored after a restart of the Master
                     del self.containers[uid]
                     break
         else:
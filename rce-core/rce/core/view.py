@@ -33,6 +33,7 @@
 # Python specific imports
 from uuid import uuid4
 from hashlib import md5
+from urlparse import parse_qs
 
 # twisted specific imports
 from twisted.internet.defer import DeferredList
@@ -71,11 +72,18 @@ class ControlView(Viewable):
             raise InvalidRequest('Tag is already used for a container '
                                  'or robot.')
 
+        # The container consumes some of the keys of the data dictionary
+        config = dict(data)
+
         namespace, remote_container = user.realm.createContainer(user.userID,
                                                                  data)
         container = Container(namespace, remote_container)
         user.containers[tag] = container
         container.notifyOnDeath(user.containerDied)
+        remote_container.notifyOnStatus(
+            lambda _, status, info: user.reportStatus(tag, status, info))
+
+        user.realm.recordChange(user.userID, 'createContainer', tag, config)
 
         m = 'Container {0} successfully created.'.format(tag)
         d = DeferredList([namespace(), remote_container()],
@@ -100,6 +108,8 @@ class ControlView(Viewable):
         container.dontNotifyOnDeath(user.containerDied)
         container.destroy()
 
+        user.realm.recordChange(user.userID, 'destroyContainer', tag)
+
         # TODO: Return some info about success/failure of request
 
     def view_addNode(self, user, cTag, nTag, pkg, exe, args='', name='',
@@ -145,6 +155,9 @@ class ControlView(Viewable):
             raise InvalidRequest('Can not add Node, because Container {0} '
                                  'does not exist.'.format(cTag))
 
+        user.realm.recordChange(user.userID, 'addNode', cTag, nTag, pkg, exe,
+                                args, name, namespace)
+
         # TODO: Return some info about success/failure of request
 
     def view_removeNode(self, user, cTag, nTag):
@@ -168,6 +181,8 @@ class ControlView(Viewable):
             raise InvalidRequest('Can not remove Node, because Container {0} '
                                  'does not exist.'.format(cTag))
 
+        user.realm.recordChange(user.userID, 'removeNode', cTag, nTag)
+
         # TODO: Return some info about success/failure of request
 
     def view_addParameter(self, user, cTag, name, value):
@@ -188,8 +203,9 @@ class ControlView(Viewable):
 
             @param value:       Value of the parameter which should be added.
                                 String values can contain the directives
-                                $(find PKG) or $(env VAR).
-            @type  value:       str, int, float, bool, list
+                                $(find PKG) or $(env VAR). A dictionary
+                                sets a whole namespace.
+            @type  value:       str, int, float, bool, list, dict
         """
         try:
             user.containers[cTag].addParameter(name, value)
@@ -197,6 +213,38 @@ class ControlView(Viewable):
             raise InvalidRequest('Can not add Parameter, because Container '
                                  '{0} does not exist.'.format(cTag))
 
+        user.realm.recordChange(user.userID, 'addParameter', cTag, name, value)
+
+        # TODO: Return some info about success/failure of request
+
+    def view_addParameters(self, user, cTag, parameters):
+        """ Add several parameters to a ROS environment using a single request
+            to the environment. Either all or none of the parameters are added.
+
+            @param user:        User for which the parameters will be added.
+            @type  user:        rce.core.user.User
+
+            @param cTag:        Tag which is used to identify the ROS
+                                environment to which the parameters should be
+                                added.
+            @type  cTag:        str
+
+            @param parameters:  Dictionary mapping the names of the parameters
+                                which should be added to their values. For the
+                                description of the name and value see
+                                'view_addParameter'.
+            @type  parameters:  dict
+        """
+        try:
+            user.containers[cTag].addParameters(parameters)
+        except KeyError:
+            raise InvalidRequest('Can not add Parameters, because Container '
+                                 '{0} does not exist.'.format(cTag))
+
+        for name, value in parameters.iteritems():
+            user.realm.recordChange(user.userID, 'addParameter', cTag, name,
+                                    value)
+
         # TODO: Return some info about success/failure of request
 
     def view_removeParameter(self, user, cTag, name):
@@ -219,6 +267,8 @@ class ControlView(Viewable):
             raise InvalidRequest('Can not remove Parameter, because Container '
                                  '{0} does not exist.'.format(cTag))
 
+        user.realm.recordChange(user.userID, 'removeParameter', cTag, name)
+
         # TODO: Return some info about success/failure of request
 
     def view_addInterface(self, user, eTag, iTag, iType, clsName, addr=''):
@@ -253,12 +303,40 @@ class ControlView(Viewable):
 
             @param addr:        ROS name/address which the interface should
                                 use. Only necessary if the suffix of @param
-                                iType is 'Interface'.
+                                iType is 'Interface'. If the suffix is
+                                'Converter' it can optionally be a comma
+                                separated list of top-level fields which
+                                should be converted to JSON; all other
+                                fields are then sent as binary messages
+                                containing the serialized fields.
+                                For Service-Client Converters and Forwarders
+                                the option 'timeout' can be appended, i.e.
+                                '?timeout=30', to set the time in seconds
+                                after which an unanswered request is dropped.
             @type  addr:        str
         """
         if iType.endswith('Converter') or iType.endswith('Forwarder'):
+            addr, _, query = addr.partition('?')
+
+            if addr and iType.endswith('Converter'):
+                fields = [f.strip() for f in addr.split(',') if f.strip()]
+            else:
+                fields = None
+
             try:
-                user.robots[eTag].addInterface(iTag, iType, clsName)
+                options = parse_qs(query, strict_parsing=True) if query else {}
+                timeout = options.pop('timeout', [None])
+                timeout = float(timeout[0]) if timeout[0] else None
+            except ValueError:
+                raise InvalidRequest('Interface options are not valid.')
+
+            if options:
+                raise InvalidRequest('Interface options are not supported: '
+                                     '{0}'.format(', '.join(options)))
+
+            try:
+                user.robots[eTag].addInterface(iTag, iType, clsName, fields,
+                                               timeout)
             except KeyError:
                 raise InvalidRequest('Can not add Interface, because Robot '
                                      '{0} does not exist.'.format(eTag))
@@ -269,6 +347,11 @@ class ControlView(Viewable):
                 raise InvalidRequest('Can not add Interface, because '
                                      'Container {0} does not '
                                      'exist.'.format(eTag))
+
+            # Only the configuration of containers is journaled; robots
+            # rebuild their interfaces themselves when they reconnect
+            user.realm.recordChange(user.userID, 'addInterface', eTag, iTag,
+                                    iType, clsName, addr)
         else:
             raise InvalidRequest('Interface type is invalid (Unknown suffix).')
 
@@ -292,6 +375,9 @@ class ControlView(Viewable):
         """
         user.getEndpoint(eTag).removeInterface(iTag)
 
+        if eTag in user.containers:
+            user.realm.recordChange(user.userID, 'removeInterface', eTag, iTag)
+
         # TODO: Return some info about success/failure of request
 
     def view_addConnection(self, user, tagA, tagB):
@@ -333,6 +419,9 @@ class ControlView(Viewable):
         user.connections[key] = connection
         connection.notifyOnDeath(user.connectionDied)
 
+        if eTagA in user.containers and eTagB in user.containers:
+            user.realm.recordChange(user.userID, 'addConnection', tagA, tagB)
+
         # TODO: Return some info about success/failure of request
 
     def view_removeConnection(self, user, tagA, tagB):
@@ -360,6 +449,8 @@ class ControlView(Viewable):
         connection.dontNotifyOnDeath(user.connectionDied)
         connection.destroy()
 
+        user.realm.recordChange(user.userID, 'removeConnection', tagA, tagB)
+
         # TODO: Return some info about success/failure of request
 
 
@@ -476,13 +567,14 @@ class AdminMonitorView(Viewable):
                                 listed.
             @type  machineIP:   str
 
-            @return:            Stats of the machine.
-            @rtype:             { str : int }
+            @return:            Stats of the machine. For the description of
+                                the content see rce.core.machine.Machine.stats.
+            @rtype:             dict
         """
         try:
             machine = (machine for machine in user.realm._balancer._machines
                        if machineIP == machine.IP).next()
-            return {'active':machine.active, 'size':machine.size}
+            return machine.stats
         except StopIteration:
             raise InvalidRequest('No such machine.')
 
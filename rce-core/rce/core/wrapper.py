@@ -123,7 +123,15 @@ class Robot(_Wrapper):
         d.addCallback(lambda addr: addr)
         return d
 
-    def addInterface(self, iTag, iType, clsName):
+    def reportStatus(self, msg):
+        """ Send a status message to the robot.
+
+            @param msg:         Status message which should be sent.
+            @type  msg:         dict
+        """
+        self._obj.callRemote('reportStatus', msg).addErrback(lambda _: None)
+
+    def addInterface(self, iTag, iType, clsName, fields=None, timeout=None):
         """ Add an interface to the Robot object.
 
             @param iTag:        Tag which is used to identify the interface in
@@ -143,6 +151,17 @@ class Robot(_Wrapper):
                                 package and the name of the message/service,
                                 i.e. 'std_msgs/Int32'.
             @type  clsName:     str
+
+            @param fields:      Top-level fields which should be converted to
+                                JSON by a Converter, or None to convert all
+                                fields. All other fields are sent in their
+                                serialized form.
+            @type  fields:      [str]
+
+            @param timeout:     Time in seconds after which a request of a
+                                Service-Client which was not answered by the
+                                robot is dropped, or None to use the default.
+            @type  timeout:     float
         """
         try:
             validateName(iTag)
@@ -158,7 +177,20 @@ class Robot(_Wrapper):
         except TypeError:
             raise InvalidRequest('Interface type is invalid.')
 
-        interface = self._obj.createInterface(iType, clsName, iTag)
+        if fields and iType // 4 != Types.CONVERTER:
+            raise InvalidRequest('Only Converters can select the fields which '
+                                 'are converted to JSON.')
+
+        if timeout is not None:
+            if iType % 4 != Types.SERVICE_CLIENT:
+                raise InvalidRequest('Only Service-Clients can have a '
+                                     'timeout.')
+
+            if timeout <= 0:
+                raise InvalidRequest('Timeout has to be positive.')
+
+        interface = self._obj.createInterface(iType, clsName, iTag, fields,
+                                              timeout)
         interface = Interface(interface, iType, clsName)
         self._interfaces[iTag] = interface
         interface.notifyOnDeath(self._interfaceDied)
@@ -300,8 +332,37 @@ class Container(_Wrapper):
             @type  name:        str
 
             @param value:       Value of the parameter which should be added.
-            @type  value:       str, int, float, bool, list
+                                A dictionary sets a whole namespace.
+            @type  value:       str, int, float, bool, list, dict
+        """
+        self._checkParameterName(name)
+
+        parameter = self._obj.createParameter(name, value)
+        self._parameters[name] = parameter
+        parameter.notifyOnDeath(self._parameterDied)
+
+    def addParameters(self, parameters):
+        """ Add several parameters to the ROS environment inside the container
+            using a single request. Either all or none of the parameters are
+            added.
+
+            @param parameters:  Dictionary mapping the names of the parameters
+                                which should be added to their values. For the
+                                description of the name and value see
+                                'addParameter'.
+            @type  parameters:  dict
         """
+        for name in parameters:
+            self._checkParameterName(name)
+
+        items = parameters.items()
+        created = self._obj.createParameters(items)
+
+        for (name, _), parameter in zip(items, created):
+            self._parameters[name] = parameter
+            parameter.notifyOnDeath(self._parameterDied)
+
+    def _checkParameterName(self, name):
         if not name:
             raise InvalidRequest('Parameter name is not a valid.')
 
@@ -309,10 +370,6 @@ class Container(_Wrapper):
             raise InvalidRequest("Can not use the same parameter name '{0}' "
                                  'in the same container twice.'.format(name))
 
-        parameter = self._obj.createParameter(name, value)
-        self._parameters[name] = parameter
-        parameter.notifyOnDeath(self._parameterDied)
-
     def removeParameter(self, name):
         """ Remove a parameter from the ROS environment inside the container.
 
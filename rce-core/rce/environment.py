@@ -38,13 +38,15 @@ import rospy
 
 # twisted specific imports
 from twisted.python import log
+from twisted.internet.defer import DeferredList
 from twisted.spread.pb import PBClientFactory
 
 # rce specific imports
 from rce.util.error import InternalError
 from rce.util.loader import Loader
 from rce.monitor.node import Node
-from rce.monitor.parameter import Parameter
+from rce.monitor.forkserver import ForkServer
+from rce.monitor.parameter import ParameterServer, Parameter
 from rce.monitor.interface.environment import PublisherInterface, \
     SubscriberInterface, ServiceClientInterface, ServiceProviderInterface
 from rce.slave.endpoint import Endpoint
@@ -76,6 +78,16 @@ class Environment(Namespace):
         self._nodes = set()
         self._parameters = set()
 
+    @property
+    def forkServer(self):
+        """ Fork server which is used to start Python nodes, or None. """
+        return self._endpoint.forkServer
+
+    @property
+    def parameterServer(self):
+        """ Client for the ROS parameter server. """
+        return self._endpoint.parameterServer
+
     def registerNode(self, node):
         assert node not in self._nodes
         self._nodes.add(node)
@@ -128,9 +140,53 @@ class Environment(Namespace):
             @type  name:        str
 
             @param value:       Value of the parameter which should be added.
-            @type  value:       str, int, float, bool, list
+                                A dictionary sets a whole namespace.
+            @type  value:       str, int, float, bool, list, dict
+
+            @return:            Deferred which fires with the new Parameter as
+                                soon as it has been added to the parameter
+                                server.
+            @rtype:             twisted.internet.defer.Deferred
         """
-        return Parameter(self, name, value)
+        return Parameter(self, name, value).register()
+
+    def remote_createParameters(self, parameters):
+        """ Create several Parameter objects in the environment namespace at
+            once. The parameters are added to the parameter server in a
+            single batch. Either all or none of the parameters are added.
+
+            @param parameters:  Names and values of the parameters which
+                                should be added. For the description of the
+                                name and value see 'remote_createParameter'.
+            @type  parameters:  [ (str, str/int/float/bool/list/dict) ]
+
+            @return:            Deferred which fires with the list of new
+                                Parameters, in the same order as the given
+                                names and values, as soon as all of them have
+                                been added to the parameter server.
+            @rtype:             twisted.internet.defer.Deferred
+        """
+        created = []
+
+        try:
+            for name, value in parameters:
+                created.append(Parameter(self, name, value))
+        except:
+            for parameter in created:
+                parameter.remote_destroy()
+
+            raise
+
+        def eb(failure):
+            for parameter in created:
+                parameter.remote_destroy()
+
+            return failure.value.subFailure
+
+        d = DeferredList([parameter.register() for parameter in created],
+                         fireOnOneErrback=True, consumeErrors=True)
+        d.addCallbacks(lambda _: created, eb)
+        return d
 
     def remote_destroy(self):
         """ Method should be called to destroy the environment and will take
@@ -156,7 +212,7 @@ class EnvironmentClient(Endpoint):
     """ Environment client is responsible for the cloud engine components
         inside a container.
     """
-    def __init__(self, reactor, commPort):
+    def __init__(self, reactor, commPort, forkServer=False):
         """ Initialize the Environment Client.
 
             @param reactor:     Reference to the twisted reactor used in this
@@ -167,10 +223,29 @@ class EnvironmentClient(Endpoint):
                                 internal communication will listen for incoming
                                 connections.
             @type  commPort:    int
+
+            @param forkServer:  Flag which is True if Python nodes should be
+                                forked by a fork server which has already
+                                imported rospy and common message modules.
+            @type  forkServer:  bool
         """
-        Endpoint.__init__(self, reactor, Loader(), commPort)
+        Endpoint.__init__(self, reactor,
+                          Loader(indexPath='/opt/rce/data/loader.index'),
+                          commPort)
 
         self._dbFile = '/opt/rce/data/rosenvbridge.db' # TODO: Hardcoded?
+        self._forkServer = ForkServer(reactor) if forkServer else None
+        self._parameterServer = ParameterServer(reactor)
+
+    @property
+    def forkServer(self):
+        """ Fork server which is used to start Python nodes, or None. """
+        return self._forkServer
+
+    @property
+    def parameterServer(self):
+        """ Client for the ROS parameter server. """
+        return self._parameterServer
 
     def createEnvironment(self, _):
         """ Create the Environment namespace.
@@ -199,8 +274,22 @@ class EnvironmentClient(Endpoint):
             fcntl.flock(bridgefile.fileno(), fcntl.LOCK_EX)
             bridgefile.write('{0}:{1}\n'.format(userID, key))
 
+    def terminate(self):
+        """ Method should be called to terminate the endpoint before the
+            reactor is stopped.
+
+            @return:            Deferred which fires as soon as the client is
+                                ready to stop the reactor.
+            @rtype:             twisted.internet.defer.Deferred
+        """
+        if self._forkServer:
+            self._forkServer.stop()
+
+        return Endpoint.terminate(self)
 
-def main(reactor, cred, masterIP, masterPort, commPort, uid):
+
+def main(reactor, cred, masterIP, masterPort, commPort, uid,
+         forkServer=False, preload=()):
     f = open('/opt/rce/data/env.log', 'w') # TODO: Use os.getenv('HOME') ?
     log.startLogging(f)
 
@@ -210,7 +299,10 @@ def main(reactor, cred, masterIP, masterPort, commPort, uid):
     factory = PBClientFactory()
     reactor.connectTCP(masterIP, masterPort, factory)
 
-    client = EnvironmentClient(reactor, commPort)
+    client = EnvironmentClient(reactor, commPort, forkServer)
+
+    if preload:
+        client.preload(preload)
 
     def terminate():
         reactor.callFromThread(client.terminate)
@@ -54,6 +54,9 @@ from rce.core.network import Network
 from rce.core.environment import EnvironmentEndpoint, EnvironmentEndpointAvatar
 from rce.core.robot import RobotEndpoint, RobotEndpointAvatar
 from rce.core.user import User
+from rce.core.view import ControlView
+from rce.core.error import InvalidRequest
+from rce.core.journal import Journal
 
 
 class UserRealm(object):
@@ -83,23 +86,42 @@ class RoboEarthCloudEngine(object):
     """
     implements(IRealm, IMasterRealm)
 
-    def __init__(self, checker, port):
+    # CONFIG
+    RESTORE_DELAY = 5
+
+    def __init__(self, reactor, checker, journal=None, concurrency=2,
+                 policy='load'):
         """ Initialize the RoboEarth Cloud Engine realm.
 
+            @param reactor:     Reference to the twisted reactor.
+            @type  reactor:     twisted::reactor
+
             @param checker:     Login checker which authenticates the User when
                                 an initial request is received.
             @type  checker:     twisted.cred.checkers.ICredentialsChecker
 
-            @param port:        Port where the robot process is listening for
-                                connections from other endpoints.
-            @type  port:        int
+            @param journal:     Journal which is used to persist the
+                                configuration of the users across restarts
+                                of the Master, or None to disable it.
+            @type  journal:     rce.core.journal.Journal
+
+            @param concurrency: Maximum number of containers which are started
+                                concurrently in a single machine.
+            @type  concurrency: int
+
+            @param policy:      Name of the policy which is used to distribute
+                                the robots to the robot processes.
+            @type  policy:      str
         """
+        self._reactor = reactor
         self._checker = checker
-        self._port = port
+
+        self._journal = journal
+        self._restoreState = journal.load() if journal else None
 
         self._network = Network()
-        self._balancer = LoadBalancer()
-        self._distributor = Distributor()
+        self._balancer = LoadBalancer(concurrency)
+        self._distributor = Distributor(policy)
 
         self._users = {}
         self._pendingContainer = {}
@@ -120,9 +142,15 @@ class RoboEarthCloudEngine(object):
             avatar = MachineAvatar(machine, self._balancer)
             detach = lambda: avatar.logout()
             print('Connection to Container process established.')
+
+            if self._restoreState:
+                # Give the remaining container processes some time to
+                # reconnect before the journaled configuration is restored
+                self._restoreState, state = None, self._restoreState
+                self._reactor.callLater(self.RESTORE_DELAY, self._restore,
+                                        state)
         elif avatarId == 'robot':
-            endpoint = RobotEndpoint(self._network, self._distributor,
-                                     self._port)
+            endpoint = RobotEndpoint(self._network, self._distributor)
             endpoint.callback(mind)
             avatar = RobotEndpointAvatar(self, endpoint)
             detach = lambda: avatar.logout()
@@ -167,7 +195,8 @@ class RoboEarthCloudEngine(object):
             @rtype:             twisted.internet.defer.Deferred
         """
         try:
-            location = self._distributor.getNextLocation()
+            hosts = self._balancer.getUserHosts(userID)
+            location = self._distributor.getNextLocation(userID, hosts)
         except RobotProcessError:
             # TODO: What should we do here?
             raise InternalError('Robot can not be created.')
@@ -227,6 +256,73 @@ class RoboEarthCloudEngine(object):
         """
         return self._network.createConnection(interfaceA, interfaceB)
 
+    def registerIAASHook(self, hook, headroom=0, idleTimeout=600):
+        """ Register an IaaS hook which is used by the Load Balancer to add
+            and remove machines depending on the demand.
+
+            For the description of the arguments see
+            rce.core.machine.LoadBalancer.registerIAASHook.
+        """
+        self._balancer.registerIAASHook(hook, self._reactor, headroom,
+                                        idleTimeout)
+
+    def recordChange(self, userID, op, *args):
+        """ Callback for the ControlView to record a configuration change of a
+            user in the journal.
+
+            @param userID:      User ID of the user who made the change.
+            @type  userID:      str
+
+            @param op:          Name of the ControlView operation without the
+                                prefix 'view_'.
+            @type  op:          str
+
+            @param *args:       Arguments of the operation (without the user).
+        """
+        if self._journal:
+            self._journal.record(userID, op, *args)
+
+    def _restore(self, state):
+        """ Restore the configuration of all users as it was recorded in the
+            journal before the Master was restarted.
+
+            @param state:       State of all users as returned by the journal.
+            @type  state:       dict
+        """
+        view = ControlView()
+
+        def logErr(failure, tag):
+            log.msg('Container {0} could not be restored: '
+                    '{1}'.format(tag, failure.getErrorMessage()))
+
+        for userID, userState in state.iteritems():
+            user = self.getUser(userID)
+
+            for tag, container in userState['containers'].iteritems():
+                try:
+                    d = view.view_createContainer(user, tag, container['data'])
+                    d.addErrback(logErr, tag)
+
+                    for nTag, args in container['nodes'].iteritems():
+                        view.view_addNode(user, tag, nTag, *args)
+
+                    if container['parameters']:
+                        view.view_addParameters(user, tag,
+                                                container['parameters'])
+
+                    for iTag, args in container['interfaces'].iteritems():
+                        view.view_addInterface(user, tag, iTag, *args)
+                except (InvalidRequest, InternalError) as e:
+                    log.msg('Container {0} could not be restored: '
+                            '{1}'.format(tag, e))
+
+            for tagA, tagB in userState['connections']:
+                try:
+                    view.view_addConnection(user, tagA, tagB)
+                except InvalidRequest as e:
+                    log.msg('Connection between {0} and {1} could not be '
+                            'restored: {2}'.format(tagA, tagB, e))
+
     def preShutdown(self):
         """ Method is executed by the twisted reactor when a shutdown event
             is triggered, before the reactor is being stopped.
@@ -242,17 +338,35 @@ class RoboEarthCloudEngine(object):
         self._balancer.cleanUp()
         self._distributor.cleanUp()
 
+        if self._journal:
+            self._journal.stop()
+
 
 def main(reactor, internalCred, externalCred, internalPort, externalPort,
-         commPort, consolePort):
+         consolePort, journalPath=None, iaasHook=None,
+         iaasHeadroom=0, iaasIdleTimeout=600, creationConcurrency=2,
+         distributionPolicy='load'):
     log.startLogging(sys.stdout)
 
+    # Journal
+    if journalPath:
+        journal = Journal(journalPath)
+    else:
+        journal = None
+
     # Realms
-    rce = RoboEarthCloudEngine(externalCred, commPort)
+    rce = RoboEarthCloudEngine(reactor, externalCred, journal,
+                               creationConcurrency, distributionPolicy)
     user = UserRealm(rce)
 
     internalCred.add_checker(rce.checkUIDValidity)
 
+    # IaaS
+    if iaasHook:
+        module, className = iaasHook.rsplit('.', 1)
+        hook = getattr(__import__(module, fromlist=[className]), className)
+        rce.registerIAASHook(hook(reactor), iaasHeadroom, iaasIdleTimeout)
+
     # Portals
     rcePortal = Portal(rce, (internalCred,))
     consolePortal = Portal(user, (externalCred,))
@@ -267,4 +381,7 @@ def main(reactor, internalCred, externalCred, internalPort, externalPort,
     reactor.addSystemEventTrigger('before', 'shutdown', rce.preShutdown)
     reactor.addSystemEventTrigger('after', 'shutdown', rce.postShutdown)
 
+    if journal:
+        journal.start()
+
     reactor.run()
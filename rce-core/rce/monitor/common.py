@@ -48,6 +48,10 @@ class ArgumentMixin(object):
     _RE_FIND = re.compile('\\$\\( *find +(?P<pkg>[a-zA-Z][a-zA-z0-9_]*) *\\)')
     _RE_ENV = re.compile('\\$\\( *env +(?P<var>[a-zA-Z][a-zA-z0-9_]*) *\\)')
 
+    # Resolved arguments, shared by all instances
+    _ARG_CACHE_SIZE = 256
+    _argCache = {}
+
     def __init__(self, loader, *args, **kw):
         """ Initialize the argument mixin. It needs the manager instance as
             fist argument.
@@ -57,12 +61,14 @@ class ArgumentMixin(object):
             @type  loader:      rce.util.loader.Loader
         """
         self._loader = loader
+        self._findPaths = []
 
     def _replaceFind(self, match):
         """ Internally used method to replace found matches of _RE_FIND regular
             expression with corresponding package path.
         """
         path = self._loader.findPkgPath(match.group('pkg'))
+        self._findPaths.append(path)
         return '"{0}"'.format(path) if ' ' in path else path
 
     def _replaceEnv(self, match):
@@ -88,7 +94,24 @@ class ArgumentMixin(object):
         if not isinstance(value, basestring):
             return value
 
-        value = self._RE_FIND.subn(self._replaceFind, value)[0]
-        value = self._RE_ENV.subn(self._replaceEnv, value)[0]
+        if '$' not in value:
+            return value
+
+        # The environment variables of the process do not change; therefore,
+        # the cached result can be used as long as the package paths exist
+        cache = ArgumentMixin._argCache
+        key = (self._loader, value)
+        resolved = cache.get(key)
+
+        if resolved and all(os.path.exists(path) for path in resolved[1]):
+            return resolved[0]
+
+        self._findPaths = []
+        result = self._RE_FIND.subn(self._replaceFind, value)[0]
+        result = self._RE_ENV.subn(self._replaceEnv, result)[0]
+
+        if len(cache) >= self._ARG_CACHE_SIZE:
+            cache.clear()
 
-        return value
+        cache[key] = (result, self._findPaths)
+        return result
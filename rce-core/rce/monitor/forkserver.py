@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-core/rce/monitor/forkserver.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+# Python specific imports
+import os
+import sys
+import json
+import errno
+import fcntl
+import runpy
+import select
+import signal
+import traceback
+from itertools import count
+
+# twisted specific imports
+from twisted.python import log
+from twisted.python.failure import Failure
+from twisted.internet.error import ProcessDone, ProcessTerminated, \
+    ProcessExitedAlready
+from twisted.internet.protocol import ProcessProtocol
+
+
+# Modules which are imported by the fork server before nodes are forked
+PRELOAD = ('rospy', 'std_msgs.msg', 'geometry_msgs.msg', 'sensor_msgs.msg',
+           'nav_msgs.msg', 'tf')
+
+
+class _ForkedProcess(object):
+    """ Transport which is used by the node protocol to signal a node which
+        has been forked by the fork server.
+    """
+    def __init__(self):
+        self.pid = None
+        self._exited = False
+        self._pending = []
+
+    def started(self, pid):
+        self.pid = pid
+
+        for signalID in self._pending:
+            os.kill(pid, signalID)
+
+        self._pending = []
+
+    def exited(self):
+        self.pid = None
+        self._exited = True
+
+    def signalProcess(self, signalID):
+        if self._exited:
+            raise ProcessExitedAlready()
+
+        if signalID in ('INT', 'TERM', 'KILL'):
+            signalID = getattr(signal, 'SIG{0}'.format(signalID))
+
+        if self.pid is None:
+            # Node has not yet been forked
+            self._pending.append(signalID)
+        else:
+            try:
+                os.kill(self.pid, signalID)
+            except OSError as e:
+                if e.errno == errno.ESRCH:
+                    raise ProcessExitedAlready()
+
+                raise
+
+
+class ForkServer(ProcessProtocol):
+    """ Client for the fork server, which is a Python process that has
+        already imported rospy and common message modules and which forks
+        the Python nodes instead of starting a new interpreter for each node.
+        The nodes are monitored using the same process protocol as nodes
+        which are spawned normally.
+    """
+    def __init__(self, reactor, preload=PRELOAD):
+        """ Initialize and start the Fork Server.
+
+            @param reactor:     Reference to the twisted reactor.
+            @type  reactor:     twisted::reactor
+
+            @param preload:     Names of the modules which should be imported
+                                by the fork server.
+            @type  preload:     [ str ]
+        """
+        self._buffer = ''
+        self._running = False
+        self._counter = count()
+        self._nodes = {}
+
+        cmd = [sys.executable, '-m', 'rce.monitor.forkserver'] + list(preload)
+        reactor.spawnProcess(self, cmd[0], cmd, env=os.environ)
+
+    @property
+    def running(self):
+        """ Flag which is True if the fork server is ready to fork nodes. """
+        return self._running
+
+    def spawn(self, protocol, cmd, out, err):
+        """ Fork a new Python node.
+
+            @param protocol:    Process protocol which is used to monitor the
+                                node.
+            @type  protocol:    twisted.internet.protocol.ProcessProtocol
+
+            @param cmd:         Command which should be executed, where the
+                                first element is the path to the Python script.
+            @type  cmd:         [ str ]
+
+            @param out:         Path to the file to which the standard output
+                                of the node should be written.
+            @type  out:         str
+
+            @param err:         Path to the file to which the standard error
+                                of the node should be written.
+            @type  err:         str
+        """
+        if not self._running:
+            raise ProcessExitedAlready('Fork server is not running.')
+
+        uid = self._counter.next()
+        self._nodes[uid] = protocol
+        self.transport.write(json.dumps({'id':uid, 'argv':cmd, 'out':out,
+                                         'err':err}))
+        self.transport.write('\n')
+        protocol.makeConnection(_ForkedProcess())
+
+    def stop(self):
+        """ Stop the fork server, which terminates all nodes which are still
+            running.
+        """
+        if self._running:
+            self._running = False
+            self.transport.closeStdin()
+
+    def connectionMade(self):
+        self._running = True
+
+    def outReceived(self, data):
+        self._buffer += data
+
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                log.msg('Fork server: {0}'.format(line.strip()))
+                continue
+
+            if msg[0] == 'started':
+                self._nodes[msg[1]].transport.started(msg[2])
+            elif msg[0] == 'exited':
+                self._ended(msg[1], msg[2], msg[3])
+            elif msg[0] == 'failed':
+                log.msg('Fork server could not start node: '
+                        '{0}'.format(msg[2]))
+                self._ended(msg[1], 1, None)
+
+    def errReceived(self, data):
+        log.msg('Fork server: {0}'.format(data.strip()))
+
+    def _ended(self, uid, exitCode, signalID):
+        protocol = self._nodes.pop(uid)
+        protocol.transport.exited()
+
+        if exitCode == 0 and signalID is None:
+            reason = ProcessDone(0)
+        else:
+            reason = ProcessTerminated(exitCode, signalID)
+
+        protocol.processEnded(Failure(reason))
+
+    def processEnded(self, reason):
+        self._running = False
+
+        if self._nodes:
+            log.msg('Fork server terminated while nodes were running: '
+                    '{0}'.format(reason.getErrorMessage()))
+
+        for uid in self._nodes.keys():
+            self._ended(uid, None, signal.SIGKILL)
+
+
+def _runNode(argv, out, err):
+    """ Internally used function which runs a node in the forked child
+        process and never returns.
+    """
+    code = 1
+
+    try:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+        null = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(null, 0)
+
+        for path, fd in ((out, 1), (err, 2)):
+            f = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0644)
+            os.dup2(f, fd)
+            os.close(f)
+
+        sys.argv = [arg.encode('utf-8') for arg in argv]
+        sys.path[0] = os.path.dirname(sys.argv[0])
+        runpy.run_path(sys.argv[0], run_name='__main__')
+        code = 0
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            sys.stderr.write('{0}\n'.format(e.code))
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _serve(preload):
+    """ Internally used function which runs the fork server loop, which
+        reads the requests from the standard input and reports the state of
+        the forked nodes on the standard output.
+    """
+    # The protocol uses a duplicate of the standard output; the standard
+    # output itself is redirected to the standard error such that output of
+    # the preloaded modules can not corrupt the protocol
+    protocol = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+
+    for module in preload:
+        try:
+            __import__(module)
+        except ImportError as e:
+            sys.stderr.write('Can not preload {0}: {1}\n'.format(module, e))
+
+    def send(*msg):
+        protocol.write(json.dumps(msg))
+        protocol.write('\n')
+        protocol.flush()
+
+    # Use a pipe to wake up the select call when a node has terminated
+    wakeupR, wakeupW = os.pipe()
+    fcntl.fcntl(wakeupW, fcntl.F_SETFL, os.O_NONBLOCK)
+    signal.set_wakeup_fd(wakeupW)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+
+    stdin = sys.stdin.fileno()
+    children = {}
+    buf = ''
+
+    while 1:
+        try:
+            ready = select.select([stdin, wakeupR], [], [])[0]
+        except select.error as e:
+            if e.args[0] == errno.EINTR:
+                continue
+
+            raise
+
+        if wakeupR in ready:
+            os.read(wakeupR, 512)
+
+        if stdin in ready:
+            data = os.read(stdin, 4096)
+
+            if not data:
+                break
+
+            buf += data
+
+            while '\n' in buf:
+                line, buf = buf.split('\n', 1)
+                req = json.loads(line)
+
+                try:
+                    pid = os.fork()
+                except OSError as e:
+                    send('failed', req['id'], str(e))
+                    continue
+
+                if not pid:
+                    os.close(wakeupR)
+                    os.close(wakeupW)
+                    protocol.close()
+                    _runNode(req['argv'], req['out'], req['err'])
+
+                children[pid] = req['id']
+                send('started', req['id'], pid)
+
+        while children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except OSError as e:
+                if e.errno == errno.ECHILD:
+                    break
+
+                raise
+
+            if not pid:
+                break
+
+            if os.WIFSIGNALED(status):
+                send('exited', children.pop(pid), None, os.WTERMSIG(status))
+            else:
+                send('exited', children.pop(pid), os.WEXITSTATUS(status),
+                     None)
+
+    # The environment process has closed the connection
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    _serve(sys.argv[1:])
@@ -32,6 +32,7 @@
 
 # Python specific imports
 from threading import Event, Lock
+from urlparse import parse_qs
 from uuid import uuid4
 
 # ROS specific imports
@@ -40,9 +41,11 @@ from genpy.message import Message
 import rospy
 
 # twisted specific imports
+from twisted.python import log
 from twisted.internet.threads import deferToThreadPool
 
 # rce specific imports
+from rce.util.cache import ResponseCache
 from rce.util.error import InternalError
 from rce.util.ros import decorator_has_connection
 from rce.slave.interface import Interface, InvalidResoureName
@@ -53,6 +56,65 @@ rospy.topics._TopicImpl.has_connection = \
     decorator_has_connection(rospy.topics._TopicImpl.has_connection)
 
 
+def _parseFlag(value):
+    """ Internally used function to convert the value of a boolean option.
+    """
+    value = value.lower()
+
+    if value in ('1', 'true', 'yes'):
+        return True
+    elif value in ('0', 'false', 'no'):
+        return False
+
+    raise ValueError('Invalid flag.')
+
+
+def _parseOptions(addr, valid):
+    """ Internally used function to split the options of an interface from
+        its ROS name. The options are appended to the ROS name in the form of
+        a query string, i.e. '/service?cacheTTL=60&cacheSize=128', which is
+        unambiguous since a ROS name can not contain the character '?'.
+
+        @param addr:            ROS name/address with the appended options.
+        @type  addr:            str
+
+        @param valid:           Valid options and a function for each which
+                                converts the value of the option.
+        @type  valid:           { str : callable }
+
+        @return:                ROS name/address and the converted options.
+        @rtype:                 (str, { str : value })
+
+        @raise:                 rce.slave.interface.InvalidResoureName
+    """
+    if '?' not in addr:
+        return addr, {}
+
+    addr, query = addr.split('?', 1)
+
+    try:
+        options = parse_qs(query, strict_parsing=True)
+    except ValueError:
+        raise InvalidResoureName('Interface options are not valid.')
+
+    for name, value in options.iteritems():
+        if name not in valid:
+            raise InvalidResoureName("Interface option '{0}' is not "
+                                     'supported.'.format(name))
+
+        if len(value) != 1:
+            raise InvalidResoureName("Interface option '{0}' has to be "
+                                     'unique.'.format(name))
+
+        try:
+            options[name] = valid[name](value[0])
+        except ValueError:
+            raise InvalidResoureName("Interface option '{0}' has an invalid "
+                                     'value.'.format(name))
+
+    return addr, options
+
+
 class _ROSInterfaceBase(Interface):
     """ Abstract base class which provides the basics for the ROS-side
         interfaces.
@@ -85,8 +147,46 @@ class _ROSInterfaceBase(Interface):
 
 class ServiceClientInterface(_ROSInterfaceBase):
     """ Class which is used as a Service-Client Interface.
+
+        The responses of an idempotent service can be cached by appending the
+        options 'cacheTTL' (time in seconds for which a response is valid)
+        and/or 'cacheSize' (maximal number of cached responses) to the ROS
+        name, i.e. '/service?cacheTTL=60&cacheSize=128'. Requests which are
+        identical to a cached request are then answered without calling the
+        service.
+
+        With the option 'coalesce', i.e. '/service?coalesce=1', concurrent
+        identical requests share a single call of the service, whose response
+        is sent to all of the callers.
     """
+    _OPTIONS = {'cacheTTL' : float, 'cacheSize' : int, 'coalesce' : _parseFlag}
+
+    # CONFIG
+    CACHE_TTL = 60
+    CACHE_SIZE = 128
+
     def __init__(self, owner, uid, clsName, addr):
+        addr, options = _parseOptions(addr, self._OPTIONS)
+
+        if 'cacheTTL' in options or 'cacheSize' in options:
+            try:
+                self._cache = ResponseCache(
+                    options.get('cacheSize', self.CACHE_SIZE),
+                    options.get('cacheTTL', self.CACHE_TTL),
+                    owner.reactor.seconds)
+            except ValueError as e:
+                raise InvalidResoureName(str(e))
+        else:
+            self._cache = None
+
+        self._coalesce = options.get('coalesce', False)
+
+        # Key:    serialized request
+        # Value:  list of callers waiting for the response, where each caller
+        #         is a tuple (msgID, protocol, remoteID)
+        self._inFlight = {}
+        self._coalesced = 0
+
         _ROSInterfaceBase.__init__(self, owner, uid, clsName, ('SC', addr))
 
         try:
@@ -101,11 +201,40 @@ class ServiceClientInterface(_ROSInterfaceBase):
 
     __init__.__doc__ = _ROSInterfaceBase.__init__.__doc__
 
+    def _stop(self):
+        if self._cache:
+            log.msg("Response cache of service '{0}': {1} hits, {2} misses, "
+                    '{3} evictions'.format(self._addr[1], self._cache.hits,
+                                           self._cache.misses,
+                                           self._cache.evictions))
+            self._cache.clear()
+
+        if self._coalesce:
+            log.msg("Coalesced calls of service '{0}': "
+                    '{1}'.format(self._addr[1], self._coalesced))
+
     def _send(self, msg, msgID, protocol, remoteID):
+        if self._cache:
+            resp = self._cache.get(msg)
+
+            if resp is not None:
+                self.respond(resp, msgID, protocol, remoteID)
+                return
+
+        caller = (msgID, protocol, remoteID)
+
+        if self._coalesce:
+            if msg in self._inFlight:
+                self._inFlight[msg].append(caller)
+                self._coalesced += 1
+                return
+
+            self._inFlight[msg] = [caller]
+
         d = deferToThreadPool(self._reactor, self._reactor.getThreadPool(),
                               self._threadedCall, msg)
-        d.addCallback(self._respond, msgID, protocol, remoteID)
-        d.addErrback(self._errHandler)
+        d.addCallback(self._respond, msg, caller)
+        d.addErrback(self._errHandler, msg)
 
     def _threadedCall(self, msg):
         rosMsg = rospy.AnyMsg()
@@ -115,10 +244,22 @@ class ServiceClientInterface(_ROSInterfaceBase):
         serviceFunc = rospy.ServiceProxy(self._addr[1], self._srvCls)
         return serviceFunc(rosMsg)
 
-    def _respond(self, resp, msgID, protocol, remoteID):
-        self.respond(resp._buff, msgID, protocol, remoteID)
+    def _respond(self, resp, req, caller):
+        if self._cache:
+            self._cache.put(req, resp._buff)
+
+        if self._coalesce:
+            callers = self._inFlight.pop(req)
+        else:
+            callers = (caller,)
+
+        for msgID, protocol, remoteID in callers:
+            self.respond(resp._buff, msgID, protocol, remoteID)
+
+    def _errHandler(self, e, req):
+        if self._coalesce:
+            self._inFlight.pop(req, None)
 
-    def _errHandler(self, e):
         if e.check(rospy.ROSInterruptException):
             pass  # TODO: How should the error be returned?
         elif e.check(rospy.ROSSerializationException):
@@ -129,8 +270,23 @@ class ServiceClientInterface(_ROSInterfaceBase):
 
 class ServiceProviderInterface(_ROSInterfaceBase):
     """ Class which is used as a Service-Provider Interface.
+
+        A service call which is not answered within the time given by the
+        option 'timeout' (in seconds), i.e. '/service?timeout=30', fails with
+        a rospy.ServiceException.
     """
+    _OPTIONS = {'timeout' : float}
+
+    # CONFIG
+    TIMEOUT = 60
+
     def __init__(self, owner, uid, clsName, addr):
+        addr, options = _parseOptions(addr, self._OPTIONS)
+        self._timeout = options.get('timeout', self.TIMEOUT)
+
+        if self._timeout <= 0:
+            raise InvalidResoureName('Timeout has to be positive.')
+
         _ROSInterfaceBase.__init__(self, owner, uid, clsName, ('SP', addr))
 
         try:
@@ -200,12 +356,16 @@ class ServiceProviderInterface(_ROSInterfaceBase):
         self._reactor.callFromThread(self.received, request._buff, msgID)
 
         # Block execution here until the event is set, i.e. a response has
-        # arrived
-        event.wait()
+        # arrived, or the timeout has passed
+        event.wait(self._timeout)
 
         with self._pendingLock:
             response = self._pending.pop(msgID, None)
 
+        if response is event:
+            raise rospy.ServiceException('Service call timed out after '
+                                         '{0}s.'.format(self._timeout))
+
         if not isinstance(response, Message):
             # TODO: Change exception?
             raise rospy.ROSInterruptException('Interrupted.')
@@ -46,8 +46,12 @@ except ImportError:
     def _checkIsStringIO(obj):
         return isinstance(obj, StringIO)
 
+# twisted specific imports
+from twisted.python import log
+
 # rce specific imports
 from rce.util.error import InternalError
+from rce.util.layout import HybridCodec
 from rce.slave.interface import Interface, InvalidResoureName
 from rce.util.settings import getSettings
 settings = getSettings()
@@ -109,7 +113,18 @@ class _AbstractConverter(Interface):
 class _ConverterBase(_AbstractConverter):
     """ Class which implements the basic functionality of a Converter.
     """
-    def __init__(self, owner, uid, clsName, tag):
+    def __init__(self, owner, uid, clsName, tag, fields=None):
+        """ Initialize the Converter.
+
+            For the description of the other arguments see
+            rce.monitor.interface.robot._AbstractConverter.__init__.
+
+            @param fields:      Top-level fields which should be converted to
+                                JSON, or None to convert all fields. All other
+                                fields are sent as binary messages containing
+                                the serialized fields.
+            @type  fields:      [str]
+        """
         _AbstractConverter.__init__(self, owner, uid, clsName, tag)
 
         self._converter = owner.converter
@@ -119,7 +134,38 @@ class _ConverterBase(_AbstractConverter):
 
         self._loadClass(owner.loader)
 
-    __init__.__doc__ = _AbstractConverter.__init__.__doc__
+        self._inputCodec = None
+        self._outputCodec = None
+
+        if fields:
+            self._createCodecs(owner.loader, fields)
+
+    def _createCodecs(self, loader, fields):
+        """ Internally used method to create the codecs for the message
+            classes which contain at least one of the selected fields.
+        """
+        used = set()
+
+        def create(msgCls):
+            if not msgCls:
+                return None
+
+            selected = [f for f in fields if f in msgCls.__slots__]
+
+            if not selected:
+                return None
+
+            used.update(selected)
+            return HybridCodec(loader, self._converter, msgCls, selected)
+
+        self._inputCodec = create(self._inputMsgCls)
+        self._outputCodec = create(self._outputMsgCls)
+
+        unknown = set(fields) - used
+
+        if unknown:
+            raise InvalidResoureName('Message type does not have the fields '
+                                     '{0}.'.format(', '.join(unknown)))
 
     def _loadClass(self, loader):
         """ This method is used as a hook to load the necessary ROS class
@@ -158,14 +204,23 @@ class _ConverterBase(_AbstractConverter):
             raise InvalidResoureName('Sent message type does not match the '
                                      'used message type for this interface.')
 
-        try:
-            msg = self._converter.decode(self._inputMsgCls, msg)
-        except (TypeError, ValueError) as e:
-            raise ConversionError(str(e))
+        if self._inputCodec:
+            if not isinstance(msg, dict):
+                raise ConversionError('Sent message is not a JSON message.')
+
+            try:
+                msg = self._inputCodec.decode(msg)
+            except (TypeError, ValueError) as e:
+                raise ConversionError(str(e))
+        else:
+            try:
+                msg = self._converter.decode(self._inputMsgCls, msg)
+            except (TypeError, ValueError) as e:
+                raise ConversionError(str(e))
 
-        buf = StringIO()
-        msg.serialize(buf)
-        msg = buf.getvalue()
+            buf = StringIO()
+            msg.serialize(buf)
+            msg = buf.getvalue()
 
         self._receive(msg, msgID)
 
@@ -190,13 +245,21 @@ class _ConverterBase(_AbstractConverter):
             raise InternalError('This converter can not handle outgoing '
                                 'messages.')
 
-        rosMsg = self._outputMsgCls()
-        rosMsg.deserialize(msg)
+        if self._outputCodec:
+            try:
+                jsonMsg = self._outputCodec.encode(msg,
+                                                   self._owner.timeFormat)
+            except (TypeError, ValueError) as e:
+                raise ConversionError(str(e))
+        else:
+            rosMsg = self._outputMsgCls()
+            rosMsg.deserialize(msg)
 
-        try:
-            jsonMsg = self._converter.encode(rosMsg)
-        except (TypeError, ValueError) as e:
-            raise ConversionError(str(e))
+            try:
+                jsonMsg = self._converter.encode(rosMsg,
+                                                 self._owner.timeFormat)
+            except (TypeError, ValueError) as e:
+                raise ConversionError(str(e))
 
         self._sendToClient(jsonMsg, msgID, protocol, remoteID)
 
@@ -204,12 +267,24 @@ class _ConverterBase(_AbstractConverter):
 class ServiceClientConverter(_ConverterBase):
     """ Class which is used as a Service-Client Converter.
     """
-    def __init__(self, owner, uid, clsName, tag):
-        _ConverterBase.__init__(self, owner, uid, clsName, tag)
+    # CONFIG
+    TIMEOUT = 60
 
-        self._pendingRequests = {}
+    def __init__(self, owner, uid, clsName, tag, fields=None, timeout=None):
+        """ Initialize the Service-Client Converter.
+
+            For the description of the other arguments see
+            rce.monitor.interface.robot._ConverterBase.__init__.
 
-    __init__.__doc__ = _ConverterBase.__init__.__doc__
+            @param timeout:     Time in seconds after which a request which was
+                                not answered by the robot is dropped, or None
+                                to use the default.
+            @type  timeout:     float
+        """
+        _ConverterBase.__init__(self, owner, uid, clsName, tag, fields)
+
+        self._timeout = timeout or self.TIMEOUT
+        self._pendingRequests = {}
 
     def _loadClass(self, loader):
         args = self._clsName.split('/')
@@ -222,13 +297,31 @@ class ServiceClientConverter(_ConverterBase):
         self._inputMsgCls = srvCls._response_class
         self._outputMsgCls = srvCls._request_class
 
-    def _receive(self, msg, msgID):
+    def expire(self, uid):
+        """ Callback for the Robot Client to drop a request whose deadline
+            has passed without receiving a response from the robot.
+
+            @param uid:         ID of the request which was sent to the robot.
+            @type  uid:         str
+        """
+        if self._pendingRequests.pop(uid, None):
+            log.msg("Request to Service Client '{0}' timed out after "
+                    '{1}s.'.format(self._addr, self._timeout))
+
+    def _stop(self):
+        for uid in self._pendingRequests:
+            self._owner.removeDeadline(self, uid)
+
+        self._pendingRequests = {}
+
+    def _receive(self, msg, uid):
         try:
-            msgID, protocol, remoteID = self._pendingRequests.pop(msgID)
+            msgID, protocol, remoteID = self._pendingRequests.pop(uid)
         except KeyError:
             raise ServiceError('Service Client does not wait for a response '
-                               'with message ID {0}.'.format(msgID))
+                               'with message ID {0}.'.format(uid))
 
+        self._owner.removeDeadline(self, uid)
         self.respond(msg, msgID, protocol, remoteID)
 
     def _sendToClient(self, msg, msgID, protocol, remoteID):
@@ -239,7 +332,8 @@ class ServiceClientConverter(_ConverterBase):
                 break
 
         self._pendingRequests[uid] = (msgID, protocol, remoteID)
-        self._owner.sendToClient(self._addr, self._clsName, msgID, msg)
+        self._owner.addDeadline(self, uid, self._timeout)
+        self._owner.sendToClient(self._addr, self._clsName, uid, msg)
 
 
 class ServiceProviderConverter(_ConverterBase):
@@ -368,20 +462,50 @@ class _ForwarderBase(_AbstractConverter):
 class ServiceClientForwarder(_ForwarderBase):
     """ Class which is used as a Service-Client Forwarder.
     """
-    def __init__(self, owner, uid, clsName, tag):
+    # CONFIG
+    TIMEOUT = 60
+
+    def __init__(self, owner, uid, clsName, tag, timeout=None):
+        """ Initialize the Service-Client Forwarder.
+
+            For the description of the other arguments see
+            rce.monitor.interface.robot._AbstractConverter.__init__.
+
+            @param timeout:     Time in seconds after which a request which was
+                                not answered by the robot is dropped, or None
+                                to use the default.
+            @type  timeout:     float
+        """
         _ForwarderBase.__init__(self, owner, uid, clsName, tag)
 
+        self._timeout = timeout or self.TIMEOUT
         self._pendingRequests = {}
 
-    __init__.__doc__ = _ForwarderBase.__init__.__doc__
+    def expire(self, uid):
+        """ Callback for the Robot Client to drop a request whose deadline
+            has passed without receiving a response from the robot.
 
-    def _receive(self, msg, msgID):
+            @param uid:         ID of the request which was sent to the robot.
+            @type  uid:         str
+        """
+        if self._pendingRequests.pop(uid, None):
+            log.msg("Request to Service Client '{0}' timed out after "
+                    '{1}s.'.format(self._addr, self._timeout))
+
+    def _stop(self):
+        for uid in self._pendingRequests:
+            self._owner.removeDeadline(self, uid)
+
+        self._pendingRequests = {}
+
+    def _receive(self, msg, uid):
         try:
-            msgID, protocol, remoteID = self._pendingRequests.pop(msgID)
+            msgID, protocol, remoteID = self._pendingRequests.pop(uid)
         except KeyError:
             raise ServiceError('Service Client does not wait for a response '
-                               'with message ID {0}.'.format(msgID))
+                               'with message ID {0}.'.format(uid))
 
+        self._owner.removeDeadline(self, uid)
         self.respond(msg, msgID, protocol, remoteID)
 
     def _sendToClient(self, msg, msgID, protocol, remoteID):
@@ -392,7 +516,8 @@ class ServiceClientForwarder(_ForwarderBase):
                 break
 
         self._pendingRequests[uid] = (msgID, protocol, remoteID)
-        self._owner.sendToClient(self._addr, self._clsName, msgID, msg)
+        self._owner.addDeadline(self, uid, self._timeout)
+        self._owner.sendToClient(self._addr, self._clsName, uid, msg)
 
 
 class ServiceProviderForwarder(_ForwarderBase):
@@ -32,6 +32,7 @@
 
 # Python specific imports
 import os
+import sys
 import shlex
 from uuid import uuid4
 
@@ -51,15 +52,19 @@ class NodeProtocol(ProcessProtocol):
         It is used to monitor the health of a node and logging the stdout and
         stderr to files.
     """
-    def __init__(self, monitor, out, err):
+    def __init__(self, monitor, out=None, err=None):
         self._monitor = monitor
 
-        self._out = open(out, 'w')
-        self._err = open(err, 'w')
+        # Nodes forked by the fork server write directly to the log files
+        if out and err:
+            self._out = open(out, 'w')
+            self._err = open(err, 'w')
 
-        # Overwrite method from base class
-        self.outReceived = self._out.write
-        self.errReceived = self._err.write
+            # Overwrite method from base class
+            self.outReceived = self._out.write
+            self.errReceived = self._err.write
+        else:
+            self._out = self._err = None
 
     def connectionMade(self):
         self._monitor.started()
@@ -69,8 +74,49 @@ class NodeProtocol(ProcessProtocol):
         self._monitor = None
 
     def __del__(self):
-        self._out.close()
-        self._err.close()
+        if self._out:
+            self._out.close()
+            self._err.close()
+
+
+# Key:    path to executable
+# Value:  flag which is True if the executable is a Python script
+_pythonScripts = {}
+
+# Names of the interpreter which runs the fork server
+_INTERPRETERS = ('python', 'python{0}'.format(sys.version_info[0]),
+                 'python{0}.{1}'.format(*sys.version_info[:2]))
+
+
+def _isPythonScript(path):
+    """ Internally used function to check whether an executable is a Python
+        script for the interpreter which runs the fork server, i.e. can be
+        forked by the fork server.
+    """
+    try:
+        return _pythonScripts[path]
+    except KeyError:
+        pass
+
+    try:
+        with open(path, 'r') as f:
+            line = f.readline(128)
+    except IOError:
+        return False
+
+    isPython = False
+
+    if line.startswith('#!'):
+        args = line[2:].split()
+
+        if args and os.path.basename(args[0]) == 'env':
+            args = args[1:]
+
+        if args:
+            isPython = os.path.basename(args[0]) in _INTERPRETERS
+
+    _pythonScripts[path] = isPython
+    return isPython
 
 
 class Node(Referenceable, ArgumentMixin):
@@ -147,12 +193,19 @@ class Node(Referenceable, ArgumentMixin):
         err = os.path.join(self._LOG_DIR,
                            '{0}-{1}-err.log'.format(uid, name or exe))
 
-        self._protocol = NodeProtocol(self, out, err)
-
         # Start node
         log.msg('Start Node {0}/{1} [pkg: {2}, exe: '
                 '{3}].'.format(namespace, name or exe, pkg, exe))
-        self._reactor.spawnProcess(self._protocol, cmd[0], cmd, env=os.environ)
+
+        forkServer = owner.forkServer
+
+        if forkServer and forkServer.running and _isPythonScript(cmd[0]):
+            self._protocol = NodeProtocol(self)
+            forkServer.spawn(self._protocol, cmd, out, err)
+        else:
+            self._protocol = NodeProtocol(self, out, err)
+            self._reactor.spawnProcess(self._protocol, cmd[0], cmd,
+                                       env=os.environ)
 
         self._name = '{0}/{1}'.format(pkg, exe)
 
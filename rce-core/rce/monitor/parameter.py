@@ -30,11 +30,17 @@
 #
 #
 
+# Python specific imports
+import xmlrpclib
+
 # ROS specific imports
 import rospy
+import rosgraph
 
 # twisted specific imports
 from twisted.python import log
+from twisted.internet.defer import Deferred
+from twisted.internet.threads import deferToThreadPool
 from twisted.spread.pb import Referenceable
 
 # rce specific imports
@@ -42,11 +48,143 @@ from rce.util.error import InternalError
 from rce.monitor.common import ArgumentMixin
 
 
+def _applyOperations(ops):
+    """ Internally used function which applies a batch of operations to the
+        parameter server using a single XML-RPC multicall. The function is
+        blocking and is therefore executed in a separate thread.
+
+        @return:            Result of each operation as a tuple containing a
+                            success flag and a message.
+        @rtype:             [ (bool, str) ]
+    """
+    master = xmlrpclib.ServerProxy(rosgraph.get_master_uri())
+    multicall = xmlrpclib.MultiCall(master)
+    callerID = rospy.get_name()
+
+    for op, name, value in ops:
+        key = rospy.resolve_name(name)
+
+        if op == 'set':
+            multicall.hasParam(callerID, key)
+            multicall.setParam(callerID, key, value)
+        else:
+            multicall.deleteParam(callerID, key)
+
+    results = multicall()
+    response = []
+    i = 0
+
+    for op, name, _ in ops:
+        # A 'set' operation uses two slots of the multicall (hasParam and
+        # setParam); a 'delete' operation uses one
+        base = i
+        i += 2 if op == 'set' else 1
+
+        try:
+            if op == 'set':
+                if results[base][0] == 1 and results[base][2]:
+                    log.msg("Warning: Parameter '{0}' already "
+                            'exists.'.format(name))
+
+            code, msg, _ = results[i - 1]
+            response.append((code == 1, msg))
+        except xmlrpclib.Fault as e:
+            response.append((False, e.faultString))
+
+    return response
+
+
+class ParameterServer(object):
+    """ Client for the ROS parameter server which applies the parameter
+        operations in a separate thread such that the reactor is never blocked.
+        All operations which are requested while a batch is applied are
+        combined into the next batch, which is sent to the parameter server
+        using a single XML-RPC multicall. The operations are applied in the
+        order in which they were requested.
+    """
+    def __init__(self, reactor):
+        """ Initialize the Parameter Server client.
+
+            @param reactor:     Reference to the twisted reactor.
+            @type  reactor:     twisted::reactor
+        """
+        self._reactor = reactor
+        self._queue = []
+        self._running = False
+
+    def set(self, name, value):
+        """ Set a parameter. A dictionary as value sets a whole namespace.
+
+            @return:            Deferred whose callback is triggered on
+                                success or whose errback is triggered with an
+                                InternalError on failure.
+            @rtype:             twisted.internet.defer.Deferred
+        """
+        return self._schedule('set', name, value)
+
+    def delete(self, name):
+        """ Delete a parameter.
+
+            @return:            Deferred whose callback is triggered on
+                                success or whose errback is triggered with an
+                                InternalError on failure.
+            @rtype:             twisted.internet.defer.Deferred
+        """
+        return self._schedule('delete', name, None)
+
+    def _schedule(self, op, name, value):
+        """ Internally used method to add an operation to the queue.
+        """
+        deferred = Deferred()
+        self._queue.append((op, name, value, deferred))
+
+        if not self._running:
+            # Wait until the end of the reactor iteration such that all
+            # operations requested in the same iteration are combined
+            self._running = True
+            self._reactor.callLater(0, self._dispatch)
+
+        return deferred
+
+    def _dispatch(self):
+        """ Internally used method to apply all queued operations.
+        """
+        batch, self._queue = self._queue, []
+
+        if not batch:
+            self._running = False
+            return
+
+        d = deferToThreadPool(self._reactor, self._reactor.getThreadPool(),
+                              _applyOperations,
+                              [(op, name, value) for op, name, value, _
+                               in batch])
+        d.addCallbacks(self._applied, self._failed, callbackArgs=(batch,),
+                       errbackArgs=(batch,))
+        d.addBoth(lambda _: self._dispatch())
+
+    def _applied(self, results, batch):
+        for (success, msg), (_, _, _, deferred) in zip(results, batch):
+            if success:
+                deferred.callback(None)
+            else:
+                deferred.errback(InternalError('ROS Parameter Server reported '
+                                               'an error: {0}'.format(msg)))
+
+    def _failed(self, failure, batch):
+        e = InternalError('ROS Parameter Server reported an error: '
+                          '{0}'.format(failure.getErrorMessage()))
+
+        for _, _, _, deferred in batch:
+            deferred.errback(e)
+
+
 class Parameter(Referenceable, ArgumentMixin):
     """ Representation of a Parameter inside an environment.
     """
     def __init__(self, owner, name, value):
-        """ Add the Parameter to the parameter server.
+        """ Initialize the Parameter. The parameter is added to the parameter
+            server by calling the method 'register'.
 
             @param owner:       Environment in which the node will be created.
             @type  owner:       rce.environment.Environment
@@ -57,40 +195,49 @@ class Parameter(Referenceable, ArgumentMixin):
             @param value:       Value of the parameter which should be added.
                                 Top-level string values can contain the
                                 directives $(find PKG) and/or $(env VAR).
-            @type  value:       str, int, float, bool, list
+                                A dictionary sets a whole namespace.
+            @type  value:       str, int, float, bool, list, dict
         """
         self._registered = False
+        self._owner = None
 
         ArgumentMixin.__init__(self, owner.loader)
 
-        owner.registerParameter(self)
-        self._owner = owner
-
         if isinstance(value, basestring):
             value = self.processArgument(value)
 
         self._name = name
+        self._value = value
 
-        try:
-            if rospy.has_param(name):
-                log.msg('Warning: Parameter already exists.')
+        owner.registerParameter(self)
+        self._owner = owner
+        self._server = owner.parameterServer
 
-            rospy.set_param(name, value)
-            self._registered = True
-        except rospy.ROSException as e:
-            raise InternalError('ROS Parameter Server reported an error: '
-                                '{0}'.format(e))
+    def register(self):
+        """ Add the Parameter to the parameter server.
+
+            @return:            Deferred which fires with this Parameter as
+                                soon as it has been added.
+            @rtype:             twisted.internet.defer.Deferred
+        """
+        def eb(failure):
+            self._registered = False
+            self.remote_destroy()
+            return failure
+
+        # The operations are applied in order; therefore, the parameter can
+        # already be deleted before it has been added
+        self._registered = True
+        d = self._server.set(self._name, self._value)
+        d.addCallbacks(lambda _: self, eb)
+        return d
 
     def remote_destroy(self):
         """ Method should be called to delete the Parameter from the parameter
             server.
         """
         if self._registered:
-            try:
-                rospy.delete_param(self._name)
-            except rospy.ROSException:
-                pass
-
+            self._server.delete(self._name).addErrback(lambda _: None)
             self._registered = False
 
         if self._owner:
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-core/rce/nethelper.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+# Python specific imports
+import os
+import re
+import sys
+import time
+
+# twisted specific imports
+from twisted.python import log
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.protocol import ProcessProtocol
+from twisted.spread.pb import Root, PBServerFactory
+
+
+# Tools which can be used for network operations
+_TOOLS = {'ovs-vsctl':'/usr/bin/ovs-vsctl', 'ip':'/sbin/ip', 'tc':'/sbin/tc'}
+
+# Error reported by ip and tc in batch mode for the failed line of the input
+_BATCH_FAILURE = re.compile('Command failed -:(\\d+)')
+
+
+class _CommandProtocol(ProcessProtocol):
+    """ Protocol used to feed the input to a child process and to retrieve
+        its output and exit code.
+    """
+    def __init__(self, deferred, stdin):
+        """ Initialize the ProcessProtocol.
+
+            @param deferred:    Deferred which will be used to report the
+                                success flag and the output of the command.
+            @type  deferred:    twisted.internet.defer.Deferred
+
+            @param stdin:       Input which is written to the child process.
+            @type  stdin:       str
+        """
+        self._deferred = deferred
+        self._stdin = stdin
+        self._output = []
+
+    def connectionMade(self):
+        if self._stdin:
+            self.transport.write(self._stdin)
+
+        self.transport.closeStdin()
+
+    def outReceived(self, data):
+        self._output.append(data)
+
+    errReceived = outReceived
+
+    def processEnded(self, reason):
+        self._deferred.callback((reason.value.exitCode == 0,
+                                 ''.join(self._output).strip()))
+
+
+def _run(reactor, cmd, stdin=None):
+    """ Internally used function to run a command.
+    """
+    deferred = Deferred()
+
+    try:
+        reactor.spawnProcess(_CommandProtocol(deferred, stdin), cmd[0], cmd,
+                             os.environ)
+    except OSError:
+        deferred.callback((False, 'Command could not be executed.'))
+
+    return deferred
+
+
+def _splitResult(tool, size, success, msg, duration):
+    """ Internally used function to derive the result of each operation of a
+        group from the result of the invocation which applied the group.
+
+        ovs-vsctl applies the group as a single transaction, i.e. either all
+        or none of the operations have been applied. ip and tc stop at the
+        first failed operation and report its line; the operations before it
+        have been applied and the ones after it have not been executed.
+        There is no timing of the single operations; all operations share the
+        duration of the invocation.
+    """
+    if success:
+        return [(True, msg, duration)] * size
+
+    match = _BATCH_FAILURE.search(msg) if tool != 'ovs-vsctl' else None
+
+    if match and 0 < int(match.group(1)) <= size:
+        failed = int(match.group(1)) - 1
+        return ([(True, '', duration)] * failed + [(False, msg, duration)] +
+                [(False, 'Not executed.', 0.0)] * (size - failed - 1))
+
+    return [(False, msg, duration)] * size
+
+
+def _runGroup(success, reactor, tool, batch, results):
+    """ Internally used function to apply a group of consecutive operations
+        which use the same tool.
+    """
+    if not success:
+        results.extend((False, 'Not executed.', 0.0) for _ in batch)
+        return False
+
+    if tool == 'ovs-vsctl':
+        cmd = [_TOOLS[tool]]
+
+        for args in batch:
+            cmd.append('--')
+            cmd.extend(args)
+
+        stdin = None
+    else:
+        cmd = [_TOOLS[tool], '-batch', '-']
+        stdin = ''.join('{0}\n'.format(' '.join(args)) for args in batch)
+
+    start = time.time()
+
+    def cb(result):
+        success, msg = result
+        results.extend(_splitResult(tool, len(batch), success, msg,
+                                    time.time() - start))
+        return success
+
+    return _run(reactor, cmd, stdin).addCallback(cb)
+
+
+def applyOperations(reactor, ops):
+    """ Apply a batch of network operations. Consecutive operations which use
+        the same tool are combined into a single invocation of the tool:
+        ovs-vsctl applies them in a single transaction and ip and tc apply
+        them using their batch mode, where they stop at the first failure.
+        Operations after a failed invocation are not applied.
+
+        @param reactor:     Reference to the twisted reactor.
+        @type  reactor:     twisted::reactor
+
+        @param ops:         Operations which should be applied in the given
+                            order. Each operation is a tuple containing the
+                            name of the tool, i.e. 'ovs-vsctl', 'ip', or 'tc',
+                            and the arguments for the tool.
+        @type  ops:         [ (str, [ str ]) ]
+
+        @return:            Result of each operation as a tuple containing a
+                            success flag, the output of the tool, and the time
+                            in seconds of the invocation which applied the
+                            operation (shared by all operations applied in
+                            the same invocation). For the success flags of
+                            a failed invocation see _splitResult.
+                            (type: [ (bool, str, float) ])
+        @rtype:             twisted.internet.defer.Deferred
+    """
+    groups = []
+
+    for tool, args in ops:
+        if tool not in _TOOLS:
+            raise ValueError("Unknown network tool '{0}'.".format(tool))
+
+        if groups and groups[-1][0] == tool:
+            groups[-1][1].append(args)
+        else:
+            groups.append((tool, [args]))
+
+    results = []
+    d = succeed(True)
+
+    for tool, batch in groups:
+        d.addCallback(_runGroup, reactor, tool, batch, results)
+
+    return d.addCallback(lambda _: results)
+
+
+class NetworkHelper(Root):
+    """ Long-lived privileged helper which applies batches of network
+        operations for the container process.
+    """
+    def __init__(self, reactor):
+        """ Initialize the Network Helper.
+
+            @param reactor:     Reference to the twisted reactor.
+            @type  reactor:     twisted::reactor
+        """
+        self._reactor = reactor
+
+    def remote_apply(self, ops):
+        """ Apply a batch of network operations.
+
+            For the description of the arguments and the return value see
+            rce.nethelper.applyOperations.
+        """
+        start = time.time()
+
+        def cb(results):
+            log.msg('Applied {0} network operations: {1} failed, '
+                    '{2:.3f}s'.format(len(results),
+                                      len([r for r in results if not r[0]]),
+                                      time.time() - start))
+            return results
+
+        return applyOperations(self._reactor, ops).addCallback(cb)
+
+
+def main(reactor, path):
+    log.startLogging(sys.stdout)
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    reactor.listenUNIX(path, PBServerFactory(NetworkHelper(reactor)),
+                       mode=0600)
+    reactor.run()
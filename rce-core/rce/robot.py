@@ -31,7 +31,9 @@
 #
 
 # Python specific imports
+import os
 import sys
+import time
 
 # ROS specific imports
 from rospkg.environment import get_ros_paths
@@ -41,6 +43,8 @@ from zope.interface import implements
 
 # twisted specific imports
 from twisted.python import log
+from twisted.internet.defer import fail
+from twisted.internet.task import LoopingCall
 from twisted.cred.credentials import UsernamePassword
 from twisted.spread.pb import PBClientFactory, \
     DeadReferenceError, PBConnectionLost
@@ -49,10 +53,12 @@ from twisted.spread.pb import PBClientFactory, \
 from autobahn.websocket import listenWS
 
 # rce specific imports
-from rce.util.converter import Converter
+from rce.util.converter import TIME_FORMATS, Converter
 from rce.util.loader import Loader
+from rce.util.sysinfo import ProcFile
+from rce.util.wheel import TimerWheel
 from rce.util.interface import verifyObject
-from rce.comm.error import DeadConnection
+from rce.comm.error import InvalidRequest, DeadConnection
 from rce.comm.interfaces import IRobotRealm, IServersideProtocol, \
     IRobot, IMessageReceiver
 from rce.comm.server import CloudEngineWebSocketFactory
@@ -75,7 +81,7 @@ class Connection(object):
     """
     implements(IRobot, IMessageReceiver)
 
-    def __init__(self, client, userID, robotID):
+    def __init__(self, client, userID, robotID, timeFormat='iso'):
         """ Initialize the representation of a connection to a robot client.
 
             @param client:      Client which is responsible for managing the
@@ -87,11 +93,16 @@ class Connection(object):
 
             @param robotID:     Unique ID which is used to identify the robot.
             @type  robotID:     str
+
+            @param timeFormat:  Representation of the time and duration values
+                                in the messages sent to the robot.
+            @type  timeFormat:  str
         """
         client.registerConnection(self)
         self._client = client
         self._userID = userID
         self._robotID = robotID
+        self._timeFormat = timeFormat
         self._avatar = None
         self._view = None
         self._namespace = None
@@ -107,6 +118,11 @@ class Connection(object):
         """ Robot ID used to identify the connected robot. """
         return self._robotID
 
+    @property
+    def timeFormat(self):
+        """ Representation of time values negotiated with the robot. """
+        return self._timeFormat
+
     def destroy(self):
         """ # TODO: Add doc
         """
@@ -175,6 +191,12 @@ class Connection(object):
 
     reportError.__doc__ = IServersideProtocol.get('sendErrorMessage').getDoc()
 
+    def reportStatus(self, msg):
+        if self._protocol:
+            self._protocol.sendStatusMessage(msg)
+
+    reportStatus.__doc__ = IServersideProtocol.get('sendStatusMessage').getDoc()
+
 
     def sendMessage(self, iTag, clsName, msgID, msg):
         if not self._protocol:
@@ -453,6 +475,29 @@ class Robot(Namespace):
         """
         return self._endpoint.converter
 
+    @property
+    def timeFormat(self):
+        """ Representation of the time and duration values in the messages
+            sent to the robot.
+        """
+        return self._connection.timeFormat
+
+    def addDeadline(self, interface, uid, timeout):
+        """ Add a deadline for a request which is waiting for a response.
+
+            For the description of the arguments see
+            rce.robot.RobotClient.addDeadline.
+        """
+        self._endpoint.addDeadline(interface, uid, timeout)
+
+    def removeDeadline(self, interface, uid):
+        """ Remove the deadline of a request.
+
+            For the description of the arguments see
+            rce.robot.RobotClient.removeDeadline.
+        """
+        self._endpoint.removeDeadline(interface, uid)
+
     def receivedFromClient(self, iTag, clsName, msgID, msg):
         """ Process a data message which has been received from the robot
             client and send the message to the appropriate interface.
@@ -479,8 +524,8 @@ class Robot(Namespace):
         """
         # TODO: What should we do, if the interface exists, but there are no
         #       connections?
-        #       For now the message is just dropped, which is fatal if it is a
-        #       service call, i.e. the caller will wait forever for a response
+        #       For now the message is just dropped, i.e. if it is a service
+        #       call the caller waits for a response until the call times out
         try:
             self._interfaces[iTag].receive(clsName, msgID, msg)
         except (DeadReferenceError, PBConnectionLost):
@@ -518,6 +563,16 @@ class Robot(Namespace):
         self._connection = None
         Namespace.remote_destroy(self)
 
+    def remote_reportStatus(self, msg):
+        """ Forward a status message from the Master process to the robot
+            client.
+
+            @param msg:         Status message which should be sent.
+            @type  msg:         dict
+        """
+        if self._connection:
+            self._connection.reportStatus(msg)
+
     def remote_destroy(self):
         """ Method should be called to destroy the robot and will take care
             of destroying all objects owned by this robot as well as
@@ -538,6 +593,8 @@ class RobotClient(Endpoint):
     # CONFIG
     CONNECT_TIMEOUT = 30
     RECONNECT_TIMEOUT = 10
+    LOAD_INTERVAL = 5
+    DEADLINE_RESOLUTION = 0.5
 
     def __init__(self, reactor, masterIP, masterPort, commPort, extIP, extPort,
                  loader, converter):
@@ -581,6 +638,7 @@ class RobotClient(Endpoint):
 
         self._masterIP = masterIP
         self._masterPort = masterPort
+        self._commPort = commPort
         self._extAddress = '{0}:{1}'.format(extIP, extPort)
         self._loader = loader
         self._converter = converter
@@ -588,6 +646,16 @@ class RobotClient(Endpoint):
         self._connections = set()
         self._deathCandidates = {}
 
+        self._io = ProcFile('/proc/self/io')
+        self._lastSample = self._sampleLoad()
+        self._loadReporter = LoopingCall(self._reportLoad)
+        self._loadReporter.start(self.LOAD_INTERVAL, now=False)
+
+        self._deadlines = TimerWheel(reactor.seconds(),
+                                     self.DEADLINE_RESOLUTION)
+        self._reaper = LoopingCall(self._reapDeadlines)
+        self._reaper.start(self.DEADLINE_RESOLUTION, now=False)
+
     @property
     def converter(self):
         """ Reference to the message converter used by the Converter
@@ -595,6 +663,45 @@ class RobotClient(Endpoint):
         """
         return self._converter
 
+    def addDeadline(self, interface, uid, timeout):
+        """ Add a deadline for a request which is waiting for a response.
+            When the deadline passes, the method 'expire' of the interface is
+            called with the ID of the request.
+
+            @param interface:   Interface which is waiting for the response.
+            @type  interface:   rce.monitor.interface.robot._AbstractConverter
+
+            @param uid:         ID which identifies the request in the
+                                interface.
+            @type  uid:         str
+
+            @param timeout:     Time in seconds after which the request
+                                expires.
+            @type  timeout:     float
+        """
+        deadline = self._reactor.seconds() + timeout
+        self._deadlines.add((interface, uid), deadline)
+
+    def removeDeadline(self, interface, uid):
+        """ Remove the deadline of a request, i.e. because the response has
+            been received.
+
+            @param interface:   Interface which was waiting for the response.
+            @type  interface:   rce.monitor.interface.robot._AbstractConverter
+
+            @param uid:         ID which identifies the request in the
+                                interface.
+            @type  uid:         str
+        """
+        self._deadlines.remove((interface, uid))
+
+    def _reapDeadlines(self):
+        """ Internally used method to expire all requests whose deadline has
+            passed.
+        """
+        for interface, uid in self._deadlines.expire(self._reactor.seconds()):
+            interface.expire(uid)
+
     def registerConnection(self, connection):
         assert connection not in self._connections
         self._connections.add(connection)
@@ -671,7 +778,7 @@ class RobotClient(Endpoint):
         return self._avatar.callRemote('setupNamespace', namespace,
                                        connection.userID, connection.robotID)
 
-    def login(self, userID, robotID, password):
+    def login(self, userID, robotID, password, timeFormat='iso'):
         """ Callback for Robot connection to login and authenticate.
 
             @param userID:      User ID under which the robot is logging in.
@@ -685,12 +792,22 @@ class RobotClient(Endpoint):
                                 used to authenticate the user.
             @type  password:    str
 
+            @param timeFormat:  Representation of the time and duration values
+                                in the messages sent to the robot. For the
+                                valid values see
+                                rce.util.converter.TIME_FORMATS.
+            @type  timeFormat:  str
+
             @return:            Representation of the connection to the robot
                                 which is used in the Robot process.
                                 (type: rce.robot.Connection)
             @rtype:             twisted.internet.defer.Deferred
         """
-        conn = Connection(self, userID, robotID)
+        if timeFormat not in TIME_FORMATS:
+            return fail(InvalidRequest("Invalid time format '{0}'.".format(
+                                                                timeFormat)))
+
+        conn = Connection(self, userID, robotID, timeFormat)
 
         factory = PBClientFactory()
         self._reactor.connectTCP(self._masterIP, self._masterPort, factory)
@@ -732,6 +849,55 @@ class RobotClient(Endpoint):
 
         connection.unregisterProtocol(protocol)
 
+    def _sampleLoad(self):
+        """ Internally used method to get the current counters which are used
+            to calculate the load of the robot process.
+        """
+        times = os.times()
+        traffic = 0
+
+        try:
+            for line in self._io.read().splitlines():
+                key, value = line.split(':', 1)
+
+                if key in ('rchar', 'wchar'):
+                    traffic += int(value)
+        except IOError:
+            pass
+
+        return time.time(), times[0] + times[1], traffic, self._converter.busy
+
+    def _reportLoad(self):
+        """ Internally used method which is called periodically to report
+            the load of the robot process to the Master process.
+        """
+        sample = self._sampleLoad()
+        last, self._lastSample = self._lastSample, sample
+        elapsed = sample[0] - last[0]
+
+        if not self._avatar or elapsed <= 0:
+            return
+
+        load = {'cpu':(sample[1] - last[1]) / elapsed,
+                'bandwidth':(sample[2] - last[2]) / elapsed,
+                'conversion':(sample[3] - last[3]) / elapsed}
+
+        try:
+            self._avatar.callRemote('reportLoad', load).addErrback(
+                lambda failure: log.msg('Could not report load: '
+                                        '{0}'.format(failure.getErrorMessage())))
+        except (DeadReferenceError, PBConnectionLost):
+            pass
+
+    def remote_getCommPort(self):
+        """ Get the port where the server for the cloud engine internal
+            communication of this process is listening.
+
+            @return:            Port of the internal communication server.
+            @rtype:             int
+        """
+        return self._commPort
+
     def remote_getWebsocketAddress(self):
         """ Get the address of the WebSocket server running in this process.
 
@@ -750,6 +916,12 @@ class RobotClient(Endpoint):
                                 ready to stop the reactor.
             @rtype:             twisted.internet.defer.Deferred
         """
+        if self._loadReporter.running:
+            self._loadReporter.stop()
+
+        if self._reaper.running:
+            self._reaper.stop()
+
         for call in self._deathCandidates.itervalues():
             call.cancel()
 
@@ -763,7 +935,8 @@ class RobotClient(Endpoint):
 
 
 def main(reactor, cred, masterIP, masterPort, consolePort,
-                extIP, extPort, commPort, pkgPath, customConverters):
+                extIP, extPort, commPort, pkgPath, customConverters,
+                loaderIndex=None, preload=()):
     log.startLogging(sys.stdout)
 
     def _err(reason):
@@ -778,7 +951,7 @@ def main(reactor, cred, masterIP, masterPort, consolePort,
         if path not in rosPath:
             rosPath.append(path)
 
-    loader = Loader(rosPath)
+    loader = Loader(rosPath, loaderIndex)
     converter = Converter(loader)
 
     for customConverter in customConverters:
@@ -791,6 +964,10 @@ def main(reactor, cred, masterIP, masterPort, consolePort,
 
     client = RobotClient(reactor, masterIP, consolePort, commPort, extIP,
                          extPort, loader, converter)
+
+    if preload:
+        client.preload(preload)
+
     d = factory.login(cred, client)
     d.addCallback(lambda ref: setattr(client, '_avatar', ref))
     d.addErrback(_err)
@@ -34,6 +34,7 @@
 from twisted.python import log
 from twisted.python.failure import Failure
 from twisted.internet.defer import fail
+from twisted.internet.threads import deferToThreadPool
 from twisted.internet.protocol import ServerFactory, ClientCreator
 from twisted.spread.pb import Referenceable, Error, \
     DeadReferenceError, PBConnectionLost
@@ -88,6 +89,33 @@ class Endpoint(Referenceable):
         """ Reference to ROS components loader. """
         return self._loader
 
+    def preload(self, types):
+        """ Load the classes of the given message/service types in a separate
+            thread such that the first interface using one of the types does
+            not block the reactor.
+
+            @param types:       Message/service types which should be loaded.
+                                For the format see
+                                rce.util.loader.Loader.preload.
+            @type  types:       [str]
+
+            @return:            Deferred which fires as soon as all types have
+                                been loaded.
+            @rtype:             twisted.internet.defer.Deferred
+        """
+        def cb(failed):
+            for clsType, reason in failed:
+                log.msg("Type '{0}' could not be preloaded: "
+                        '{1}'.format(clsType, reason))
+
+            log.msg('Preloaded {0} of {1} types.'.format(
+                        len(types) - len(failed), len(types)))
+
+        d = deferToThreadPool(self._reactor, self._reactor.getThreadPool(),
+                              self._loader.preload, types)
+        d.addCallback(cb)
+        return d
+
     def registerAvatar(self, avatar):
         """ Register the PB Avatar received from the master process.
 
@@ -75,7 +75,8 @@ class Namespace(Referenceable):
         del self._interfaces[addr]
         self._endpoint.referenceDied('interfaceDied', interface)
 
-    def remote_createInterface(self, uid, iType, msgType, addr):
+    def remote_createInterface(self, uid, iType, msgType, addr, fields=None,
+                               timeout=None):
         """ Create an Interface object in the namespace and therefore in
             the endpoint.
 
@@ -97,6 +98,17 @@ class Namespace(Referenceable):
                                 interface in the external communication.
             @type  addr:        str
 
+            @param fields:      Top-level fields which should be converted to
+                                JSON by a Converter, or None to convert all
+                                fields.
+            @type  fields:      [str]
+
+            @param timeout:     Time in seconds after which an unanswered
+                                request of a Service-Client Converter or
+                                Forwarder is dropped, or None to use the
+                                default.
+            @type  timeout:     float
+
             @return:            New Interface instance.
             @rtype:             rce.slave.interface.Interface
         """
@@ -106,7 +118,15 @@ class Namespace(Referenceable):
             raise InternalError('Interface type is not supported by this '
                                 'namespace.')
 
-        return cls(self, UUID(bytes=uid), msgType, addr)
+        kw = {}
+
+        if fields:
+            kw['fields'] = fields
+
+        if timeout:
+            kw['timeout'] = timeout
+
+        return cls(self, UUID(bytes=uid), msgType, addr, **kw)
 
     def remote_destroy(self):
         """ Method should be called to destroy the namespace and will take care
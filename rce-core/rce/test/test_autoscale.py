@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-core/rce/test/test_autoscale.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+
+# twisted specific imports
+from twisted.trial import unittest
+from twisted.internet.task import Clock
+
+# rce specific imports
+from rce.util.iaas import FakeIaasHook
+from rce.core.autoscale import Autoscaler
+
+
+class _FakeContainer(object):
+    size = 1
+    specialFeatures = []
+
+    def __init__(self):
+        self.failure = None
+
+    def notifyOnDeath(self, cb):
+        pass
+
+    def dontNotifyOnDeath(self, cb):
+        pass
+
+    def errback(self, failure):
+        self.failure = failure
+
+
+class _FakeMachine(object):
+    size = 1
+
+    def __init__(self, ip):
+        self.IP = ip
+        self.active = False
+
+
+class _FakeBalancer(object):
+    def __init__(self):
+        self.autoscaler = None
+        self.machines = []
+        self.placed = []
+        self.retired = []
+
+    def placeContainer(self, container, uid):
+        for machine in self.machines:
+            if not machine.active:
+                machine.active = True
+                self.placed.append(container)
+                self.autoscaler.machineUpdated(machine)
+                return True
+
+        return False
+
+    def retireMachine(self, machine):
+        self.retired.append(machine)
+
+
+class AutoscalerTestCase(unittest.TestCase):
+    """ Tests for the Autoscaler which are driven by a fake clock and the
+        fake IaaS hook.
+    """
+    DELAY = 5
+
+    def setUp(self):
+        self.clock = Clock()
+        self.balancer = _FakeBalancer()
+        self.login = True
+        self.hook = FakeIaasHook(self.clock, self.DELAY, self._launch)
+        self.autoscaler = Autoscaler(self.clock, self.balancer, self.hook,
+                                     idleTimeout=60)
+        self.balancer.autoscaler = self.autoscaler
+        self.autoscaler.start()
+
+    def tearDown(self):
+        self.autoscaler.stop()
+
+    def _launch(self, ip):
+        if self.login:
+            machine = _FakeMachine(ip)
+            self.balancer.machines.append(machine)
+            self.autoscaler.machineAdded(machine)
+
+    def _advance(self, seconds):
+        # Advance in steps such that the periodic check runs as it would
+        # with a real reactor
+        step = Autoscaler.CHECK_INTERVAL
+
+        for _ in xrange(int(seconds // step) + 1):
+            self.clock.advance(step)
+
+    def test_scaleUp(self):
+        container = _FakeContainer()
+        self.autoscaler.enqueue(container, 'uid')
+
+        self.assertEqual(self.autoscaler.booting, 1)
+        self.assertEqual(self.balancer.placed, [])
+
+        self.clock.advance(self.DELAY)
+
+        self.assertEqual(self.autoscaler.booting, 0)
+        self.assertEqual(self.balancer.placed, [container])
+        self.assertEqual(len(self.hook.instances), 1)
+
+    def test_spinUpTimeout(self):
+        self.login = False
+        container = _FakeContainer()
+        self.autoscaler.enqueue(container, 'uid')
+        self.clock.advance(self.DELAY)
+
+        self.assertEqual(self.autoscaler.booting, 1)
+        self.assertEqual(len(self.hook.instances), 1)
+
+        self._advance(Autoscaler.SPIN_UP_TIMEOUT)
+
+        self.assertEqual(self.autoscaler.booting, 0)
+        self.assertEqual(self.hook.instances, set())
+        self.assertNotEqual(container.failure, None)
+
+    def test_idleSpinDown(self):
+        self.autoscaler.enqueue(_FakeContainer(), 'uid')
+        self.clock.advance(self.DELAY)
+        machine, = self.balancer.machines
+
+        # The machine is not spun down as long as it is in use
+        self._advance(120)
+        self.assertEqual(self.balancer.retired, [])
+
+        machine.active = False
+        self.autoscaler.machineUpdated(machine)
+        self._advance(30)
+        self.assertEqual(self.balancer.retired, [])
+
+        self._advance(60)
+        self.assertEqual(self.balancer.retired, [machine])
+        self.assertEqual(self.hook.instances, set())
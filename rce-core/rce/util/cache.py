@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-core/rce/util/cache.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+# Python specific imports
+import time
+from collections import OrderedDict
+
+
+class ResponseCache(object):
+    """ Size bounded cache with least recently used eviction, where each entry
+        expires after a fixed time. It is used to store the responses of
+        service calls keyed on the serialized requests.
+    """
+    def __init__(self, size, ttl, clock=time.time):
+        """ Initialize the Response Cache.
+
+            @param size:        Maximal number of entries in the cache.
+            @type  size:        int
+
+            @param ttl:         Time in seconds after which an entry expires.
+            @type  ttl:         float
+
+            @param clock:       Function which returns the current time in
+                                seconds.
+            @type  clock:       callable
+        """
+        if size < 1:
+            raise ValueError('Size of the cache has to be positive.')
+
+        if ttl <= 0:
+            raise ValueError('Time to live of the cache entries has to be '
+                             'positive.')
+
+        self._size = size
+        self._ttl = ttl
+        self._clock = clock
+
+        # Key:    serialized request
+        # Value:  tuple (expiration time, serialized response)
+        # Ordered from the least to the most recently used entry
+        self._entries = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hits(self):
+        """ Number of lookups which were answered from the cache. """
+        return self._hits
+
+    @property
+    def misses(self):
+        """ Number of lookups which were not answered from the cache. """
+        return self._misses
+
+    @property
+    def evictions(self):
+        """ Number of entries which were removed to limit the size. """
+        return self._evictions
+
+    def get(self, key):
+        """ Get the cached value for a key.
+
+            @param key:         Key of the entry.
+            @type  key:         str
+
+            @return:            Cached value or None if there is no valid
+                                entry for the key.
+        """
+        try:
+            expires, value = self._entries.pop(key)
+        except KeyError:
+            self._misses += 1
+            return None
+
+        if expires <= self._clock():
+            self._misses += 1
+            return None
+
+        self._entries[key] = (expires, value)
+        self._hits += 1
+        return value
+
+    def put(self, key, value):
+        """ Add or replace the cached value for a key.
+
+            @param key:         Key of the entry.
+            @type  key:         str
+
+            @param value:       Value which should be cached.
+        """
+        self._entries.pop(key, None)
+
+        if len(self._entries) >= self._size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+        self._entries[key] = (self._clock() + self._ttl, value)
+
+    def clear(self):
+        """ Remove all entries from the cache.
+        """
+        self._entries.clear()
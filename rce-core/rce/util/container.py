@@ -32,14 +32,17 @@
 
 # Python specific imports
 import os
+import stat
 
 pjoin = os.path.join
 
 # twisted specific imports
 from twisted.python import log
+from twisted.internet.defer import succeed
 
 # rce specific imports
 from rce.util.process import execute
+from rce.util.sysinfo import ProcFile
 
 
 _CONFIG_CGROUP = """
@@ -92,8 +95,19 @@ _FSTAB_BIND = """
 
 class Container(object):
     """ Class representing a single container.
+
+        The container either uses the root filesystem directly or, if an
+        overlay directory is given, a copy-on-write filesystem where the root
+        filesystem is used as shared read-only lower layer and all changes of
+        the container are written to a private upper layer.
     """
-    def __init__(self, reactor, rootfs, conf, hostname):
+    # CONFIG
+    OVERLAY_FS = 'overlay'
+    CGROUP_DIR = '/sys/fs/cgroup/{subsystem}/lxc/{name}'
+    NET_DIR = '/sys/class/net/{iface}/statistics'
+    CFS_PERIOD = 100000
+
+    def __init__(self, reactor, rootfs, conf, hostname, overlay=None):
         """ Initialize the Container.
 
             @param reactor:     Reference to the twisted::reactor
@@ -109,12 +123,19 @@ class Container(object):
 
             @param hostname:    Host name of the container.
             @type  hostname:    str
+
+            @param overlay:     Filesystem path of an empty folder where the
+                                writable layer of a copy-on-write container
+                                filesystem should be stored. If omitted, the
+                                container uses the root filesystem directly.
+            @type  overlay:     str
         """
         self._reactor = reactor
-        self._rootfs = rootfs
+        self._lower = rootfs
         self._conf = pjoin(conf, 'config')
         self._fstab = pjoin(conf, 'fstab')
         self._hostname = hostname
+        self._mounted = False
 
         if not os.path.isabs(conf):
             raise ValueError('Container configuration directory is not an '
@@ -132,10 +153,34 @@ class Container(object):
             raise ValueError('There is already a fstab file in the container '
                              "configuration directory '{0}'.".format(conf))
 
+        if overlay:
+            if not os.path.isabs(overlay):
+                raise ValueError('Container overlay directory is not an '
+                                 'absolute path.')
+
+            if not os.path.isdir(overlay):
+                raise ValueError('Container overlay directory does not '
+                                 'exist: {0}'.format(overlay))
+
+            self._upper = pjoin(overlay, 'upper')
+            self._work = pjoin(overlay, 'work')
+            self._rootfs = pjoin(overlay, 'rootfs')
+
+            for path in (self._upper, self._work, self._rootfs):
+                os.mkdir(path)
+        else:
+            self._upper = None
+            self._work = None
+            self._rootfs = rootfs
+
         self._ifs = []
         self._fstabExt = []
 
-    def addNetworkInterface(self, name, link=None, ip=None, up=None, down=None):
+        # Cgroup and sysfs files which are kept open to sample the usage
+        self._usageFiles = {}
+
+    def addNetworkInterface(self, name, link=None, ip=None, up=None, down=None,
+                            pair=None):
         """ Add a network interface to the configuration file.
 
             @param name:    Name of the network interface inside the container.
@@ -157,6 +202,12 @@ class Container(object):
             @param down:    Path to a script which should be executed in the
                             host system once the interface has to teared down.
             @type  down:    str
+
+            @param pair:    Name of the network interface in the host system
+                            which is used as the other end of the container
+                            network interface. If omitted, a random name is
+                            used.
+            @type  pair:    str
         """
         if up:
             if not os.path.isabs(up):
@@ -178,7 +229,7 @@ class Container(object):
             if not os.access(down, os.X_OK):
                 raise ValueError('Down script is not executable.')
 
-        self._ifs.append((name, link, ip, up, down))
+        self._ifs.append((name, link, ip, up, down, pair))
 
     def extendFstab(self, src, fs, ro):
         """ Add a line to the fstab file using bind.
@@ -202,11 +253,54 @@ class Container(object):
         if not os.path.exists(src):
             raise ValueError('Source path does not exist.')
 
-        if not os.path.exists(dst):
+        if not (os.path.exists(pjoin(self._lower, fs)) or
+                (self._upper and os.path.exists(pjoin(self._upper, fs)))):
             raise ValueError('Destination path does not exist.')
 
         self._fstabExt.append((src, dst, ro))
 
+    def getPath(self, fs):
+        """ Get the host filesystem path which can be used to write to the
+            given path in the container filesystem. Only containers with a
+            copy-on-write filesystem have a private writable filesystem.
+
+            @param fs:      Path in container filesystem.
+            @type  fs:      str
+
+            @return:        Path in host filesystem.
+            @rtype:         str
+        """
+        if not self._upper:
+            raise ValueError('Container has no private filesystem.')
+
+        return pjoin(self._rootfs if self._mounted else self._upper, fs)
+
+    def makeDirs(self, fs):
+        """ Create a directory, including all missing parent directories, in
+            the private filesystem of the container. New directories inherit
+            the owner and the permissions of the closest directory in the
+            shared root filesystem.
+
+            @param fs:      Path in container filesystem.
+            @type  fs:      str
+        """
+        ref = self._lower
+        current = ''
+
+        for part in fs.strip('/').split('/'):
+            current = pjoin(current, part)
+            path = self.getPath(current)
+            lower = pjoin(self._lower, current)
+
+            if os.path.isdir(lower):
+                ref = lower
+
+            if not os.path.isdir(path):
+                info = os.stat(ref)
+                os.mkdir(path)
+                os.chmod(path, stat.S_IMODE(info.st_mode))
+                os.chown(path, info.st_uid, info.st_gid)
+
     def _setupFiles(self):
         """ Setup the configuration and fstab file.
         """
@@ -218,7 +312,7 @@ class Container(object):
             f.write('lxc.mount = {0}\n'.format(self._fstab))
 
             # Write interface config
-            for name, link, ip, up, down in self._ifs:
+            for name, link, ip, up, down, pair in self._ifs:
                 f.write('\n')
                 f.write('lxc.network.type = veth\n')
                 f.write('lxc.network.flags = up\n')
@@ -236,6 +330,9 @@ class Container(object):
                 if down:
                     f.write('lxc.network.script.down = {0}\n'.format(down))
 
+                if pair:
+                    f.write('lxc.network.veth.pair = {0}\n'.format(pair))
+
 
             # Write cgroup config
             f.write(_CONFIG_CGROUP)
@@ -266,10 +363,127 @@ class Container(object):
         """
         self._setupFiles()
 
+        if self._upper and not self._mounted:
+            d = self._mount()
+            d.addCallback(lambda _: self._start(name))
+            return d
+
+        return self._start(name)
+
+    def setLimits(self, name, cpu=0, memory=0):
+        """ Limit the resources which can be used by the running container
+            using its cgroup.
+
+            @param name:    Name of the container which should be limited.
+            @type  name:    str
+
+            @param cpu:     CPU time which can be used by the container in
+                            percent of a single core, e.g. 50 for half a core
+                            or 200 for two cores. 0 disables the limit.
+            @type  cpu:     int
+
+            @param memory:  Memory which can be used by the container in MB.
+                            0 disables the limit.
+            @type  memory:  int
+
+            @return:        Deferred whose callback is triggered on success or
+                            whose errback is triggered on failure with an
+                            error message.
+            @rtype:         twisted.internet.defer.Deferred
+        """
+        settings = []
+
+        if cpu:
+            # The shares define the relative weight if the CPU is contended,
+            # the quota the absolute upper bound
+            settings.append(('cpu.shares', max(2, cpu * 1024 // 100)))
+            settings.append(('cpu.cfs_quota_us',
+                             cpu * self.CFS_PERIOD // 100))
+
+        if memory:
+            settings.append(('memory.limit_in_bytes', memory * 1024 * 1024))
+
+        def setLimit(_, key, value):
+            return execute(('/usr/bin/lxc-cgroup', '-n', name, key,
+                            str(value)), reactor=self._reactor)
+
+        d = succeed(None)
+
+        for key, value in settings:
+            d.addCallback(setLimit, key, value)
+
+        return d
+
+    def getUsage(self, name):
+        """ Get the resources which have been used by the running container.
+
+            @param name:    Name of the container.
+            @type  name:    str
+
+            @return:        Tuple containing the CPU time in nanoseconds used
+                            since the start of the container, the currently
+                            used memory in bytes, and the number of bytes
+                            which have been sent and received over the network
+                            interfaces with a fixed host interface name.
+            @rtype:         (int, int, int)
+
+            @raise:         IOError if the container is not running.
+        """
+        cpu = self._readUsage(pjoin(self.CGROUP_DIR.format(
+                                        subsystem='cpuacct', name=name),
+                                    'cpuacct.usage'))
+        memory = self._readUsage(pjoin(self.CGROUP_DIR.format(
+                                           subsystem='memory', name=name),
+                                       'memory.usage_in_bytes'))
+        traffic = 0
+
+        for iface in (i[5] for i in self._ifs if i[5]):
+            path = self.NET_DIR.format(iface=iface)
+            traffic += self._readUsage(pjoin(path, 'rx_bytes'))
+            traffic += self._readUsage(pjoin(path, 'tx_bytes'))
+
+        return cpu, memory, traffic
+
+    def _readUsage(self, path):
+        """ Internally used method to read a single integer from a cgroup or
+            sysfs file which is kept open for subsequent reads.
+        """
+        try:
+            f = self._usageFiles[path]
+        except KeyError:
+            f = self._usageFiles[path] = ProcFile(path)
+
+        return f.read_int()
+
+    def _start(self, name):
         log.msg("Start container '{0}'".format(name))
         return execute(('/usr/bin/lxc-start', '-n', name, '-f', self._conf,
                         '-d'), reactor=self._reactor)
 
+    def _mount(self):
+        """ Internally used method to mount the copy-on-write filesystem.
+        """
+        def cb(result):
+            self._mounted = True
+            return result
+
+        opts = 'lowerdir={0},upperdir={1},workdir={2}'.format(self._lower,
+                                                              self._upper,
+                                                              self._work)
+        d = execute(('/bin/mount', '-t', self.OVERLAY_FS, '-o', opts,
+                     self.OVERLAY_FS, self._rootfs), reactor=self._reactor)
+        return d.addCallback(cb)
+
+    def _unmount(self, result):
+        """ Internally used method to unmount the copy-on-write filesystem.
+        """
+        def cb(_):
+            self._mounted = False
+            return result
+
+        d = execute(('/bin/umount', self._rootfs), reactor=self._reactor)
+        return d.addCallback(cb)
+
     def stop(self, name):
         """ Stop the container.
 
@@ -282,4 +496,14 @@ class Container(object):
             @type  command:     twisted.internet.defer.Deferred
         """
         log.msg("Stop container '{0}'".format(name))
-        return execute(('/usr/bin/lxc-stop', '-n', name), reactor=self._reactor)
+
+        for f in self._usageFiles.itervalues():
+            f.close()
+
+        self._usageFiles = {}
+        d = execute(('/usr/bin/lxc-stop', '-n', name), reactor=self._reactor)
+
+        if self._mounted:
+            d.addBoth(self._unmount)
+
+        return d
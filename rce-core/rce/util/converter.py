@@ -32,8 +32,8 @@
 
 # Python specific imports
 import time
-from datetime import datetime
 from functools import partial
+from collections import OrderedDict
 
 try:
     from cStringIO import StringIO, InputType, OutputType
@@ -78,22 +78,112 @@ def _stringify(obj):
         raise TypeError('Object is not a string.')
 
 
+# Representations of time and duration values which can be selected for the
+# messages sent to a robot:
+#     'iso'     Time as local time string 'YYYY-MM-DDTHH:MM:SS.mmmmmm'
+#               (ISO 8601) and duration as float, both wrapped in a list
+#               together with an empty dictionary (default)
+#     'iso-ns'  Time as local time string 'YYYY-MM-DDTHH:MM:SS.nnnnnnnnn'
+#               (ISO 8601) and duration as float
+#     'pair'    Time and duration as dictionary {'secs' : int, 'nsecs' : int}
+#     'float'   Time and duration as float in seconds
+# Messages received from a robot can use any of the representations.
+TIME_FORMATS = ('iso', 'iso-ns', 'pair', 'float')
+
+
+def _unwrap(data):
+    """ Internally used function to remove the wrapping of the time/duration
+        values in the representation 'iso'.
+    """
+    if isinstance(data, (list, tuple)) and len(data) == 2:
+        return data[0]
+
+    return data
+
+
+def _formatTime(secs, nsecs, nano):
+    """ Internally used function to format a time value as local time string
+        of the form 'YYYY-MM-DDTHH:MM:SS.mmmmmm' or, if the flag 'nano' is
+        set, 'YYYY-MM-DDTHH:MM:SS.nnnnnnnnn'.
+    """
+    if nano:
+        return '%04d-%02d-%02dT%02d:%02d:%02d.%09d' % (
+            time.localtime(secs)[:6] + (nsecs,))
+
+    return '%04d-%02d-%02dT%02d:%02d:%02d.%06d' % (
+        time.localtime(secs)[:6] + (nsecs // 1000,))
+
+
+def _parseTime(data):
+    """ Internally used function to parse a local time string of the form
+        'YYYY-MM-DDTHH:MM:SS[.fraction]' (ISO 8601) into seconds and
+        nanoseconds. An appended UTC offset is ignored.
+
+        @raise:             ValueError
+    """
+    if len(data) < 19 or data[4] != '-' or data[10] != 'T':
+        raise ValueError('Time is not a valid ISO 8601 string.')
+
+    secs = int(time.mktime((int(data[0:4]), int(data[5:7]), int(data[8:10]),
+                            int(data[11:13]), int(data[14:16]),
+                            int(data[17:19]), 0, 0, -1)))
+
+    if len(data) > 20 and data[19] == '.':
+        fraction = data[20:29]
+
+        for i, c in enumerate(fraction):
+            if not c.isdigit():
+                fraction = fraction[:i]
+                break
+
+        nsecs = int(fraction.ljust(9, '0')) if fraction else 0
+    else:
+        nsecs = 0
+
+    return secs, nsecs
+
+
 class _DurationConverter(object):
     """ Convert ROS Duration type to JSON style and back.
     """
     implements(ICustomROSConverter)
 
+    def __init__(self, timeFormat='iso'):
+        """ Initialize the Duration Converter.
+
+            @param timeFormat:  Representation of the durations which are
+                                encoded. For the valid values see
+                                rce.util.converter.TIME_FORMATS.
+            @type  timeFormat:  str
+        """
+        self._timeFormat = timeFormat
+
     def decode(self, data):
         """ Generate a rospy.rostime.Duration instance based on the given data
-            which should be a string representation of a float.
+            which should be a float, a string representation of a float, or a
+            dictionary containing the keys 'secs' and 'nsecs'.
         """
+        data = _unwrap(data)
+
+        if isinstance(data, dict):
+            try:
+                return Duration(int(data['secs']), int(data['nsecs']))
+            except KeyError:
+                raise ValueError('Duration is missing secs/nsecs.')
+
         return Duration.from_sec(float(data))
 
     def encode(self, rosMsg):
-        """ Transform the rospy.rostime.Duration instance to a float.
+        """ Transform the rospy.rostime.Duration instance to the selected
+            representation.
         """
         try:
-            return (rosMsg.to_sec(), {})
+            if self._timeFormat == 'pair':
+                return {'secs':rosMsg.secs, 'nsecs':rosMsg.nsecs}
+            elif self._timeFormat == 'iso':
+                return (rosMsg.to_sec(), {})
+
+            return rosMsg.to_sec()
         except AttributeError:
             raise TypeError('Received object is not a Duration instance.')
 
@@ -103,33 +193,56 @@ class _TimeConverter(object):
     """
     implements(ICustomROSConverter)
 
+    def __init__(self, timeFormat='iso'):
+        """ Initialize the Time Converter.
+
+            @param timeFormat:  Representation of the times which are encoded.
+                                For the valid values see
+                                rce.util.converter.TIME_FORMATS.
+            @type  timeFormat:  str
+        """
+        self._timeFormat = timeFormat
+
     def decode(self, data):
         """ Generate a rospy.rostime.Time instance based on the given data of
-            the form 'YYYY-MM-DDTHH:MM:SS.mmmmmm' (ISO 8601).
+            the form 'YYYY-MM-DDTHH:MM:SS.nnnnnnnnn' (ISO 8601) with up to nine
+            digits for the fraction of a second, a float, or a dictionary
+            containing the keys 'secs' and 'nsecs'.
         """
-        if '+' in data:
-            data = data[:data.index('+')]
+        data = _unwrap(data)
 
-        try:
-            dt = datetime(year=int(data[0:4]), month=int(data[5:7]),
-                          day=int(data[8:10]), hour=int(data[11:13]),
-                          minute=int(data[14:16]), second=int(data[17:19]),
-                          microsecond=int(data[20:]))
-        except ValueError:
-            return Time()
+        if isinstance(data, basestring):
+            try:
+                return Time(*_parseTime(data))
+            except (ValueError, OverflowError):
+                return Time()
+        elif isinstance(data, dict):
+            try:
+                return Time(int(data['secs']), int(data['nsecs']))
+            except KeyError:
+                raise ValueError('Time is missing secs/nsecs.')
+        elif isinstance(data, (int, long, float)):
+            return Time.from_sec(data)
 
-        return Time.from_sec(time.mktime(dt.timetuple()))
+        raise TypeError('Time is neither a string, number, nor dictionary.')
 
     def encode(self, rosMsg):
-        """ Transform the rospy.rostime.Time instance to a string of the form
-            'YYYY-MM-DDTHH:MM:SS.mmmmmm' (ISO 8601).
+        """ Transform the rospy.rostime.Time instance to the selected
+            representation.
         """
         try:
-            dt = datetime.fromtimestamp(rosMsg.to_sec())
+            secs, nsecs = rosMsg.secs, rosMsg.nsecs
         except AttributeError:
             raise TypeError('Received object is not a Time instance.')
 
-        return (dt.isoformat(), {})
+        if self._timeFormat == 'iso':
+            return (_formatTime(secs, nsecs, False), {})
+        elif self._timeFormat == 'iso-ns':
+            return _formatTime(secs, nsecs, True)
+        elif self._timeFormat == 'pair':
+            return {'secs':secs, 'nsecs':nsecs}
+
+        return secs + nsecs / 1e9
 
 
 # Check custom time classes whether the interface is correctly implemented
@@ -144,6 +257,10 @@ class Converter(object):
         To add customized Converters use the method 'addCustomConverter' and
         the class must implement the interface 'IROSConverter'.
         As an example view the class ImageConverter.
+
+        The fields of each message class are resolved only once into a
+        conversion plan, which is cached and shared by all interfaces using
+        the Converter.
     """
     _BASE_TYPES = { 'bool'    : bool,
                     'byte'    : int,
@@ -163,6 +280,9 @@ class Converter(object):
     _SPECIAL_TYPES = {  'time'     : _TimeConverter,
                         'duration' : _DurationConverter }
 
+    # CONFIG
+    PLAN_CACHE_SIZE = 512
+
     def __init__(self, loader):
         """ Initialize the Converter.
 
@@ -171,6 +291,22 @@ class Converter(object):
         """
         self._loader = loader
         self._customTypes = {}
+        self._busy = 0.0
+
+        # Key:    tuple (message type, md5 sum of message definition,
+        #                representation of time values)
+        # Value:  conversion plan of the message class (see '_compile')
+        # Ordered from the least to the most recently used plan
+        self._plans = OrderedDict()
+
+        # Key:    message type of nested message
+        # Value:  message class
+        self._classes = {}
+
+    @property
+    def busy(self):
+        """ Total time in seconds which was spent converting messages. """
+        return self._busy
 
     def addCustomConverter(self, converter):
         """ Register a new custom Converter.
@@ -193,6 +329,7 @@ class Converter(object):
 
         self._customTypes[converter.MESSAGE_TYPE] = (converter,
             self._loader.loadMsg(pkg, name))
+        self._plans.clear()
 
     def removeCustomConverter(self, msgType):
         """ Unregister a custom Converter.
@@ -208,44 +345,112 @@ class Converter(object):
             InternalError('Tried to remove a custom converter which was '
                           'never added.')
 
-    def _encode(self, rosMsg):
-        """ Internally used method which is responsible for the heavy lifting.
+        self._plans.clear()
+
+    def _nestedDecoder(self, slotType):
+        """ Internally used method to create the decode function for a field
+            containing a nested ROS message. The message class is loaded when
+            the function is used for the first time.
         """
-        data = {}
+        def decode(data):
+            try:
+                msgCls = self._classes[slotType]
+            except KeyError:
+                msgCls = self._loader.loadMsg(*slotType.split('/'))
+                self._classes[slotType] = msgCls
 
-        for (slotName, slotType) in zip(rosMsg.__slots__, rosMsg._slot_types):
+            return self._decode(msgCls, data)
+
+        return decode
+
+    def _compile(self, msgCls, timeFormat):
+        """ Internally used method to create the conversion plan for a ROS
+            message class. The plan contains for each field a tuple with the
+            name of the field, a flag which is True if the field is a list,
+            the encode function, the decode function, and the decode function
+            of a custom converter or None.
+        """
+        plan = []
+
+        for (slotName, slotType) in zip(msgCls.__slots__, msgCls._slot_types):
             if '[]' == slotType[-2:]:
                 listBool = True
                 slotType = slotType[:-2]
             else:
                 listBool = False
 
+            customDecode = None
+
             if slotType in self._BASE_TYPES:
-                convFunc = self._BASE_TYPES[slotType]
+                encode = self._BASE_TYPES[slotType]
+
+                if slotType == 'string':
+                    decode = _stringify
+                else:
+                    decode = encode
             elif slotType in self._SPECIAL_TYPES:
-                convFunc = self._SPECIAL_TYPES[slotType]().encode
-            elif slotType in self._customTypes:
-                convFunc = self._customTypes[slotType][0]().encode
+                converter = self._SPECIAL_TYPES[slotType](timeFormat)
+                encode, decode = converter.encode, converter.decode
             else:
-                convFunc = self._encode
+                if slotType in self._customTypes:
+                    converter = self._customTypes[slotType][0]()
+                    encode = converter.encode
+                    customDecode = converter.decode
+                else:
+                    encode = partial(self._encode, timeFormat=timeFormat)
 
-            if listBool:
-                convFunc = partial(map, convFunc)
+                decode = self._nestedDecoder(slotType)
+
+            plan.append((slotName, listBool, encode, decode, customDecode))
 
+        return plan
+
+    def _getPlan(self, msgCls, timeFormat='iso'):
+        """ Internally used method to get the conversion plan for a ROS
+            message class from the cache or to create it.
+        """
+        key = (msgCls._type, msgCls._md5sum, timeFormat)
+
+        try:
+            plan = self._plans.pop(key)
+        except KeyError:
+            plan = self._compile(msgCls, timeFormat)
+
+            if len(self._plans) >= self.PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+
+        self._plans[key] = plan
+        return plan
+
+    def _encode(self, rosMsg, timeFormat):
+        """ Internally used method which is responsible for the heavy lifting.
+        """
+        data = {}
+
+        for slotName, listBool, encode, _, _ in self._getPlan(type(rosMsg),
+                                                              timeFormat):
             try:
-                data[slotName] = convFunc(getattr(rosMsg, slotName))
+                if listBool:
+                    data[slotName] = map(encode, getattr(rosMsg, slotName))
+                else:
+                    data[slotName] = encode(getattr(rosMsg, slotName))
             except ValueError as e:
                 raise ValueError('{0}.{1}: {2}'.format(
                                      rosMsg.__class__.__name__, slotName, e))
 
         return data
 
-    def encode(self, rosMsg):
+    def encode(self, rosMsg, timeFormat='iso'):
         """ Generate JSON compatible data from a ROS message.
 
             @param rosMsg:  The ROS message instance which should be converted.
             @type  rosMsg:  ROS message instance
 
+            @param timeFormat:  Representation of the time and duration values
+                                in the generated data. For the valid values
+                                see rce.util.converter.TIME_FORMATS.
+            @type  timeFormat:  str
+
             @return:        Dictionary containing the parsed message. The basic
                             form does map each field in the ROS message to a
                             key / value pair in the returned data dict. Binaries
@@ -258,49 +463,43 @@ class Converter(object):
             raise TypeError('Given rosMsg object is not an instance of '
                             'genpy.message.Message.')
 
-        for converter, cls in self._customTypes.itervalues():
-            if isinstance(rosMsg, cls):
-                return converter().encode(rosMsg)
+        if timeFormat not in TIME_FORMATS:
+            raise ValueError("Invalid time format '{0}'.".format(timeFormat))
+
+        start = time.time()
 
-        return self._encode(rosMsg)
+        try:
+            for converter, cls in self._customTypes.itervalues():
+                if isinstance(rosMsg, cls):
+                    return converter().encode(rosMsg)
+
+            return self._encode(rosMsg, timeFormat)
+        finally:
+            self._busy += time.time() - start
 
     def _decode(self, msgCls, data):
         """ Internally used method which is responsible for the heavy lifting.
         """
         rosMsg = msgCls()
 
-        for (slotName, slotType) in zip(rosMsg.__slots__, rosMsg._slot_types):
+        for slotName, listBool, _, decode, customDecode \
+                in self._getPlan(msgCls):
             if slotName not in data:
                 continue
 
-            if '[]' == slotType[-2:]:
-                listBool = True
-                slotType = slotType[:-2]
-            else:
-                listBool = False
-
             field = data[slotName]
 
             if listBool and not isinstance(field, (list, tuple)):
                 raise TypeError('Given data does not match the definition of '
                                 'the ROS message.')
 
-            if slotType == 'string':
-                convFunc = _stringify
-            elif slotType in self._BASE_TYPES:
-                convFunc = self._BASE_TYPES[slotType]
-            elif slotType in self._SPECIAL_TYPES:
-                convFunc = self._SPECIAL_TYPES[slotType]().decode
-            elif slotType in self._customTypes and _checkIsStringIO(field):
-                convFunc = self._customTypes[slotType][0]().decode
-            else:
-                convFunc = partial(self._decode,
-                                   self._loader.loadMsg(*slotType.split('/')))
+            if customDecode and _checkIsStringIO(field):
+                decode = customDecode
 
             if listBool:
-                convFunc = partial(map, convFunc)
-
-            setattr(rosMsg, slotName, convFunc(field))
+                setattr(rosMsg, slotName, map(decode, field))
+            else:
+                setattr(rosMsg, slotName, decode(field))
 
         return rosMsg
 
@@ -322,9 +521,14 @@ class Converter(object):
             @raise:         TypeError, ValueError,
                             rce.util.loader.ResourceNotFound
         """
-        if _checkIsStringIO(data):
-            for converter, cls in self._customTypes.itervalues():
-                if msgCls == cls:
-                    return converter().decode(msgCls, data)
+        start = time.time()
 
-        return self._decode(msgCls, data)
+        try:
+            if _checkIsStringIO(data):
+                for converter, cls in self._customTypes.itervalues():
+                    if msgCls == cls:
+                        return converter().decode(msgCls, data)
+
+            return self._decode(msgCls, data)
+        finally:
+            self._busy += time.time() - start
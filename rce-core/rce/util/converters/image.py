@@ -67,16 +67,37 @@ from rce.util.converters.interfaces import ICustomROSConverter
 class ImageConverter(object):
     """ Convert images from PNG file format to ROS sensor message format and
         back.
+
+        The codec which is used to encode the images can be changed by using
+        one of the subclasses, e.g. JpegImageConverter, or by overwriting the
+        configuration in a custom subclass.
     """
     implements(ICustomROSConverter)
 
     MESSAGE_TYPE = 'sensor_msgs/Image'
 
-    _ENCODINGMAP_PY_TO_ROS = { 'L' : 'mono8', 'RGB' : 'rgb8',
-                               'RGBA' : 'rgba8', 'YCbCr' : 'yuv422' }
-    _ENCODINGMAP_ROS_TO_PY = { 'mono8' : 'L', 'rgb8' : 'RGB',
-                               'rgba8' : 'RGBA', 'yuv422' : 'YCbCr' }
-    _PIL_MODE_CHANNELS = { 'L' : 1, 'RGB' : 3, 'RGBA' : 4, 'YCbCr' : 3 }
+    # CONFIG
+    FORMAT = 'PNG'
+    PNG_LEVEL = 6
+    JPEG_QUALITY = 85
+    MAX_PIXELS = 4096 * 4096
+
+    # ROS encoding : (PIL mode, PIL raw mode)
+    _ENCODINGMAP_ROS_TO_PY = { 'mono8' : ('L', 'L'),
+                               'mono16' : ('I;16', 'I;16'),
+                               'rgb8' : ('RGB', 'RGB'),
+                               'bgr8' : ('RGB', 'BGR'),
+                               'rgba8' : ('RGBA', 'RGBA'),
+                               'bgra8' : ('RGBA', 'BGRA'),
+                               'yuv422' : ('YCbCr', 'YCbCr') }
+    _ENCODINGMAP_PY_TO_ROS = { 'L' : 'mono8', 'I;16' : 'mono16',
+                               'RGB' : 'rgb8', 'RGBA' : 'rgba8',
+                               'YCbCr' : 'yuv422' }
+    _PIL_MODE_BYTES = { 'L' : 1, 'I;16' : 2, 'RGB' : 3, 'RGBA' : 4,
+                        'YCbCr' : 3 }
+
+    # PIL modes which can be stored as JPEG; all others are stored as PNG
+    _JPEG_MODES = frozenset(('L', 'RGB', 'YCbCr'))
 
     def decode(self, imgObj):
         """ Convert a image stored (PIL library readable image file format)
@@ -86,49 +107,128 @@ class ImageConverter(object):
         if not _checkIsStringIO(imgObj):
             raise TypeError('Given object is not a StringIO instance.')
 
-        # Checking of image according to django.forms.fields.ImageField
+        # The image is validated while it is decoded; only the header is read
+        # before the size is checked
+        imgObj.seek(0)
+
         try:
-            imgObj.seek(0)
             img = Image.open(imgObj)
-            img.verify()
-        except:
+        except IOError:
             raise ValueError('Content of given image could not be verified.')
 
-        imgObj.seek(0)
-        img = Image.open(imgObj)
-        img.load()
+        width, height = img.size
+
+        if width * height > self.MAX_PIXELS:
+            raise ValueError('Given image is too large.')
+
+        try:
+            img.load()
+        except:
+            raise ValueError('Content of given image could not be verified.')
 
         # Everything ok, convert PIL.Image to ROS and return it
-        if img.mode == 'P':
+        if img.mode == 'I':
+            img = img.convert('I;16')
+        elif img.mode in ('P', 'LA'):
+            img = img.convert('RGBA' if img.mode == 'LA' or
+                              'transparency' in img.info else 'RGB')
+        elif img.mode not in self._ENCODINGMAP_PY_TO_ROS:
             img = img.convert('RGB')
 
         rosimage = sensor_msgs.msg.Image()
-        rosimage.encoding = ImageConverter._ENCODINGMAP_PY_TO_ROS[img.mode]
+        rosimage.encoding = self._ENCODINGMAP_PY_TO_ROS[img.mode]
         (rosimage.width, rosimage.height) = img.size
-        rosimage.step = (ImageConverter._PIL_MODE_CHANNELS[img.mode]
-                         * rosimage.width)
+        rosimage.step = self._PIL_MODE_BYTES[img.mode] * rosimage.width
         rosimage.data = img.tostring()
         return rosimage
 
     def encode(self, rosMsg):
-        """ Convert a ROS compatible message (sensor_msgs.Image) to a
-            PNG encoded image stored in a StringIO object.
+        """ Convert a ROS compatible message (sensor_msgs.Image) to an
+            encoded image stored in a StringIO object.
         """
         if not isinstance(rosMsg, sensor_msgs.msg.Image):
             raise TypeError('Given object is not a sensor_msgs.msg.Image '
                             'instance.')
 
-        # Convert to PIL Image
-        pil = Image.fromstring(
-                ImageConverter._ENCODINGMAP_ROS_TO_PY[rosMsg.encoding],
-                (rosMsg.width, rosMsg.height),
-                rosMsg.data,
-                'raw',
-                ImageConverter._ENCODINGMAP_ROS_TO_PY[rosMsg.encoding],
-                0,
-                1)
+        try:
+            mode, rawmode = self._ENCODINGMAP_ROS_TO_PY[rosMsg.encoding]
+        except KeyError:
+            raise ValueError('Image encoding "{0}" is not '
+                             'supported.'.format(rosMsg.encoding))
+
+        if rosMsg.encoding == 'mono16' and rosMsg.is_bigendian:
+            rawmode = 'I;16B'
+
+        # Convert to PIL Image; the image shares the memory with the message
+        # where possible
+        pil = Image.frombuffer(mode, (rosMsg.width, rosMsg.height),
+                               rosMsg.data, 'raw', rawmode, rosMsg.step, 1)
 
         # Save to StringIO
         img = StringIO()
-        pil.save(img, 'PNG')
+
+        if self.FORMAT == 'JPEG' and mode in self._JPEG_MODES:
+            pil.save(img, 'JPEG', quality=self.JPEG_QUALITY)
+        else:
+            pil.save(img, 'PNG', compress_level=self.PNG_LEVEL)
+
         return img
+
+
+class JpegImageConverter(ImageConverter):
+    """ Convert images from JPEG file format to ROS sensor message format and
+        back. Images which can not be stored as JPEG, e.g. with an alpha
+        channel or 16 bit depth, are stored as PNG.
+    """
+    FORMAT = 'JPEG'
+
+
+class RawImageConverter(ImageConverter):
+    """ Convert images from uncompressed PNG file format to ROS sensor message
+        format and back. Should be used when the robots are connected through
+        a fast link and the time to compress the images matters more than the
+        used bandwidth.
+    """
+    PNG_LEVEL = 0
+
+
+class CompressedImageConverter(object):
+    """ Convert images from JPEG/PNG file format to ROS compressed image sensor
+        message format and back. The images are passed through without being
+        decoded.
+    """
+    implements(ICustomROSConverter)
+
+    MESSAGE_TYPE = 'sensor_msgs/CompressedImage'
+
+    _FORMATS = { 'JPEG' : 'jpeg', 'PNG' : 'png' }
+
+    def decode(self, imgObj):
+        """ Convert a JPEG/PNG image stored in a StringIO object to a ROS
+            compatible message (sensor_msgs.CompressedImage).
+        """
+        if not _checkIsStringIO(imgObj):
+            raise TypeError('Given object is not a StringIO instance.')
+
+        # Only the header is read to check the format of the image
+        imgObj.seek(0)
+
+        try:
+            fmt = self._FORMATS[Image.open(imgObj).format]
+        except (IOError, KeyError):
+            raise ValueError('Given image is not a JPEG/PNG image.')
+
+        rosimage = sensor_msgs.msg.CompressedImage()
+        rosimage.format = fmt
+        rosimage.data = imgObj.getvalue()
+        return rosimage
+
+    def encode(self, rosMsg):
+        """ Convert a ROS compatible message (sensor_msgs.CompressedImage) to
+            a StringIO object containing the compressed image.
+        """
+        if not isinstance(rosMsg, sensor_msgs.msg.CompressedImage):
+            raise TypeError('Given object is not a '
+                            'sensor_msgs.msg.CompressedImage instance.')
+
+        return StringIO(rosMsg.data)
@@ -30,16 +30,22 @@
 #
 #
 
-# TODO: This needs some work on specification:
-#        - define interface
-#        - create a class for each IAAS type implementing interface
+# twisted specific imports
+from twisted.internet.defer import Deferred, succeed
+
+
 class IaasHook(object):
-    """ # TODO: Add doc
+    """ Interface for the providers which are used to start and stop instances
+        of container processes on demand. An instance is identified by the IP
+        address which its container process uses for the internal
+        communication, i.e. the IP address of the machine once the container
+        process logged in to the Master.
     """
     def disconnect(self):
         """ Method is called when shutting down the engine to relieve the hook.
+            All instances which have been started through the hook should be
+            stopped.
         """
-        # TODO: Should destroy all instances which have been started dynamically
         raise NotImplementedError
 
     def spin_up(self, count=1, type=None, specialRequest=None):
@@ -53,10 +59,100 @@ class IaasHook(object):
 
             @param specialRequest:  Special request (gpu, cluster, hadoop)
             @type  specialRequest:  TDB by implementation
+
+            @return:                IP addresses of the instances which have
+                                    been started. The container processes of
+                                    the instances connect to the Master on
+                                    their own.
+                                    (type: [ str ])
+            @rtype:                 twisted.internet.defer.Deferred
         """
         raise NotImplementedError
 
-    def spin_down(self):
-        """ # TODO: ???
+    def spin_down(self, ip):
+        """ Call to spin down an instance which has been started using the
+            method 'spin_up'.
+
+            @param ip:              IP address of the instance which should be
+                                    stopped.
+            @type  ip:              str
+
+            @return:                Deferred which fires as soon as the
+                                    instance has been stopped.
+            @rtype:                 twisted.internet.defer.Deferred
         """
         raise NotImplementedError
+
+
+class FakeIaasHook(IaasHook):
+    """ IaaS hook which does not start any real instances. It can be used to
+        test the autoscaling; the callback passed to the constructor can be
+        used to simulate the login of the container process of a new instance.
+    """
+    _NETWORK_ADDR = '10.0.{0}.{1}'
+
+    def __init__(self, reactor, delay=0, launch=None, terminate=None):
+        """ Initialize the Fake IaaS hook.
+
+            @param reactor:         Reference to the twisted reactor.
+            @type  reactor:         twisted::reactor
+
+            @param delay:           Time in seconds which it takes to start an
+                                    instance.
+            @type  delay:           int
+
+            @param launch:          Callback which is called with the IP
+                                    address of an instance once it has been
+                                    started.
+            @type  launch:          callable
+
+            @param terminate:       Callback which is called with the IP
+                                    address of an instance once it has been
+                                    stopped.
+            @type  terminate:       callable
+        """
+        self._reactor = reactor
+        self._delay = delay
+        self._launch = launch
+        self._terminate = terminate
+
+        self._counter = 0
+        self._instances = set()
+
+    @property
+    def instances(self):
+        """ IP addresses of the running instances. """
+        return self._instances
+
+    def disconnect(self):
+        for ip in self._instances.copy():
+            self.spin_down(ip)
+
+    def spin_up(self, count=1, type=None, specialRequest=None):
+        ips = []
+
+        for _ in xrange(count):
+            self._counter += 1
+            ips.append(self._NETWORK_ADDR.format(self._counter // 254,
+                                                 self._counter % 254 + 1))
+
+        d = Deferred()
+
+        def started():
+            self._instances.update(ips)
+            d.callback(ips)
+
+            if self._launch:
+                for ip in ips:
+                    self._launch(ip)
+
+        self._reactor.callLater(self._delay, started)
+        return d
+
+    def spin_down(self, ip):
+        self._instances.discard(ip)
+
+        if self._terminate:
+            self._terminate(ip)
+
+        return succeed(None)
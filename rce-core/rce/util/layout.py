@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-core/rce/util/layout.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+
+# Python specific imports
+import struct
+
+try:
+    from cStringIO import StringIO, InputType, OutputType
+    from StringIO import StringIO as pyStringIO
+
+    def _checkIsStringIO(obj):
+        return isinstance(obj, (InputType, OutputType, pyStringIO))
+except ImportError:
+    from StringIO import StringIO
+
+    def _checkIsStringIO(obj):
+        return isinstance(obj, StringIO)
+
+# ROS specific imports
+try:
+    from genpy.dynamic import generate_dynamic
+except ImportError:
+    print('Can not import ROS Python libraries.')
+    print('Make sure they are installed and the ROS Environment is setup.')
+    exit(1)
+
+
+# Size of the serialized fixed-size types in bytes
+_SIZES = { 'bool'     : 1,
+           'byte'     : 1,
+           'char'     : 1,
+           'uint8'    : 1,
+           'int8'     : 1,
+           'uint16'   : 2,
+           'int16'    : 2,
+           'uint32'   : 4,
+           'int32'    : 4,
+           'float32'  : 4,
+           'uint64'   : 8,
+           'int64'    : 8,
+           'float64'  : 8,
+           'time'     : 8,
+           'duration' : 8 }
+
+# Length prefix of strings and variable-length arrays
+_LEN = struct.Struct('<I')
+
+# Separator between the message definitions in '_full_text'
+_DEF_SEPARATOR = '\n' + '=' * 80 + '\n'
+
+
+def _skipString(buf, offset):
+    return offset + 4 + _LEN.unpack_from(buf, offset)[0]
+
+
+def _skip(part, buf, offset):
+    """ Internally used function to skip a compiled part of a message, which
+        is either a fixed size in bytes or a function.
+    """
+    if isinstance(part, int):
+        return offset + part
+
+    return part(buf, offset)
+
+
+class MessageLayout(object):
+    """ Offset index of the top-level fields of a ROS message class, which is
+        computed from the message definition. It is used to slice the fields
+        out of a serialized message without deserializing it. Fields with a
+        fixed size are skipped in constant time, variable-length arrays of
+        fixed-size types using only their length prefix.
+    """
+    def __init__(self, loader, msgCls):
+        """ Initialize the Message Layout.
+
+            @param loader:      Loader which is used to load the classes of
+                                the nested messages.
+            @type  loader:      rce.util.loader.Loader
+
+            @param msgCls:      ROS message class whose layout is computed.
+            @type  msgCls:      subclass of genpy.message.Message
+        """
+        self._loader = loader
+        self._nested = {}
+
+        self._fields = list(msgCls.__slots__)
+        self._parts = [self._compile(slotType)
+                       for slotType in msgCls._slot_types]
+
+        # The loader is no longer needed
+        self._loader = None
+        self._nested = None
+
+    @property
+    def fields(self):
+        """ Names of the top-level fields in serialization order. """
+        return self._fields
+
+    def _compile(self, slotType):
+        """ Internally used method to compile a field type into either its
+            fixed size in bytes or a function which returns the offset of the
+            end of the field given the buffer and the offset of its start.
+        """
+        if slotType[-1] != ']':
+            return self._compileElement(slotType)
+
+        baseType, length = slotType[:-1].split('[')
+        element = self._compileElement(baseType)
+
+        if length:
+            length = int(length)
+
+            if isinstance(element, int):
+                return length * element
+
+            def skipFixedArray(buf, offset):
+                for _ in xrange(length):
+                    offset = element(buf, offset)
+
+                return offset
+
+            return skipFixedArray
+
+        if isinstance(element, int):
+            def skipArray(buf, offset):
+                return offset + 4 + element * _LEN.unpack_from(buf, offset)[0]
+        else:
+            def skipArray(buf, offset):
+                length, = _LEN.unpack_from(buf, offset)
+                offset += 4
+
+                for _ in xrange(length):
+                    offset = element(buf, offset)
+
+                return offset
+
+        return skipArray
+
+    def _compileElement(self, baseType):
+        """ Internally used method to compile a type which is not an array.
+        """
+        if baseType in _SIZES:
+            return _SIZES[baseType]
+
+        if baseType == 'string':
+            return _skipString
+
+        if baseType not in self._nested:
+            msgCls = self._loader.loadMsg(*baseType.split('/'))
+            parts = [self._compile(t) for t in msgCls._slot_types]
+
+            if all(isinstance(part, int) for part in parts):
+                self._nested[baseType] = sum(parts)
+            else:
+                def skipMessage(buf, offset):
+                    for part in parts:
+                        offset = _skip(part, buf, offset)
+
+                    return offset
+
+                self._nested[baseType] = skipMessage
+
+        return self._nested[baseType]
+
+    def split(self, buf):
+        """ Slice a serialized message into its top-level fields.
+
+            @param buf:         Serialized message.
+            @type  buf:         str
+
+            @return:            Serialized fields in serialization order.
+            @rtype:             [str]
+
+            @raise:             ValueError if the message does not match the
+                                message definition.
+        """
+        slices = []
+        offset = 0
+
+        try:
+            for part in self._parts:
+                end = _skip(part, buf, offset)
+                slices.append(buf[offset:end])
+                offset = end
+        except struct.error:
+            offset = -1
+
+        if offset != len(buf):
+            raise ValueError('Serialized message does not match the '
+                             'message definition.')
+
+        return slices
+
+
+def _createPartialClass(msgCls, fields):
+    """ Internally used function to create a ROS message class which contains
+        only the given top-level fields of a message class. The fields have to
+        be given in serialization order; the serialized partial message is
+        then the concatenation of the serialized fields.
+    """
+    slotTypes = dict(zip(msgCls.__slots__, msgCls._slot_types))
+    definition = '\n'.join('{0} {1}'.format(slotTypes[field], field)
+                           for field in fields)
+
+    # Append the definitions of the nested messages
+    fullText = msgCls._full_text
+    pos = fullText.find(_DEF_SEPARATOR)
+
+    if pos != -1:
+        definition += '\n' + fullText[pos:]
+
+    partialType = '{0}Partial'.format(msgCls._type)
+    return generate_dynamic(partialType, definition)[partialType]
+
+
+class HybridCodec(object):
+    """ Codec which converts only selected top-level fields of a ROS message to
+        JSON and passes the remaining fields through in their serialized form
+        as binary attachments, which avoids deserializing large fields only to
+        encode them again.
+    """
+    def __init__(self, loader, converter, msgCls, fields):
+        """ Initialize the Hybrid Codec.
+
+            @param loader:      Loader which is used to load the classes of
+                                the nested messages.
+            @type  loader:      rce.util.loader.Loader
+
+            @param converter:   Converter which is used for the JSON fields.
+            @type  converter:   rce.util.converter.Converter
+
+            @param msgCls:      ROS message class which should be converted.
+            @type  msgCls:      subclass of genpy.message.Message
+
+            @param fields:      Names of the top-level fields which should be
+                                converted to JSON.
+            @type  fields:      [str]
+        """
+        self._converter = converter
+        self._layout = MessageLayout(loader, msgCls)
+
+        # Flag for each field which is True if it is converted to JSON
+        self._isJSON = [field in fields for field in self._layout.fields]
+        self._jsonFields = [field for field in self._layout.fields
+                            if field in fields]
+
+        self._partialCls = _createPartialClass(msgCls, self._jsonFields)
+        self._partialLayout = MessageLayout(loader, self._partialCls)
+
+    def encode(self, buf, timeFormat='iso'):
+        """ Convert a serialized ROS message into a JSON compatible message.
+
+            @param buf:         Serialized ROS message.
+            @type  buf:         str
+
+            @param timeFormat:  Representation of the time and duration values
+                                in the JSON fields.
+            @type  timeFormat:  str
+
+            @return:            Dictionary containing the JSON fields as well
+                                as the serialized binary fields as StringIO
+                                instances.
+            @rtype:             dict
+
+            @raise:             TypeError, ValueError
+        """
+        slices = self._layout.split(buf)
+
+        partial = self._partialCls()
+        partial.deserialize(''.join(s for s, isJSON
+                                    in zip(slices, self._isJSON) if isJSON))
+        data = self._converter.encode(partial, timeFormat)
+
+        for field, s, isJSON in zip(self._layout.fields, slices,
+                                    self._isJSON):
+            if not isJSON:
+                data[field] = StringIO(s)
+
+        return data
+
+    def decode(self, data):
+        """ Convert a JSON compatible message into a serialized ROS message.
+
+            @param data:        Dictionary containing the JSON fields as well
+                                as the serialized binary fields as StringIO
+                                instances.
+            @type  data:        dict
+
+            @return:            Serialized ROS message.
+            @rtype:             str
+
+            @raise:             TypeError, ValueError,
+                                rce.util.loader.ResourceNotFound
+        """
+        jsonData = dict((field, data[field]) for field in self._jsonFields
+                        if field in data)
+
+        buf = StringIO()
+        self._converter.decode(self._partialCls, jsonData).serialize(buf)
+        jsonSlices = iter(self._partialLayout.split(buf.getvalue()))
+
+        slices = []
+
+        for field, isJSON in zip(self._layout.fields, self._isJSON):
+            if isJSON:
+                slices.append(jsonSlices.next())
+                continue
+
+            try:
+                s = data[field]
+            except KeyError:
+                raise ValueError("Binary field '{0}' is missing.".format(field))
+
+            if not _checkIsStringIO(s):
+                raise TypeError("Field '{0}' is not a binary "
+                                'field.'.format(field))
+
+            slices.append(s.getvalue())
+
+        buf = ''.join(slices)
+
+        # Make sure that the binary fields match the message definition
+        self._layout.split(buf)
+        return buf
@@ -191,6 +191,12 @@ class _Settings(object):
         self._host_ros = None
         self._container_ubuntu = None
         self._container_ros = None
+        self._journal = None
+        self._iaas_hook = None
+        self._iaas_headroom = None
+        self._iaas_idle_timeout = None
+        self._creation_concurrency = None
+        self._distribution_policy = None
 
         # Network
         self._container_if = None
@@ -198,6 +204,7 @@ class _Settings(object):
         self._internal_ip = None
         self._container_ip = None
         self._localhost_ip = None
+        self._group_topology = None
 
         # Comm
         self._http_port = None
@@ -206,6 +213,9 @@ class _Settings(object):
         self._external_port = None
         self._comm_port = None
         self._ros_proxy_port = None
+        self._robot_workers = None
+        self._loader_index = None
+        self._preload = None
 
         # Converters
         self._converters = None
@@ -219,6 +229,11 @@ class _Settings(object):
         self._rootfs = None
         self._conf_dir = None
         self._data_dir = None
+        self._pool_size = None
+        self._overlay = None
+        self._net_helper = None
+        self._telemetry_interval = None
+        self._fork_server = None
         self._packages = None
 
     @property
@@ -256,6 +271,44 @@ class _Settings(object):
         """ ROS release used inside the container. """
         return self._container_ros
 
+    @property
+    def journal(self):
+        """ Path to the journal file in which the Master persists the
+            configuration of the users, or None if the journal is disabled.
+        """
+        return self._journal
+
+    @property
+    def iaas_hook(self):
+        """ Full path to the class of the IaaS hook which is used to spin up
+            and down machines, or None if autoscaling is disabled.
+        """
+        return self._iaas_hook
+
+    @property
+    def iaas_headroom(self):
+        """ Number of idle machines which are kept running. """
+        return self._iaas_headroom
+
+    @property
+    def iaas_idle_timeout(self):
+        """ Time in seconds after which an idle machine is spun down. """
+        return self._iaas_idle_timeout
+
+    @property
+    def creation_concurrency(self):
+        """ Maximum number of containers which are started concurrently in a
+            single machine.
+        """
+        return self._creation_concurrency
+
+    @property
+    def distribution_policy(self):
+        """ Policy which is used to distribute the robots to the robot
+            processes, i.e. 'load' or 'connections'.
+        """
+        return self._distribution_policy
+
     @property
     def container_interface(self):
         """ Name of the container network interface. """
@@ -283,6 +336,13 @@ class _Settings(object):
         """ IP address of loopback network interface. """
         return self._localhost_ip
 
+    @property
+    def group_topology(self):
+        """ Topology of the GRE tunnels between the machines of a network
+            group; either 'mesh' or 'star'.
+        """
+        return self._group_topology
+
     @property
     def http_port(self):
         """ Port on which the Master process is listening for HTTP requests
@@ -325,6 +385,28 @@ class _Settings(object):
         """
         return self._ros_proxy_port
 
+    @property
+    def robot_workers(self):
+        """ Number of Robot processes which are started on a machine. The
+            i-th process (starting at 0) uses the ports 'ws_port' + i and
+            'comm_port' + i.
+        """
+        return self._robot_workers
+
+    @property
+    def loader_index(self):
+        """ Path to the file in which the Robot processes store the locations
+            of the message/service modules, or None.
+        """
+        return self._loader_index
+
+    @property
+    def preload(self):
+        """ List of message/service types which are loaded in the background
+            when a Robot or Environment process is started.
+        """
+        return self._preload
+
     @property
     def converters(self):
         """ List of custom message converters which are used in the Robot
@@ -339,17 +421,19 @@ class _Settings(object):
 
     @property
     def cpu(self):
-        """ Parameter to define CPU attributes/capacity. """
+        """ CPU capacity of the machine in percent of a single core, e.g.
+            400 for four cores.
+        """
         return self._cpu
 
     @property
     def memory(self):
-        """ Parameter to define memory attributes/capacity. """
+        """ Memory capacity of the machine in MB. """
         return self._memory
 
     @property
     def bandwidth(self):
-        """ Parameter to define bandwidth attributes/capacity. """
+        """ Network bandwidth capacity of the machine in kbit/s. """
         return self._bandwidth
 
     @property
@@ -376,6 +460,41 @@ class _Settings(object):
         """
         return self._data_dir
 
+    @property
+    def pool_size(self):
+        """ Number of started containers which are kept ready to be assigned
+            to new environments.
+        """
+        return self._pool_size
+
+    @property
+    def overlay(self):
+        """ Flag which is True if the containers should use copy-on-write
+            filesystems.
+        """
+        return self._overlay
+
+    @property
+    def net_helper(self):
+        """ Path to the socket of the network helper, or None if the network
+            operations should be applied by the container process itself.
+        """
+        return self._net_helper
+
+    @property
+    def fork_server(self):
+        """ Flag which is True if Python nodes should be forked by a fork
+            server in the environment process.
+        """
+        return self._fork_server
+
+    @property
+    def telemetry_interval(self):
+        """ Interval in seconds in which the resources used in the machine
+            are pushed to the Master.
+        """
+        return self._telemetry_interval
+
     @property
     def packages(self):
         """ List of custom ROS packages which are mounted using bind into the
@@ -414,6 +533,39 @@ class _Settings(object):
         settings._container_ubuntu = parser.get('global',
                                                 'container_ubuntu_release')
 
+        if parser.has_option('global', 'journal'):
+            settings._journal = parser.get('global', 'journal')
+
+        if parser.has_option('global', 'iaas_hook'):
+            settings._iaas_hook = parser.get('global', 'iaas_hook')
+
+        if parser.has_option('global', 'iaas_headroom'):
+            settings._iaas_headroom = parser.getint('global', 'iaas_headroom')
+        else:
+            settings._iaas_headroom = 0
+
+        if parser.has_option('global', 'iaas_idle_timeout'):
+            settings._iaas_idle_timeout = parser.getint('global',
+                                                        'iaas_idle_timeout')
+        else:
+            settings._iaas_idle_timeout = 600
+
+        if parser.has_option('global', 'creation_concurrency'):
+            settings._creation_concurrency = parser.getint(
+                'global', 'creation_concurrency')
+        else:
+            settings._creation_concurrency = 2
+
+        if parser.has_option('global', 'distribution_policy'):
+            settings._distribution_policy = parser.get('global',
+                                                       'distribution_policy')
+
+            if settings._distribution_policy not in ('load', 'connections'):
+                raise ValueError("Distribution policy has to be either 'load' "
+                                 "or 'connections'.")
+        else:
+            settings._distribution_policy = 'load'
+
         # Network
         settings._container_if = parser.get('network', 'container_if')
         settings._external_ip = parser.getIP('network', 'external_if')
@@ -421,6 +573,15 @@ class _Settings(object):
         settings._container_ip = parser.getIP('network', 'container_if')
         settings._localhost_ip = _getIP('lo')
 
+        if parser.has_option('network', 'group_topology'):
+            settings._group_topology = parser.get('network', 'group_topology')
+
+            if settings._group_topology not in ('mesh', 'star'):
+                raise ValueError("Network group topology has to be either "
+                                 "'mesh' or 'star'.")
+        else:
+            settings._group_topology = 'mesh'
+
         # Comm
         settings._http_port = parser.getint('comm', 'http_port')
         settings._ws_port = parser.getint('comm', 'ws_port')
@@ -429,6 +590,21 @@ class _Settings(object):
         settings._comm_port = parser.getint('comm', 'comm_port')
         settings._ros_proxy_port = parser.getint('comm', 'ros_proxy_port')
 
+        if parser.has_option('comm', 'robot_workers'):
+            settings._robot_workers = parser.getint('comm', 'robot_workers')
+        else:
+            settings._robot_workers = 1
+
+        if parser.has_option('comm', 'loader_index'):
+            settings._loader_index = parser.get('comm', 'loader_index')
+
+        if parser.has_option('comm', 'preload'):
+            settings._preload = [t.strip() for t in
+                                 parser.get('comm', 'preload').split(',')
+                                 if t.strip()]
+        else:
+            settings._preload = []
+
         # Converters
         settings._converters = tuple(c for _, c in parser.items('converters'))
 
@@ -440,6 +616,31 @@ class _Settings(object):
         settings._rootfs = parser.get('machine', 'rootfs')
         settings._conf_dir = parser.get('machine', 'conf_dir')
         settings._data_dir = parser.get('machine', 'data_dir')
+
+        if parser.has_option('machine', 'pool_size'):
+            settings._pool_size = parser.getint('machine', 'pool_size')
+        else:
+            settings._pool_size = 0
+
+        if parser.has_option('machine', 'overlay'):
+            settings._overlay = parser.getboolean('machine', 'overlay')
+        else:
+            settings._overlay = False
+
+        if parser.has_option('machine', 'net_helper'):
+            settings._net_helper = parser.get('machine', 'net_helper')
+
+        if parser.has_option('machine', 'telemetry_interval'):
+            settings._telemetry_interval = parser.getint('machine',
+                                                         'telemetry_interval')
+        else:
+            settings._telemetry_interval = 10
+
+        if parser.has_option('machine', 'fork_server'):
+            settings._fork_server = parser.getboolean('machine', 'fork_server')
+        else:
+            settings._fork_server = False
+
         # Figure out the special features
         special_features = parser.get('machine', 'special_features')
         settings._special_features = [i.strip() for i in
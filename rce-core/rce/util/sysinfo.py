@@ -362,6 +362,8 @@ nt_virtmem_info = namedtuple('vmem', ' '.join([
 nt_net_iostat = namedtuple('iostat',
     'bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout')
 nt_disk_iostat = namedtuple('iostat', 'read_count write_count read_bytes write_bytes read_time write_time')
+nt_net_rate = namedtuple('netrate', 'bytes_sent bytes_recv')
+nt_sample = namedtuple('sample', 'time cpu_percent mem net_io procs')
 
 
 # named tuples for processes
@@ -374,6 +376,7 @@ nt_openfile = namedtuple('openfile', 'path fd')
 nt_connection = namedtuple('connection', 'fd family type local_address remote_address status')
 nt_uids = namedtuple('user', 'real effective saved')
 nt_gids = namedtuple('group', 'real effective saved')
+nt_proc_sample = namedtuple('procsample', 'cpu_percent rss')
 
 
 # SYSTEM FUNCTIONS
@@ -519,32 +522,37 @@ def usage_percent(used, total, _round=None):
 
 def get_sys_meminfo():
     f = open('/proc/meminfo', 'r')
-    total = free = buffers = cached = active = inactive = None
     try:
-        for line in f:
-            if line.startswith('MemTotal:'):
-                total = int(line.split()[1]) * 1024
-            elif line.startswith('MemFree:'):
-                free = int(line.split()[1]) * 1024
-            elif line.startswith('Buffers:'):
-                buffers = int(line.split()[1]) * 1024
-            elif line.startswith('Cached:'):
-                cached = int(line.split()[1]) * 1024
-            elif line.startswith('Active:'):
-                active = int(line.split()[1]) * 1024
-            elif line.startswith('Inactive:'):
-                inactive = int(line.split()[1]) * 1024
-            if  total is not None \
-            and free is not None \
-            and buffers is not None \
-            and cached is not None \
-            and active is not None \
-            and inactive is not None:
-                break
-        else:
-            raise RuntimeError("line(s) not found")
+        return _parse_meminfo(f)
     finally:
         f.close()
+
+
+def _parse_meminfo(lines):
+    """Parse the lines of /proc/meminfo into a namedtuple."""
+    total = free = buffers = cached = active = inactive = None
+    for line in lines:
+        if line.startswith('MemTotal:'):
+            total = int(line.split()[1]) * 1024
+        elif line.startswith('MemFree:'):
+            free = int(line.split()[1]) * 1024
+        elif line.startswith('Buffers:'):
+            buffers = int(line.split()[1]) * 1024
+        elif line.startswith('Cached:'):
+            cached = int(line.split()[1]) * 1024
+        elif line.startswith('Active:'):
+            active = int(line.split()[1]) * 1024
+        elif line.startswith('Inactive:'):
+            inactive = int(line.split()[1]) * 1024
+        if  total is not None \
+        and free is not None \
+        and buffers is not None \
+        and cached is not None \
+        and active is not None \
+        and inactive is not None:
+            break
+    else:
+        raise RuntimeError("line(s) not found")
     avail = free + buffers + cached
     used = total - free
     percent = usage_percent((total - avail), total, _round=1)
@@ -563,7 +571,11 @@ def network_io_counters():
         lines = f.readlines()
     finally:
         f.close()
+    return _parse_net_dev(lines)
+
 
+def _parse_net_dev(lines):
+    """Parse the lines of /proc/net/dev into a dict of namedtuples."""
     retdict = dict()
     for line in lines[2:]:
         colon = line.find(':')
@@ -626,6 +638,138 @@ def disk_io_counters():
     return retdict
 
 
+# Incremental sampling
+
+class ProcFile(object):
+    """A file in /proc (or in sysfs) which is kept open and reread from
+    the start on every read, which avoids the path lookup and the
+    allocation of a new file descriptor for each sample.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def read(self):
+        """Return the current content of the file.
+
+        Raises IOError if the file does not exist (anymore), in which
+        case the file is reopened on the next call.
+        """
+        if self._file is None:
+            self._file = open(self.path, 'r')
+        try:
+            self._file.seek(0)
+            return self._file.read()
+        except (IOError, OSError):
+            self.close()
+            raise
+
+    def read_int(self):
+        """Return the content of a file containing a single integer."""
+        return int(self.read().strip())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Sampler(object):
+    """Non-blocking sampler for the system-wide CPU, memory and network
+    statistics and for the CPU and memory usage of a set of processes.
+
+    The files in /proc are kept open between the samples and all rates
+    are computed from the previous sample instead of sleeping, hence
+    the rates of the first sample (or of a newly sampled process) are
+    zero. The sampler is meant to be called periodically, e.g. from a
+    twisted LoopingCall, and never blocks.
+    """
+
+    def __init__(self):
+        self._stat = ProcFile('/proc/stat')
+        self._meminfo = ProcFile('/proc/meminfo')
+        self._netdev = ProcFile('/proc/net/dev')
+        self._proc_files = {}
+        self._last_time = None
+        self._last_cpu = None
+        self._last_net = {}
+        self._last_procs = {}
+
+    def sample(self, pids=()):
+        """Return a namedtuple containing the time of the sample, the
+        system-wide CPU utilization as a percentage, the memory usage as
+        returned by get_sys_meminfo(), the rates in bytes per second
+        sent and received by each network interface, and for each of the
+        given PIDs still running the CPU utilization as a percentage of
+        a single CPU and the resident memory in bytes.
+        """
+        now = time.time()
+        elapsed = now - self._last_time if self._last_time else 0.0
+        self._last_time = now
+
+        # system-wide CPU; fields: user nice system idle iowait irq softirq
+        values = [int(x) for x in
+                  self._stat.read().split('\n', 1)[0].split()[1:8]]
+        cpu = (sum(values) - values[3], sum(values))
+        last_cpu, self._last_cpu = self._last_cpu, cpu
+        cpu_percent = 0.0
+        if last_cpu and cpu[1] > last_cpu[1]:
+            cpu_percent = round((cpu[0] - last_cpu[0]) * 100.0 /
+                                (cpu[1] - last_cpu[1]), 1)
+
+        mem = _parse_meminfo(self._meminfo.read().splitlines())
+
+        counters = _parse_net_dev(self._netdev.read().splitlines())
+        net_io = {}
+        for name, c in counters.items():
+            last = self._last_net.get(name)
+            if last and elapsed > 0:
+                net_io[name] = nt_net_rate(
+                    (c.bytes_sent - last.bytes_sent) / elapsed,
+                    (c.bytes_recv - last.bytes_recv) / elapsed)
+            else:
+                net_io[name] = nt_net_rate(0.0, 0.0)
+        self._last_net = counters
+
+        procs = {}
+        last_procs, self._last_procs = self._last_procs, {}
+        for pid in pids:
+            f = self._proc_files.get(pid)
+            if f is None:
+                f = self._proc_files[pid] = ProcFile('/proc/%s/stat' % pid)
+            try:
+                st = f.read()
+            except EnvironmentError:
+                # process is gone
+                del self._proc_files[pid]
+                continue
+            # ignore the first two values ("pid (exe)")
+            values = st[st.rfind(')') + 2:].split(' ')
+            ticks = int(values[11]) + int(values[12])
+            rss = int(values[21]) * _PAGESIZE
+            self._last_procs[pid] = ticks
+            last = last_procs.get(pid)
+            if last is not None and elapsed > 0:
+                percent = round((ticks - last) * 100.0 /
+                                (_CLOCK_TICKS * elapsed), 1)
+            else:
+                percent = 0.0
+            procs[pid] = nt_proc_sample(percent, rss)
+
+        for pid in set(self._proc_files) - set(self._last_procs):
+            self._proc_files.pop(pid).close()
+
+        return nt_sample(now, cpu_percent, mem, net_io, procs)
+
+    def close(self):
+        """Close all files which are kept open by the sampler."""
+        for f in [self._stat, self._meminfo, self._netdev] + \
+                 list(self._proc_files.values()):
+            f.close()
+        self._proc_files = {}
+
+
 # Representation and methods for a process
 
 class Process(object):
@@ -52,6 +52,7 @@ setup(
     scripts=['scripts/rce-make', 'scripts/rce-setup-rcemake',
              'scripts/rce-master', 'scripts/rce-container',
              'scripts/rce-robot', 'scripts/rce-environment',
-             'scripts/rce-rosproxy', 'scripts/rce-maintain'],
+             'scripts/rce-rosproxy', 'scripts/rce-maintain',
+             'scripts/rce-nethelper'],
     package_data={'rce.core': ['data/*.upstart', 'data/*.script']},
 )
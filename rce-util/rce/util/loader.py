@@ -67,6 +67,8 @@
 # Python specific imports
 import os
 import sys
+import json
+from threading import RLock
 
 # ROS specific imports
 try:
@@ -77,6 +79,10 @@ except ImportError:
     print('Make sure they are installed and the ROS Environment is setup.')
     exit(1)
 
+# Description of the class types used in error messages
+_CLS_NAMES = {'msg':'message', 'srv':'service'}
+
+
 class ResourceNotFound(Exception):
     """ Exception is raised by the Loader when a resource can not be found.
     """
@@ -87,17 +93,29 @@ class Loader(object):
         service classes. Additionally, the Loader can be used to locate
         nodes/executables in packages.
         To increase the speed the Loader has a cache for the classes and the
-        paths to the nodes.
+        paths to the nodes. Additionally, the locations of the msg/srv modules
+        can be stored in an index on disk such that after a restart the
+        modules can be imported without crawling the ROS packages.
     """
-    def __init__(self, rosPath=None):
+    def __init__(self, rosPath=None, indexPath=None):
         """ Initialize the Loader.
 
             @param rosPath:     Ordered list of paths to search for resources.
                                 If None (default), use environment ROS path.
             @type  rosPath:     [str] / None
+
+            @param indexPath:   Path to the file in which the index of the
+                                msg/srv modules is stored. If None (default),
+                                no index is used.
+            @type  indexPath:   str / None
         """
+        self._rosPath = rosPath
         self._rp = rospkg.RosPack(rosPath)
 
+        # Lock which protects the import of modules, because the messages
+        # can be preloaded in a separate thread
+        self._lock = RLock()
+
         # List of all packages which are already added to sys.path
         self._packages = set()
 
@@ -105,6 +123,20 @@ class Loader(object):
         # Value:  msg/srv module
         self._moduleCache = {}
 
+        # Key:    package name
+        # Value:  path to the package
+        self._pkgCache = {}
+
+        # Key:    tuple (package name, executable name)
+        # Value:  path to the executable
+        self._nodeCache = {}
+
+        # Key:    'package name/clsType'
+        # Value:  [path which has to be in sys.path, mtime of module directory]
+        self._indexPath = indexPath
+        self._index = self._readIndex()
+        self._indexChanged = False
+
     def _getDepends(self, pkg):
         """ roslib.launcher
 
@@ -219,9 +251,94 @@ class Loader(object):
 
         return bool(permission and all(permission))
 
+    def _readIndex(self):
+        """ Internally used method to read the index of the msg/srv modules.
+        """
+        if not self._indexPath or not os.path.isfile(self._indexPath):
+            return {}
+
+        try:
+            with open(self._indexPath, 'r') as f:
+                index = json.load(f)
+        except (IOError, ValueError):
+            # Index is corrupt; it will be rebuilt
+            return {}
+
+        return index if isinstance(index, dict) else {}
+
+    def flushIndex(self):
+        """ Write the index of the msg/srv modules to disk if it has been
+            changed since it has been written the last time.
+        """
+        if not (self._indexPath and self._indexChanged):
+            return
+
+        # Several processes might share the same index
+        tmp = '{0}.{1}.tmp'.format(self._indexPath, os.getpid())
+
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self._index, f)
+
+            os.rename(tmp, self._indexPath)
+        except (IOError, OSError):
+            # The index is only used to speed up the loading of modules
+            return
+
+        self._indexChanged = False
+
+    def _indexedModule(self, pkg, clsType, cls):
+        """ Internally used method to import a module using the location
+            stored in the index. An entry is only used if the directory of the
+            module has not been modified since the entry has been stored.
+
+            @return:        Module or None if the module is not in the index
+                            or the entry is no longer valid.
+        """
+        try:
+            root, mtime = self._index['{0}/{1}'.format(pkg, clsType)]
+            valid = os.stat(os.path.join(root, pkg, clsType)).st_mtime == mtime
+        except (KeyError, ValueError, TypeError, OSError):
+            valid = False
+
+        if not valid:
+            return None
+
+        if root not in sys.path:
+            sys.path.insert(0, root)
+
+        try:
+            return __import__('.'.join([pkg, clsType]), fromlist=[cls])
+        except ImportError:
+            # Probably a dependency which is not in sys.path; take the long way
+            return None
+
+    def _indexModule(self, pkg, clsType, module):
+        """ Internally used method to add the location of a module to the
+            index.
+        """
+        if not self._indexPath:
+            return
+
+        path = os.path.dirname(os.path.abspath(module.__file__))
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return
+
+        self._index['{0}/{1}'.format(pkg, clsType)] = \
+            [os.path.dirname(os.path.dirname(path)), mtime]
+        self._indexChanged = True
+
     def _loadModule(self, pkg, clsType, cls):
         """ Internally used method to load a module.
         """
+        module = self._indexedModule(pkg, clsType, cls)
+
+        if module:
+            return module
+
         try:
             self._loadManifest(pkg)
         except rospkg.ResourceNotFound:
@@ -229,7 +346,7 @@ class Loader(object):
                                    '"{0}".'.format(pkg))
 
         try:
-            return __import__('.'.join([pkg, clsType]), fromlist=[cls])
+            module = __import__('.'.join([pkg, clsType]), fromlist=[cls])
         except ImportError as e:
             if self._checkPermission([pkg, clsType]):
                 raise ResourceNotFound('Can not import {0}.{1} of ROS package '
@@ -240,22 +357,11 @@ class Loader(object):
             raise ResourceNotFound('Can not import {0}.{1} of ROS package '
                                    '{2}: {1}'.format(clsType, cls, pkg, e))
 
-    def loadMsg(self, pkg, cls):
-        """ Get the message class matching the string pair.
-            This method uses a internal cache; therefore, changes on the
-            filesystem will be ignored once the class is loaded into the cache.
-
-            @param pkg:     Package name from where the class should be loaded.
-            @type  pkg:     str
-
-            @param cls:     Class name of the message class which should be
-                            loaded.
-            @type  cls:     str
-
-            @return:        Class matching the string pair.
-            @rtype:         subclass of genpy.message.Message
+        self._indexModule(pkg, clsType, module)
+        return module
 
-            @raise:         ValueError, rce.util.loader.ResourceNotFound
+    def _loadClass(self, pkg, clsType, cls, flush=True):
+        """ Internally used method to load a msg/srv class.
         """
         if isinstance(pkg, unicode):
             try:
@@ -269,19 +375,47 @@ class Loader(object):
             except UnicodeEncodeError:
                 raise ValueError('The class "{0}" is not valid.'.format(cls))
 
-        key = (pkg, 'msg', cls)
+        key = (pkg, clsType, cls)
 
         try:
             module = self._moduleCache[key]
         except KeyError:
-            module = self._loadModule(*key)
-            self._moduleCache[key] = module
+            with self._lock:
+                module = self._moduleCache.get(key)
+
+                if not module:
+                    module = self._loadModule(*key)
+                    self._moduleCache[key] = module
+
+                    if flush:
+                        self.flushIndex()
 
         try:
             return getattr(module, cls)
         except AttributeError:
             raise ResourceNotFound('ROS package "{0}" does not have '
-                                   'message class "{1}"'.format(pkg, cls))
+                                   '{1} class "{2}"'.format(pkg,
+                                                            _CLS_NAMES[clsType],
+                                                            cls))
+
+    def loadMsg(self, pkg, cls):
+        """ Get the message class matching the string pair.
+            This method uses a internal cache; therefore, changes on the
+            filesystem will be ignored once the class is loaded into the cache.
+
+            @param pkg:     Package name from where the class should be loaded.
+            @type  pkg:     str
+
+            @param cls:     Class name of the message class which should be
+                            loaded.
+            @type  cls:     str
+
+            @return:        Class matching the string pair.
+            @rtype:         subclass of genpy.message.Message
+
+            @raise:         ValueError, rce.util.loader.ResourceNotFound
+        """
+        return self._loadClass(pkg, 'msg', cls)
 
     def loadSrv(self, pkg, cls):
         """ Get the service class matching the string pair.
@@ -300,31 +434,42 @@ class Loader(object):
 
             @raise:         ValueError, rce.util.loader.ResourceNotFound
         """
-        if isinstance(pkg, unicode):
-            try:
-                pkg = str(pkg)
-            except UnicodeEncodeError:
-                raise ValueError('The package "{0}" is not valid.'.format(pkg))
+        return self._loadClass(pkg, 'srv', cls)
+
+    def preload(self, types):
+        """ Load the classes of the given message/service types such that
+            they are in the cache when they are used for the first time. As
+            loading a class might take some time this method should be called
+            in a separate thread.
+
+            @param types:   Message/service types which should be loaded. Each
+                            type has the form 'pkg/cls' or 'pkg/srv/cls' for
+                            services; 'pkg/msg/cls' is also accepted.
+            @type  types:   [str]
+
+            @return:        List of tuples containing each type which could
+                            not be loaded and the reason.
+            @rtype:         [(str, str)]
+        """
+        failed = []
 
-        if isinstance(cls, unicode):
+        for clsType in types:
             try:
-                cls = str(cls)
-            except UnicodeEncodeError:
-                raise ValueError('The class "{0}" is not valid.'.format(cls))
+                parts = clsType.split('/')
 
-        key = (pkg, 'srv', cls)
+                if len(parts) == 2:
+                    self._loadClass(parts[0], 'msg', parts[1], False)
+                elif len(parts) == 3 and parts[1] in _CLS_NAMES:
+                    self._loadClass(parts[0], parts[1], parts[2], False)
+                else:
+                    raise ValueError('Type is not valid.')
+            except (ValueError, ResourceNotFound) as e:
+                failed.append((clsType, str(e)))
 
-        try:
-            module = self._moduleCache[key]
-        except KeyError:
-            module = self._loadModule(*key)
-            self._moduleCache[key] = module
+        with self._lock:
+            self.flushIndex()
 
-        try:
-            return getattr(module, cls)
-        except AttributeError:
-            raise ResourceNotFound('ROS package "{0}" does not have '
-                                   'service class "{1}"'.format(pkg, cls))
+        return failed
 
     def findPkgPath(self, pkg):
         """ Find the path to the given package.
@@ -338,12 +483,25 @@ class Loader(object):
 
             @raise:         rce.util.loader.ResourceNotFound
         """
+        path = self._pkgCache.get(pkg)
+
+        if path:
+            if os.path.isdir(path):
+                return path
+
+            # The package has been moved; the crawled package locations of
+            # RosPack are no longer valid
+            self._refresh()
+
         try:
-            return self._rp.get_path(pkg)
+            path = self._rp.get_path(pkg)
         except rospkg.ResourceNotFound:
             raise ResourceNotFound('Can not find ROS package '
                                    '"{0}".'.format(pkg))
 
+        self._pkgCache[pkg] = path
+        return path
+
     def findNode(self, pkg, exe):
         """ Find the node/executable in the given package.
 
@@ -359,9 +517,28 @@ class Loader(object):
 
             @raise:         rce.util.loader.ResourceNotFound
         """
+        key = (pkg, exe)
+        path = self._nodeCache.get(key)
+
+        if path:
+            if os.access(path, os.X_OK):
+                return path
+
+            self._refresh()
+
         try:
-            return roslib.packages.find_node(pkg, exe,
-                                            rospack=self._rp)[0]
+            path = roslib.packages.find_node(pkg, exe, rospack=self._rp)[0]
         except IndexError:
             raise ResourceNotFound('Can not find executable "{0}" in '
                                    'ROS package "{1}".'.format(exe, pkg))
+
+        self._nodeCache[key] = path
+        return path
+
+    def _refresh(self):
+        """ Internally used method to drop all cached package and executable
+            paths after a change of the packages has been detected.
+        """
+        self._rp = rospkg.RosPack(self._rosPath)
+        self._pkgCache = {}
+        self._nodeCache = {}
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#     rce-util/rce/util/wheel.py
+#
+#     This file is part of the RoboEarth Cloud Engine framework.
+#
+#     This file was originally created for RoboEearth
+#     http://www.roboearth.org/
+#
+#     The research leading to these results has received funding from
+#     the European Union Seventh Framework Programme FP7/2007-2013 under
+#     grant agreement no248942 RoboEarth.
+#
+#     Copyright 2013 RoboEarth
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+#
+#     \author/s: Dominique Hunziker
+#
+#
+
+
+class TimerWheel(object):
+    """ Hashed timer wheel which keeps track of the deadlines of a large
+        number of entries. Adding and removing an entry is O(1) and expiring
+        the entries only visits the slots of the elapsed ticks.
+
+        The wheel does not use a clock by itself; the owner has to call
+        'expire' periodically, i.e. with a twisted LoopingCall.
+    """
+    def __init__(self, now, resolution=0.5, size=256):
+        """ Initialize the Timer Wheel.
+
+            @param now:         Current time in seconds.
+            @type  now:         float
+
+            @param resolution:  Duration of a tick of the wheel in seconds.
+                                Entries expire at most one tick after their
+                                deadline.
+            @type  resolution:  float
+
+            @param size:        Number of slots in the wheel.
+            @type  size:        int
+        """
+        if resolution <= 0:
+            raise ValueError('Resolution of the wheel has to be positive.')
+
+        if size < 1:
+            raise ValueError('Size of the wheel has to be positive.')
+
+        self._resolution = float(resolution)
+        self._tick = int(now / self._resolution)
+
+        # Each slot maps the entries to the tick of their deadline
+        self._slots = [{} for _ in xrange(size)]
+
+        # Key:    entry
+        # Value:  slot which contains the entry
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def add(self, key, deadline):
+        """ Add an entry to the wheel or replace its deadline.
+
+            @param key:         Entry which should be added.
+            @type  key:         hashable
+
+            @param deadline:    Time in seconds after which the entry expires.
+            @type  deadline:    float
+        """
+        self.remove(key)
+
+        tick = max(int(deadline / self._resolution) + 1, self._tick + 1)
+        slot = self._slots[tick % len(self._slots)]
+        slot[key] = tick
+        self._entries[key] = slot
+
+    def remove(self, key):
+        """ Remove an entry from the wheel. Unknown entries are ignored.
+
+            @param key:         Entry which should be removed.
+            @type  key:         hashable
+        """
+        slot = self._entries.pop(key, None)
+
+        if slot is not None:
+            del slot[key]
+
+    def expire(self, now):
+        """ Advance the wheel and remove all entries whose deadline passed.
+
+            @param now:         Current time in seconds.
+            @type  now:         float
+
+            @return:            Expired entries.
+            @rtype:             [ hashable ]
+        """
+        tick = int(now / self._resolution)
+        last = min(tick, self._tick + len(self._slots))
+        expired = []
+
+        # Each slot has to be visited at most once, because the entries of
+        # later rounds remain in the slot
+        for t in xrange(self._tick + 1, last + 1):
+            slot = self._slots[t % len(self._slots)]
+
+            for key, deadline in slot.items():
+                if deadline <= tick:
+                    del slot[key]
+                    del self._entries[key]
+                    expired.append(key)
+
+        self._tick = max(tick, self._tick)
+        return expired